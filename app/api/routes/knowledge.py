@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends
-from app.tool.ai_tool import get_ai_tool
-from weaviate.classes.query import MetadataQuery
-from app.core.weaviate_client import get_weaviate_client
+from app.tool.retrieval_engine import get_retrieval_engine
+from app.core.weaviate_client import WeaviateClientManager, get_weaviate_manager
 from app.core.config import settings
 from app.models.knowledge_models import RetrievalInput
 
@@ -49,47 +48,29 @@ router = APIRouter(prefix="/knowledge", tags=["knowledge"])
 #         return {"status": "error", "message": str(e)}
 
 @router.post("/retrieval")
-async def general_knowledge_retrieval(retrieval_input: RetrievalInput = None):
+async def general_knowledge_retrieval(
+    retrieval_input: RetrievalInput = None,
+    weaviate_manager: WeaviateClientManager = Depends(get_weaviate_manager),
+):
     """
     Endpoint for general knowledge retrieval
     """
-    weaviate_client = get_weaviate_client();
     try:
-        ai_tool = get_ai_tool();
-        tenant_collection = weaviate_client.collections.get(settings.TENANT_KNOWLEDGE_COLLECTION_NAME)
         # Set default retrieval settings if not provided
         if not retrieval_input.retrieval_setting:
             retrieval_input.retrieval_setting = {
                 "top_k": 10,
                 "score_threshold": 0.4
             }
-        
-        # Perform the search query
-        embeddings = await ai_tool.get_embeddings(retrieval_input.query);
-        results = tenant_collection.query.near_vector(
-            near_vector=embeddings,
-            limit=retrieval_input.retrieval_setting.get("top_k", 10),
-            return_metadata=MetadataQuery(distance=True)
-        );
-        
-        # Filter results based on score threshold
-        filtered_results = []   
-        for result in results.objects:
-            # Convert distance to similarity score (1 - distance)
-            similarity_score = 1 - result.metadata.distance
-            if similarity_score >= retrieval_input.retrieval_setting.get("score_threshold", 0.4):
-                filtered_results.append({
-                    "content": result.properties.get("content", ""),
-                    "title": result.properties.get("source", ""),
-                    "metadata": {
-                        "score": similarity_score
-                    }
-                })
-        
-        return filtered_results
+
+        return await get_retrieval_engine().retrieve(
+            settings.GENERAL_KNOWLEDGE_COLLECTION_NAME,
+            retrieval_input.query,
+            top_k=retrieval_input.retrieval_setting.get("top_k", 10),
+            score_threshold=retrieval_input.retrieval_setting.get("score_threshold", 0.4),
+            weaviate_manager=weaviate_manager,
+        )
         
     except Exception as e:
         print(f"Error retrieving knowledge: {str(e)}")
         raise
-    finally:
-        weaviate_client.close();
@@ -1,102 +1,74 @@
 import asyncio
-from io import BytesIO
-from turtle import pd
-from PyPDF2 import PdfReader
-from docx import Document
-from sqlalchemy import inspect
-from fastapi import APIRouter, File, HTTPException, Path, Depends, UploadFile, Body
-from typing import Optional
+import json
+from fastapi import APIRouter, HTTPException, Header, Path, Depends, Body, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from pydantic import BaseModel
-from app.controllers.tenant_controller import upload_knowledge, get_tenant_object_by_tenant_id, retrieve_knowledge, process_knowledge_from_s3_object
+from app.controllers.tenant_controller import iter_tenant_objects, retrieve_knowledge, retrieve_knowledge_batch, retrieve_knowledge_federated, process_knowledge_from_s3_object
 from app.tool.ai_tool import get_ai_tool
-from app.models.knowledge_models import RetrievalInput
+from app.models.knowledge_models import FederatedRetrievalInput, RetrievalInput
 from app.tool.vectorDB_tool import delete_vector_record_with_tenant_id
+from app.core.weaviate_client import WeaviateClientManager, get_weaviate_manager
+from app.core.job_queue import IdempotencyKeyConflict, get_job_queue
+from app.core.tenant_tiering import TenantTieringManager, get_tenant_tiering_manager
+from app.core.config import settings
 
 router = APIRouter(prefix="/tenant", tags=["tenant"])
 
 class UploadKnowledgeRequest(BaseModel):
     knowledge_id: str
 
-
-
-# @router.post("/upload-knowledge")
-# async def upload_knowledge_endpoint(
-#     knowledge_id: str = Body(..., description="The ID of the knowledge base"),
-#     file: UploadFile = File(..., description="File to upload (TXT, MD, PDF, etc. Max 15MB)")
-# ):
-#     """
-#     Endpoint for uploading knowledge from supported file types
-#     Supports: TXT, MARKDOWN, MDX, PDF, HTML, XLSX, XLS, DOCX, CSV, MD, HTM
-#     Maximum file size: 15MB
-#     """
-#     try:
-#         # Validate file size (15MB limit)
-#         file_content = await file.read()
-#         if len(file_content) > 15 * 1024 * 1024:  # 15MB in bytes
-#             raise HTTPException(status_code=400, detail="File size exceeds 15MB limit")
-
-#         # Validate file extension
-#         allowed_extensions = ['.txt', '.md', '.mdx', '.pdf', '.html', '.xlsx', 
-#                             '.xls', '.docx', '.csv', '.htm', '.markdown']
-#         print(file.filename);
-
-#         file_ext = file.filename[file.filename.rfind('.'):].lower()
-#         if file_ext not in allowed_extensions:
-#             raise HTTPException(status_code=400, 
-#                               detail=f"Unsupported file type. Allowed types: {', '.join(allowed_extensions)}")
-
-#         # Read file content based on type
-#         content = ""
-#         if file_ext in ['.txt', '.md', '.mdx', '.markdown', '.htm', '.html']:
-#             content = file_content.decode('utf-8')
-#         elif file_ext == '.pdf':
-#             # Use PyPDF2 or similar to extract text
-#             reader = PdfReader(BytesIO(file_content))
-#             content = " ".join([page.extract_text() for page in reader.pages])
-#         elif file_ext in ['.xlsx', '.xls']:
-#             # Use pandas to read Excel
-#             df = pd.read_excel(BytesIO(file_content))
-#             content = df.to_string()
-#         elif file_ext == '.docx':
-#             # Use python-docx to read Word docs
-#             doc = Document(BytesIO(file_content))
-#             content = " ".join([paragraph.text for paragraph in doc.paragraphs])
-#         elif file_ext == '.csv':
-#             # Use pandas to read CSV
-#             df = pd.read_csv(BytesIO(file_content))
-#             content = df.to_string()
-
-#         # Upload the extracted content
-#         asyncio.run(upload_knowledge(knowledge_id, content, source=file.filename))
-#         return {
-#             "message": "File uploaded and processed successfully",
-#             "knowledge_id": knowledge_id,
-#             "filename": file.filename,
-#         }
-#     except HTTPException as he:
-#         raise he
-#     except Exception as e:
-#         return {"error": str(e)}
-
 @router.post("/objects")
 async def get_tenant_objects(
-    knowledge_id: str = Body(..., description="The ID of the knowledge base")
+    knowledge_id: str = Body(..., description="The ID of the knowledge base"),
+    page_size: int = Query(
+        settings.TENANT_OBJECTS_PAGE_SIZE, ge=1, le=1000, description="Objects fetched per page"
+    ),
+    after: Optional[str] = Query(
+        None, description="Resume token: UUID of the last object already received"
+    ),
+    properties: Optional[List[str]] = Query(
+        None, description="Properties to return (all by default)"
+    ),
+    weaviate_manager: WeaviateClientManager = Depends(get_weaviate_manager),
 ):
     """
-    Endpoint to retrieve all objects associated with a knowledge base
+    Endpoint to stream all objects associated with a knowledge base
+
+    Objects are streamed as NDJSON, one {"uuid", "properties"} line per object,
+    fetched page by page with the object cursor so memory stays flat. The last
+    line is {"done": true, "count": n, "after": uuid}. If the listing fails
+    midway, the last line is {"error": message, "after": uuid}; pass that uuid
+    as "after" to resume.
     """
     try:
-      results = await get_tenant_object_by_tenant_id(knowledge_id);
-      return {
-          "knowledge_id": knowledge_id,
-          "objects": results
-      }
+        tenant_exists = await get_tenant_tiering_manager().ensure_active(knowledge_id, weaviate_manager)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if not tenant_exists:
+        raise HTTPException(status_code=404, detail=f"Knowledge base {knowledge_id} not found")
+
+    async def stream():
+        count = 0
+        last = after
+        try:
+            async for page in iter_tenant_objects(
+                knowledge_id, properties, page_size, after, weaviate_manager
+            ):
+                count += len(page)
+                last = page[-1]["uuid"]
+                yield "".join(json.dumps(obj, default=str) + "\n" for obj in page)
+        except Exception as e:
+            yield json.dumps({"error": str(e), "after": last}) + "\n"
+            return
+        yield json.dumps({"done": True, "count": count, "after": last}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 @router.post("/retrieval")
 async def retrieve_knowledge_endpoint(
     request: RetrievalInput,
+    weaviate_manager: WeaviateClientManager = Depends(get_weaviate_manager),
 ):
     """
     Retrieve vector records from a specific knowledge base
@@ -107,6 +79,7 @@ async def retrieve_knowledge_endpoint(
             query=request.query,
             top_k=request.retrieval_setting.get("top_k", 10),
             score_threshold=request.retrieval_setting.get("score_threshold", 0.4),
+            weaviate_manager=weaviate_manager,
         )
         return {
             "results": results,
@@ -117,19 +90,113 @@ async def retrieve_knowledge_endpoint(
             "results": []
         }
 
+@router.post("/retrieval/batch")
+async def retrieve_knowledge_batch_endpoint(
+    requests: List[RetrievalInput],
+    weaviate_manager: WeaviateClientManager = Depends(get_weaviate_manager),
+):
+    """
+    Retrieve vector records for several queries in one call
+
+    All queries are embedded in one provider request and searched concurrently.
+    Results are returned in request order; a failed query carries an "error"
+    message instead of failing the whole batch.
+    """
+    if len(requests) > settings.RETRIEVAL_BATCH_MAX_QUERIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.RETRIEVAL_BATCH_MAX_QUERIES} queries per batch",
+        )
+    try:
+        results = await retrieve_knowledge_batch(requests, weaviate_manager)
+        return {
+            "results": results,
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/retrieval/federated")
+async def retrieve_knowledge_federated_endpoint(
+    request: FederatedRetrievalInput,
+    weaviate_manager: WeaviateClientManager = Depends(get_weaviate_manager),
+):
+    """
+    Retrieve one merged top-k across several knowledge bases and the general knowledge base
+
+    The query is embedded once and all knowledge bases are searched in parallel.
+    Scores can be weighted per knowledge base through "weights".
+    """
+    if len(request.knowledge_ids) > settings.RETRIEVAL_BATCH_MAX_QUERIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.RETRIEVAL_BATCH_MAX_QUERIES} knowledge bases per request",
+        )
+    try:
+        return await retrieve_knowledge_federated(request, weaviate_manager)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/upload-knowledge")
 async def get_documents(
     tenant_id: str = Body(..., description="The ID of the knowledge base"),
     key: str = Body(..., description="The name of the file to retrieve"),
+    idempotency_key: Optional[str] = Header(None, description="Repeating a key returns the original job"),
 ):
     """ 
-    Endpoint to retrieve all documents associated with a knowledge base
+    Queue an uploaded S3 object for ingestion by the workers
+
+    Poll GET /tenant/jobs/{job_id} for the job's status and progress.
     """
     try:
-        process_knowledge_from_s3_object(tenant_id, key);
+        queued = await process_knowledge_from_s3_object(tenant_id, key, idempotency_key)
+        job = queued["job"]
         return {
-            "data": "Started processing uploaded knowledge"
+            "data": "Queued uploaded knowledge for processing" if queued["created"] else "Knowledge upload already queued",
+            "job_id": job["id"],
+            "status": job["status"],
         }
+    except IdempotencyKeyConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str = Path(..., description="The ID of the ingestion job")):
+    """
+    Report the status, progress and result of an ingestion job
+    """
+    job = await asyncio.to_thread(get_job_queue().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return {
+        "id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "max_attempts": job["max_attempts"],
+        "progress": job["progress"],
+        "result": job["result"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+
+@router.get("/tiers")
+async def get_tenant_tiers(
+    refresh: bool = False,
+    tenant_tiering_manager: TenantTieringManager = Depends(get_tenant_tiering_manager),
+    weaviate_manager: WeaviateClientManager = Depends(get_weaviate_manager),
+):
+    """
+    Report how many tenants sit in each activity tier (ACTIVE, INACTIVE, OFFLOADED)
+    """
+    try:
+        # Without tiering there is no background sweep to count the tiers
+        if refresh or not settings.TENANT_TIERING_ENABLED:
+            await tenant_tiering_manager.sweep(weaviate_manager)
+        return tenant_tiering_manager.stats()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -137,13 +204,14 @@ async def get_documents(
 @router.delete("/knowledge/{tenant_id}")
 async def delete_knowledge(
     tenant_id: str = Path(..., description="The ID of the knowledge base"),
+    weaviate_manager: WeaviateClientManager = Depends(get_weaviate_manager),
 ):
     """ 
     Endpoint to delete a knowledge base
     """
     try:
         print(f'Deleting knowledge base with tenant id: {tenant_id}');
-        result = await delete_vector_record_with_tenant_id(tenant_id);
+        result = await delete_vector_record_with_tenant_id(tenant_id, weaviate_manager=weaviate_manager)
         return {
             "data": result
         }
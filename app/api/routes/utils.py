@@ -1,7 +1,17 @@
-from fastapi import APIRouter
+import asyncio
+from fastapi import APIRouter, Depends
 from typing import List, Optional, Union
 from pydantic import BaseModel
 from app.tool.vectorDB_tool import get_vector_record_by_filters
+from app.core.weaviate_client import WeaviateClientManager, get_weaviate_manager
+from app.core.tenant_registry import get_tenant_registry
+from app.core.vector_store import get_vector_store
+from app.core.job_queue import get_job_queue
+from app.tool.ai_tool import get_ai_tool
+from app.tool.embedding_cache import get_embedding_cache
+from app.tool.retrieval_cache import get_retrieval_cache
+from app.tool.single_flight import get_retrieval_single_flight
+from app.tool.tenant_replica import get_tenant_replicas
 
 router = APIRouter(prefix="/utils", tags=["utils"])
 
@@ -22,7 +32,10 @@ class KnowledgeFilterRequest(BaseModel):
 
 
 @router.post("/knowledge-by-filters")
-async def filter_knowledge(request: KnowledgeFilterRequest):
+async def filter_knowledge(
+    request: KnowledgeFilterRequest,
+    weaviate_manager: WeaviateClientManager = Depends(get_weaviate_manager),
+):
     """
     Retrieve vector records using filters.
     
@@ -49,7 +62,8 @@ async def filter_knowledge(request: KnowledgeFilterRequest):
 
         results = await get_vector_record_by_filters(
             filters=filters_list,
-            limit=request.limit
+            limit=request.limit,
+            weaviate_manager=weaviate_manager,
         )
         
         return {
@@ -64,6 +78,27 @@ async def filter_knowledge(request: KnowledgeFilterRequest):
             "message": str(e)
         }
 
+@router.get("/metrics")
+async def get_metrics(
+    weaviate_manager: WeaviateClientManager = Depends(get_weaviate_manager),
+):
+    """
+    Report in-process performance counters
+    """
+    return {
+        "weaviate_pool": weaviate_manager.stats(),
+        "vector_store": get_vector_store(weaviate_manager).stats(),
+        "tenant_registry": get_tenant_registry().stats(),
+        "embedding_batcher": get_ai_tool().batch_metrics.snapshot(),
+        "embedding_scheduler": get_ai_tool().embedding_scheduler.stats(),
+        "retrieval_cache": get_retrieval_cache().stats(),
+        "retrieval_single_flight": get_retrieval_single_flight().stats(),
+        "tenant_replicas": get_tenant_replicas().stats(),
+        "embedding_cache": get_embedding_cache().stats(),
+        "jobs": await asyncio.to_thread(get_job_queue().stats),
+    }
+
+
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
\ No newline at end of file
@@ -1,45 +1,27 @@
-from app.core.weaviate_client import get_weaviate_client
-from weaviate.classes.tenants import Tenant
+from app.core.weaviate_client import WeaviateClientManager
+from app.core.tenant_registry import get_tenant_registry
+from app.core.tenant_tiering import get_tenant_tiering_manager
+from app.core.vector_store import get_vector_store
+from app.core.job_queue import INGEST_S3_OBJECT, get_job_queue
 from app.core.config import settings
 from app.utils.helpers import split_content_into_chunks
 from app.tool.vectorDB_tool import store_vector_record_with_tenant_id
-from app.tool.ai_tool import get_ai_tool
-from weaviate.classes.query import MetadataQuery
-from app.tool.s3 import process_s3_object
+from app.tool.retrieval_engine import get_retrieval_engine
+from app.models.knowledge_models import FederatedRetrievalInput, RetrievalInput
+from typing import AsyncIterator, Dict, List, Optional
 import asyncio
-import threading
-
-
-async def check_tenant_exists(client, tenant_id: str):
-    collection = client.collections.get(settings.TENANT_KNOWLEDGE_COLLECTION_NAME)
-        # List all tenants
-    tenants = collection.tenants.get()
-    tenant_names = [tenant for tenant in tenants]
-    
-    # Check if tenant exists
-    if tenant_id not in tenant_names:
-        return False;
-    return True;
+import functools
+
+
+async def check_tenant_exists(weaviate_manager: WeaviateClientManager, tenant_id: str):
+    # Resolved from the in-process tenant registry, falling back to get_by_name
+    return await get_tenant_registry().exists(tenant_id, weaviate_manager)
 
-async def ensure_tenant_exists(client, tenant_id: str):
+async def ensure_tenant_exists(weaviate_manager: WeaviateClientManager, tenant_id: str):
     """Check if tenant exists and create it if it doesn't."""
     try:
-        # Get the collection
-        collection = client.collections.get(settings.TENANT_KNOWLEDGE_COLLECTION_NAME)
-        
-        # List all tenants
-        tenants = collection.tenants.get()
-        tenant_names = [tenant for tenant in tenants]
-        
-        # Check if tenant exists
-        if tenant_id not in tenant_names:
-            print(f"Creating tenant: {tenant_id}")
-            # Create the tenant
-            collection.tenants.create(
-                tenants=[
-                    Tenant(name=tenant_id),
-                ]
-            )
+        # Create the tenant if the registry does not know it
+        if await get_tenant_registry().ensure(tenant_id, weaviate_manager):
             print(f"Tenant {tenant_id} created successfully")
         else:
             print(f"Tenant {tenant_id} already exists")
@@ -52,79 +34,159 @@ async def ensure_tenant_exists(client, tenant_id: str):
 async def upload_knowledge(tenant_id: str, content: str, source: str):
     # Split content into chunks of approximately 500 tokens
     chunks = split_content_into_chunks(content,source);
-    store_vector_record_with_tenant_id(chunks, tenant_id, settings.TENANT_KNOWLEDGE_COLLECTION_NAME);
+    await store_vector_record_with_tenant_id(chunks, tenant_id, settings.TENANT_KNOWLEDGE_COLLECTION_NAME)
     return True;
 
 
-async def get_tenant_object_by_tenant_id(tenant_id: str):
-    weaviate_client = get_weaviate_client();
-    tenant_collection = weaviate_client.collections.get(settings.TENANT_KNOWLEDGE_COLLECTION_NAME).with_tenant(tenant_id);
-    # Split content into chunks of approximately 500 tokens
-    results = tenant_collection.query.fetch_objects();
-    return results;
+async def iter_tenant_objects(
+    tenant_id: str,
+    properties: Optional[List[str]] = None,
+    page_size: int = settings.TENANT_OBJECTS_PAGE_SIZE,
+    after: Optional[str] = None,
+    weaviate_manager: WeaviateClientManager = None,
+) -> AsyncIterator[List[Dict]]:
+    """
+    Iterate over all objects of a tenant, one page at a time, using the object cursor.
 
+    Args:
+        tenant_id: Tenant to list
+        properties: Properties to return (all when None); vectors are never returned
+        page_size: Objects per page
+        after: UUID of the last object already seen, to resume a listing
+        weaviate_manager: Optional Weaviate client manager
 
-async def retrieve_knowledge(tenant_id: str, query: str, top_k: int = 10, score_threshold: float = 0.4):
+    Yields:
+        Pages of {"uuid", "properties"} dicts, in cursor order
+    """
+    vector_store = get_vector_store(weaviate_manager)
+    while True:
+        objects = await get_tenant_tiering_manager().run_active(
+            tenant_id,
+            functools.partial(
+                vector_store.fetch,
+                settings.TENANT_KNOWLEDGE_COLLECTION_NAME,
+                limit=page_size,
+                tenant_id=tenant_id,
+                after=after,
+                return_properties=properties,
+            ),
+            weaviate_manager,
+        )
+        page = [{"uuid": obj.uuid, "properties": obj.properties} for obj in objects]
+        if page:
+            yield page
+            after = page[-1]["uuid"]
+        if len(page) < page_size:
+            return
+
+
+async def retrieve_knowledge(
+    tenant_id: str,
+    query: str,
+    top_k: int = 10,
+    score_threshold: float = 0.4,
+    weaviate_manager: WeaviateClientManager = None,
+):
     """
     Retrieve vector records from a specific tenant's knowledge base
     """
-    weaviate_client = get_weaviate_client();
     try:
-        ai_tool = get_ai_tool();
-        
-        tenant_exists = await check_tenant_exists(weaviate_client, tenant_id);
-        if(tenant_exists == False):
-            return [];
-        tenant_collection = weaviate_client.collections.get(settings.TENANT_KNOWLEDGE_COLLECTION_NAME).with_tenant(tenant_id)
-        print(tenant_collection);
-        # Perform the search query
-        embeddings = await ai_tool.get_embeddings(query);
-        results = tenant_collection.query.near_vector(
-            near_vector=embeddings,
-            limit=top_k,
-            return_metadata=MetadataQuery(distance=True)
-        );
-        
-        # Filter results based on score threshold
-        filtered_results = []
-
-        for result in results.objects:
-            # Convert distance to similarity score (1 - distance)
-            similarity_score = 1 - result.metadata.distance
-            if similarity_score >= score_threshold:
-                filtered_results.append({
-                    "content": result.properties.get("content", ""),
-                    "title": result.properties.get("source", ""),
-                    "metadata": {
-                        "score": similarity_score
-                    }
-                })
-        return filtered_results
+        return await get_retrieval_engine().retrieve(
+            settings.TENANT_KNOWLEDGE_COLLECTION_NAME,
+            query,
+            top_k=top_k,
+            score_threshold=score_threshold,
+            tenant_id=tenant_id,
+            weaviate_manager=weaviate_manager,
+        )
     except Exception as e:
         print(f"Error retrieving knowledge: {str(e)}")
         return [];
-    finally:
-        weaviate_client.close();
-        print('\033[41m\033[30mweaviate client closed \033[0m');
 
 
 
-def run_async_in_thread(loop: asyncio.AbstractEventLoop, coro):
-    """Run an async coroutine in a new thread."""
-    asyncio.set_event_loop(loop)  # Set the event loop for the thread
-    loop.run_until_complete(coro)
-    loop.close()
+async def retrieve_knowledge_batch(
+    requests: List[RetrievalInput],
+    weaviate_manager: WeaviateClientManager = None,
+):
+    """
+    Retrieve vector records for many queries, each against its own knowledge base
+    """
+    results: List[Optional[Dict]] = [None] * len(requests)
+    valid = []
+    for index, request in enumerate(requests):
+        if not request.knowledge_id:
+            results[index] = {"results": [], "error": "knowledge_id is required"}
+            continue
+        retrieval_setting = request.retrieval_setting or {}
+        valid.append((index, {
+            "query": request.query,
+            "tenant_id": request.knowledge_id,
+            "top_k": retrieval_setting.get("top_k", 10),
+            "score_threshold": retrieval_setting.get("score_threshold", 0.4),
+        }))
+    if valid:
+        batch_results = await get_retrieval_engine().retrieve_batch(
+            settings.TENANT_KNOWLEDGE_COLLECTION_NAME,
+            [request for _, request in valid],
+            weaviate_manager=weaviate_manager,
+        )
+        for (index, _), result in zip(valid, batch_results, strict=True):
+            results[index] = result
+    return results
+
+
+async def retrieve_knowledge_federated(
+    request: FederatedRetrievalInput,
+    weaviate_manager: WeaviateClientManager = None,
+):
+    """
+    Retrieve a merged top-k across several knowledge bases and, optionally, the general knowledge base
+    """
+    weights = request.weights or {}
+    targets = [
+        (settings.TENANT_KNOWLEDGE_COLLECTION_NAME, knowledge_id, weights.get(knowledge_id, 1.0))
+        for knowledge_id in dict.fromkeys(request.knowledge_ids)
+    ]
+    if request.include_general:
+        targets.append((settings.GENERAL_KNOWLEDGE_COLLECTION_NAME, None, weights.get("general", 1.0)))
+    if not targets:
+        return {"results": [], "errors": []}
+    retrieval_setting = request.retrieval_setting or {}
+    return await get_retrieval_engine().retrieve_federated(
+        request.query,
+        targets,
+        top_k=retrieval_setting.get("top_k", 10),
+        score_threshold=retrieval_setting.get("score_threshold", 0.4),
+        weaviate_manager=weaviate_manager,
+    )
+
+
+async def process_knowledge_from_s3_object(
+    tenant_id: str, key: str, idempotency_key: Optional[str] = None
+) -> Dict:
+    """
+    Queue the ingestion of an uploaded S3 object for the ingestion workers.
 
-def process_knowledge_from_s3_object(tenant_id: str, key: str):
-    # Create a new event loop for the thread
-    new_loop = asyncio.new_event_loop()
+    Args:
+        tenant_id: Tenant the knowledge belongs to
+        key: S3 object key
+        idempotency_key: Optional client key; repeating it for the tenant returns the original job
 
-    # Create the async task
-    coro = process_s3_object(tenant_id, key)
+    Returns:
+        Dict with the job and whether it was created by this call
 
-    # Run the async task in a new thread
-    thread = threading.Thread(target=run_async_in_thread, args=(new_loop, coro))
-    thread.start()
+    Raises:
+        IdempotencyKeyConflict: If the tenant used the key for a different object
+    """
+    job, created = await asyncio.to_thread(
+        get_job_queue().enqueue,
+        INGEST_S3_OBJECT,
+        {"tenant_id": tenant_id, "key": key},
+        idempotency_key,
+        tenant_id=tenant_id,
+    )
+    return {"job": job, "created": created}
 
 
 # Check/create tenant
@@ -1,10 +1,44 @@
-from typing import Dict, Type
+import asyncio
+import base64
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Type
 from abc import ABC, abstractmethod
-from app.core.ai_agents.openai_agent import OpenAIAgent
+import numpy as np
+from app.core.ai_agents.local_agent import LocalEmbeddingAgent
+from app.core.config import settings
+from app.core.ai_agents.openai_agent import AsyncOpenAIAgent, OpenAIAgent
+
+
+def decode_embedding(data) -> np.ndarray:
+    """
+    Decode a provider embedding into a contiguous float32 array.
+
+    Base64 payloads are wrapped without copying; float lists (providers that
+    ignore encoding_format) are converted once.
+    """
+    if isinstance(data, str):
+        return np.frombuffer(base64.b64decode(data), dtype=np.float32)
+    return np.asarray(data, dtype=np.float32)
+
+
+@dataclass
+class EmbeddingResponse:
+    """Embeddings of one provider request together with its rate-limit signals."""
+
+    embeddings: List[np.ndarray]
+    total_tokens: Optional[int] = None
+    headers: Mapping[str, str] = field(default_factory=dict)
 
 
 class BaseAIAgent(ABC):
     """Base class for all AI agents."""
+
+    # Whether the client returned by get_client() exposes awaitable methods
+    is_async: bool = False
+    # Whether requests count against a remote provider's rate limits
+    rate_limited: bool = True
+    # Provider whose embedding models the model names refer to
+    embedding_provider: str = "openai"
     
     @abstractmethod
     def initialize(self):
@@ -16,6 +50,79 @@ class BaseAIAgent(ABC):
         """Get the AI client instance."""
         pass
 
+    async def request(self, method, **kwargs):
+        """
+        Call a client method without blocking the event loop.
+
+        Async clients are awaited directly; sync clients run in a worker thread.
+        """
+        if self.is_async:
+            return await method(**kwargs)
+        return await asyncio.to_thread(method, **kwargs)
+
+    def embedding_model_id(self, model: str) -> str:
+        """
+        Identify the embedding space of a model, e.g. to key cached embeddings.
+
+        Args:
+            model: Embedding model name
+
+        Returns:
+            The provider and model, unique per embedding space
+        """
+        return f"{self.embedding_provider}/{model}"
+
+    async def create_embedding_response(
+        self, texts: List[str], model: str, max_retries: Optional[int] = None
+    ) -> EmbeddingResponse:
+        """
+        Embed a list of texts with an OpenAI-compatible client, keeping response headers.
+
+        Embeddings are requested base64-encoded and decoded straight into float32
+        arrays instead of JSON float lists. EMBEDDING_DIMENSIONS, when set, asks
+        the provider for shortened vectors.
+
+        Args:
+            texts: Input texts
+            model: Embedding model name
+            max_retries: Override the client's retry count (0 leaves retries to the caller)
+
+        Returns:
+            EmbeddingResponse with one embedding per input text, token usage and headers
+        """
+        client = self.get_client()
+        options = {"dimensions": settings.EMBEDDING_DIMENSIONS} if settings.EMBEDDING_DIMENSIONS else {}
+        if max_retries is not None:
+            client = client.with_options(max_retries=max_retries)
+        raw = await self.request(
+            client.embeddings.with_raw_response.create,
+            model=model,
+            input=texts,
+            encoding_format="base64",
+            **options,
+        )
+        response = raw.parse()
+        usage = getattr(response, "usage", None)
+        return EmbeddingResponse(
+            embeddings=[decode_embedding(data.embedding) for data in response.data],
+            total_tokens=getattr(usage, "total_tokens", None),
+            headers=raw.headers,
+        )
+
+    async def create_embeddings(self, texts: List[str], model: str) -> List[np.ndarray]:
+        """
+        Embed a list of texts.
+
+        Args:
+            texts: Input texts
+            model: Embedding model name
+
+        Returns:
+            One float32 embedding per input text, in input order
+        """
+        response = await self.create_embedding_response(texts, model)
+        return response.embeddings
+
 
 class OpenAIAgentWrapper(BaseAIAgent):
     """Wrapper for OpenAI agent implementation."""
@@ -34,11 +141,66 @@ class OpenAIAgentWrapper(BaseAIAgent):
         return self._client
 
 
+class AsyncOpenAIAgentWrapper(BaseAIAgent):
+    """Wrapper for the AsyncOpenAI agent implementation."""
+
+    is_async = True
+
+    def __init__(self):
+        self._agent = AsyncOpenAIAgent()
+        self.initialize()
+
+    def initialize(self):
+        """Initialize the AsyncOpenAI agent (clients are created per event loop)."""
+        pass
+
+    def get_client(self):
+        """Get the AsyncOpenAI client for the running event loop."""
+        return self._agent.get_client()
+
+
+class LocalEmbeddingAgentWrapper(BaseAIAgent):
+    """
+    Wrapper for the CPU-local embedding model.
+
+    Only embeddings are supported; the model argument is ignored in favour of
+    the model file at LOCAL_EMBEDDING_MODEL_PATH.
+    """
+
+    rate_limited = False
+    embedding_provider = "local"
+
+    def __init__(self):
+        self._agent = LocalEmbeddingAgent()
+        self.initialize()
+
+    def initialize(self):
+        """Initialize the local agent (the model file is loaded on first use)."""
+        pass
+
+    def get_client(self):
+        """Get the local embedding model."""
+        return self._agent.get_client()
+
+    def embedding_model_id(self, model: str) -> str:
+        """Identify the loaded model file; the model name is ignored."""
+        return f"{self.embedding_provider}/{self._agent.model.identity}"
+
+    async def create_embedding_response(
+        self, texts: List[str], model: str, max_retries: Optional[int] = None
+    ) -> EmbeddingResponse:
+        """Embed a list of texts on CPU in a worker thread."""
+        embeddings = await asyncio.to_thread(self._agent.embed, texts)
+        return EmbeddingResponse(embeddings=embeddings)
+
+
 class AIAgentFactory:
     """Factory class for creating AI agents."""
     
     _agents: Dict[str, Type[BaseAIAgent]] = {
         "openai": OpenAIAgentWrapper,
+        "openai_async": AsyncOpenAIAgentWrapper,
+        "local": LocalEmbeddingAgentWrapper,
     }
 
     @classmethod
@@ -47,7 +209,7 @@ class AIAgentFactory:
         Create an AI agent instance based on the specified type.
         
         Args:
-            agent_type: Type of agent to create ("openai")
+            agent_type: Type of agent to create ("openai", "openai_async", "local")
             
         Returns:
             An instance of the specified AI agent
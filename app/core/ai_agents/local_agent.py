@@ -0,0 +1,120 @@
+import os
+import re
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+class LocalEmbeddingModel:
+    """
+    Static word-embedding model evaluated on CPU with NumPy.
+
+    The model file is an ``.npz`` archive holding ``vocab`` (N strings),
+    ``vectors`` (N x D float32) and optionally ``weights`` (N per-token
+    weights, e.g. IDF). A text is embedded as the weighted mean of its known
+    token vectors, L2-normalized; texts without known tokens get a zero vector.
+    A whole batch is pooled in one vectorized pass.
+    """
+
+    def __init__(self, path: str):
+        if not os.path.exists(path):
+            raise ValueError(f"Local embedding model not found: {path}")
+        stat = os.stat(path)
+        with np.load(path, allow_pickle=False) as data:
+            vocab = [str(token) for token in data["vocab"]]
+            self.vectors = np.ascontiguousarray(data["vectors"], dtype=np.float32)
+            weights = data["weights"] if "weights" in data.files else np.ones(len(vocab))
+        if self.vectors.shape[0] != len(vocab):
+            raise ValueError(
+                f"Local embedding model {path} has {len(vocab)} tokens but {self.vectors.shape[0]} vectors"
+            )
+        self.path = path
+        # Changes when the file is replaced, so cached embeddings of another model are not reused
+        self.identity = f"{os.path.abspath(path)}@{stat.st_size}:{stat.st_mtime_ns}"
+        self.dimensions = self.vectors.shape[1]
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.index = {token: i for i, token in enumerate(vocab)}
+
+    def _token_ids(self, text: str) -> List[int]:
+        index = self.index
+        ids = []
+        for token in _TOKEN_PATTERN.findall(text):
+            token_id = index.get(token)
+            if token_id is None:
+                token_id = index.get(token.lower())
+            if token_id is not None:
+                ids.append(token_id)
+        return ids
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed a batch of texts.
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            float32 array of shape (len(texts), dimensions)
+        """
+        token_ids = [self._token_ids(text) for text in texts]
+        lengths = np.fromiter((len(ids) for ids in token_ids), dtype=np.int64, count=len(texts))
+        output = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        non_empty = lengths > 0
+        if not non_empty.any():
+            return output
+
+        flat = np.fromiter(
+            (token_id for ids in token_ids for token_id in ids), dtype=np.int64, count=int(lengths.sum())
+        )
+        weights = self.weights[flat]
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))[non_empty]
+        # Sum the weighted token vectors of each text in one pass over the batch
+        sums = np.add.reduceat(self.vectors[flat] * weights[:, None], starts, axis=0)
+        totals = np.add.reduceat(weights, starts)
+        pooled = sums / np.maximum(totals, 1e-12)[:, None]
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        output[non_empty] = pooled / np.maximum(norms, 1e-12)
+        return output
+
+
+class LocalEmbeddingAgent:
+    """Process-wide holder of the local embedding model, loaded on first use."""
+
+    _instance: Optional["LocalEmbeddingAgent"] = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._model = None
+            cls._instance._lock = threading.Lock()
+        return cls._instance
+
+    @property
+    def model(self) -> LocalEmbeddingModel:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = LocalEmbeddingModel(settings.LOCAL_EMBEDDING_MODEL_PATH)
+                    print(
+                        f"Loaded local embedding model {self._model.path} "
+                        f"({len(self._model.index)} tokens, {self._model.dimensions} dimensions)"
+                    )
+        return self._model
+
+    def get_client(self) -> LocalEmbeddingModel:
+        return self.model
+
+    def embed(self, texts: List[str]) -> List[np.ndarray]:
+        """Embed texts in chunks of LOCAL_EMBEDDING_BATCH_SIZE (blocking, CPU bound)."""
+        model = self.model
+        batch_size = max(1, settings.LOCAL_EMBEDDING_BATCH_SIZE)
+        embeddings: List[np.ndarray] = []
+        for start in range(0, len(texts), batch_size):
+            # Rows are views into the batch matrix, not copies
+            embeddings.extend(model.encode(texts[start : start + batch_size]))
+        return embeddings
@@ -1,8 +1,20 @@
+import asyncio
+import weakref
 from typing import Optional
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
 from app.core.config import settings
 
 
+def _http_limits() -> httpx.Limits:
+    """Connection pool limits shared by the sync and async OpenAI clients."""
+    return httpx.Limits(
+        max_connections=settings.AGENT_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.AGENT_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=settings.AGENT_HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
 class OpenAIAgent:
     _instance: Optional["OpenAIAgent"] = None
     _client: Optional[OpenAI] = None
@@ -19,8 +31,9 @@ class OpenAIAgent:
                 raise ValueError("AGENT_API_KEY setting is not configured")
             self._client = OpenAI(
                 api_key=api_key,
-                timeout=30.0,  # 30 seconds timeout
-                max_retries=3,  # Retry failed requests up to 3 times
+                timeout=settings.AGENT_TIMEOUT,
+                max_retries=settings.AGENT_MAX_RETRIES,
+                http_client=DefaultHttpxClient(limits=_http_limits()),
             )
 
     @property
@@ -28,4 +41,46 @@ class OpenAIAgent:
         return self._client
 
     def get_client(self) -> OpenAI:
-        return self.client 
\ No newline at end of file
+        return self.client
+
+
+class AsyncOpenAIAgent:
+    """
+    AsyncOpenAI clients backed by a pooled keep-alive HTTP connection pool.
+
+    An httpx async connection pool is bound to the event loop it was first used
+    on, so one client is kept per event loop (the API loop, and any loop an
+    ingestion job runs on).
+    """
+
+    _instance: Optional["AsyncOpenAIAgent"] = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._clients = weakref.WeakKeyDictionary()
+        return cls._instance
+
+    def __init__(self):
+        if not settings.AGENT_API_KEY:
+            raise ValueError("AGENT_API_KEY setting is not configured")
+
+    def _create_client(self) -> AsyncOpenAI:
+        return AsyncOpenAI(
+            api_key=settings.AGENT_API_KEY,
+            timeout=settings.AGENT_TIMEOUT,
+            max_retries=settings.AGENT_MAX_RETRIES,
+            http_client=DefaultAsyncHttpxClient(limits=_http_limits()),
+        )
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._create_client()
+            self._clients[loop] = client
+        return client
+
+    def get_client(self) -> AsyncOpenAI:
+        return self.client
@@ -58,11 +58,77 @@ class Settings(BaseSettings):
     # Weaviate settings
     WEAVIATE_URL: str
     WEAVIATE_API_KEY: str = ""
+    WEAVIATE_POOL_SIZE: int = 8  # Max pooled client connections per process
+    WEAVIATE_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free client
+    WEAVIATE_HEALTH_CHECK_INTERVAL: float = 30.0  # Seconds before an idle client is re-checked
+    WEAVIATE_CONNECT_RETRIES: int = 3
+    WEAVIATE_BATCH_MODE: Literal["fixed_size", "dynamic"] = "fixed_size"
+    WEAVIATE_BATCH_SIZE: int = 100  # Objects per ingestion batch
+    WEAVIATE_BATCH_CONCURRENCY: int = 2  # Concurrent batch requests (fixed_size mode)
+    WEAVIATE_BATCH_MAX_RETRIES: int = 3  # Re-batch attempts for failed objects
+    WEAVIATE_BATCH_RETRY_BACKOFF: float = 1.0  # Base backoff in seconds, doubled per attempt
+    WEAVIATE_DELETE_BATCH_SIZE: int = 1000  # Objects per delete request; keep below the server's QUERY_MAXIMUM_RESULTS
+
+    # Vector store backend: a Weaviate cluster, or local memory-mapped files
+    VECTOR_STORE: Literal["weaviate", "embedded"] = "weaviate"
+    EMBEDDED_STORE_PATH: str = "data/vector_store"
+    EMBEDDED_STORE_INDEX: Literal["exact", "ivf"] = "exact"
+    EMBEDDED_STORE_IVF_MIN_OBJECTS: int = 10000  # Smaller tenants are always searched exactly
+    EMBEDDED_STORE_IVF_LISTS: int = 0  # Clusters per index; 0 uses sqrt(objects)
+    EMBEDDED_STORE_IVF_PROBES: int = 8  # Clusters searched per query
+
+    # Ingestion job queue and workers
+    JOB_QUEUE_PATH: str = "data/jobs.sqlite3"  # SQLite database of jobs and data versions, shared by the API and the workers
+    DATA_VERSIONS_CACHE_TTL: float = 1.0  # Seconds a data version is reused before re-reading; writes by other processes are seen within this delay
+    JOB_LEASE_SECONDS: float = 120.0  # A job whose worker stops renewing its lease for this long is retried
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF: float = 30.0  # Seconds before the first retry, doubled per attempt
+    JOB_POLL_INTERVAL: float = 1.0  # Seconds an idle worker waits before claiming again
+    WORKER_PROCESSES: int = 2  # Default process count of app.worker
 
     # AI Agent settings
     AGENT_API_KEY: str = ""
-    AI_AGENT_PROVIDER: Literal["openai", "ai_tool"] = "openai"
+    AI_AGENT_PROVIDER: Literal["openai", "openai_async"] = "openai_async"
+    AGENT_TIMEOUT: float = 30.0  # Seconds per provider request
+    AGENT_MAX_RETRIES: int = 3
+    AGENT_HTTP_MAX_CONNECTIONS: int = 100  # Provider HTTP connection pool size
+    AGENT_HTTP_MAX_KEEPALIVE: int = 20  # Idle keep-alive connections kept open
+    AGENT_HTTP_KEEPALIVE_EXPIRY: float = 30.0  # Seconds an idle connection is kept
+    EMBEDDING_PROVIDER: Literal["openai", "openai_async", "local"] | None = None  # Defaults to AI_AGENT_PROVIDER
     EMBEDDING_MODEL: str = "text-embedding-ada-002"
+    EMBEDDING_DIMENSIONS: int | None = None  # Shortened vectors (text-embedding-3 models), None = model default
+    LOCAL_EMBEDDING_MODEL_PATH: str = "models/embeddings.npz"  # Model file for the local provider
+    LOCAL_EMBEDDING_BATCH_SIZE: int = 256  # Texts per vectorized inference pass
+    EMBEDDING_BATCH_ENABLED: bool = True  # Coalesce concurrent get_embeddings calls
+    EMBEDDING_BATCH_MAX_SIZE: int = 64  # Max texts per coalesced request
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 5.0  # Max time a request waits for its batch
+    EMBEDDING_RATE_LIMIT_TPM: int = 0  # Tokens per minute budget, 0 = from provider headers; a value caps the provider's
+    EMBEDDING_RATE_LIMIT_RPM: int = 0  # Requests per minute budget, 0 = from provider headers; a value caps the provider's
+    EMBEDDING_RATE_LIMIT_HEADROOM: float = 0.9  # Fraction of the limits to pace towards
+    EMBEDDING_RATE_LIMIT_MAX_RETRIES: int = 5  # Paced retries after a 429
+    EMBEDDING_MAX_INPUTS_PER_REQUEST: int = 2048
+    EMBEDDING_MAX_TOKENS_PER_REQUEST: int = 300_000
+    EMBEDDING_MAX_TOKENS_PER_INPUT: int = 8191
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # In-memory LRU tier budget
+    EMBEDDING_CACHE_DISK_ENABLED: bool = True  # Persist the cache to EMBEDDING_CACHE_PATH
+    EMBEDDING_CACHE_PATH: str = ".cache/embeddings.sqlite3"
+    TENANT_OBJECTS_PAGE_SIZE: int = 100  # Default page size of /tenant/objects listings
+    RETRIEVAL_BATCH_MAX_QUERIES: int = 50  # Max queries per /tenant/retrieval/batch call
+    RETRIEVAL_BATCH_CONCURRENCY: int = 8  # Concurrent searches per batch call
+    RETRIEVAL_SINGLE_FLIGHT_ENABLED: bool = True  # Share in-flight identical retrievals
+    RETRIEVAL_CACHE_ENABLED: bool = True  # Cache retrieval results per tenant
+    RETRIEVAL_CACHE_TTL: float = 300.0  # Seconds a cached result is served
+    RETRIEVAL_CACHE_MAX_ENTRIES_PER_TENANT: int = 256
+    RETRIEVAL_CACHE_MAX_TENANTS: int = 1000  # Least recently used tenants are dropped beyond this
+    RETRIEVAL_CACHE_SEMANTIC_ENABLED: bool = False  # Reuse results of near-identical queries
+    RETRIEVAL_CACHE_SEMANTIC_THRESHOLD: float = 0.97  # Min cosine similarity for a semantic hit
+    TENANT_REPLICA_ENABLED: bool = False  # Serve hot tenants from in-process exact replicas
+    TENANT_REPLICA_MAX_BYTES: int = 512 * 1024 * 1024  # Memory budget of all replicas
+    TENANT_REPLICA_MAX_OBJECTS: int = 20000  # Larger tenants are never replicated
+    TENANT_REPLICA_HOT_ACCESSES: int = 3  # Searches before a tenant's replica is loaded
+    TENANT_REPLICA_TTL: float = 300.0  # Seconds a replica is served before it is reloaded
+    TENANT_REPLICA_VERIFY_RATE: float = 0.0  # Fraction of replica answers re-checked against Weaviate
 
 
     # S3 settings
@@ -70,11 +136,31 @@ class Settings(BaseSettings):
     AWS_SECRET_ACCESS_KEY: str
     AWS_REGION: str
     AWS_S3_BUCKET: str
+    S3_DOWNLOAD_PART_SIZE: int = 8 * 1024 * 1024  # Bytes per ranged GET when downloading documents
+    S3_DOWNLOAD_PART_RETRIES: int = 3  # Re-requests of a part whose transfer breaks off
+    PDF_EXTRACTION_PROCESSES: int = 0  # Processes extracting PDF text per worker; 0 to divide the CPU cores among WORKER_PROCESSES, 1 to extract in-process
+    PDF_EXTRACTION_MIN_PAGES: int = 16  # Smaller PDFs are extracted in-process
+    PDF_EXTRACTION_PAGES_PER_TASK: int = 8  # Pages per task sent to an extraction process
+    PDF_EXTRACTION_PAGE_TIMEOUT: float = 30.0  # Seconds after which a page is skipped
+    EXTRACTION_ROWS_PER_SEGMENT: int = 100  # CSV/XLSX rows extracted per text segment
+    CONTENT_DEFINED_CHUNKING: bool = False  # Cut S3 ingestion chunks where the text calls for it, so edits only change nearby chunks
+    SOURCE_SYNC_FETCH_LIMIT: int = 10000  # Stored chunks of a document read in one query when re-ingesting it
 
     # Weaviate settings
     GENERAL_KNOWLEDGE_COLLECTION_NAME: str
     TENANT_KNOWLEDGE_COLLECTION_NAME: str
 
+    # Tenant registry settings
+    TENANT_REGISTRY_TTL: float = 300.0  # Seconds a known tenant stays cached
+    TENANT_REGISTRY_NEGATIVE_TTL: float = 15.0  # Seconds a missing tenant stays cached
+
+    # Tenant tiering settings
+    TENANT_TIERING_ENABLED: bool = False  # Deactivate idle tenants in the background
+    TENANT_TIERING_IDLE_SECONDS: float = 3600.0  # Idle time before a tenant is deactivated
+    TENANT_TIERING_SWEEP_INTERVAL: float = 300.0  # Seconds between tiering sweeps
+    TENANT_TIERING_COLD_STATUS: Literal["INACTIVE", "OFFLOADED"] = "INACTIVE"
+    TENANT_ACTIVATION_TIMEOUT: float = 30.0  # Max seconds to wait for a tenant to reactivate
+
     # Tenant settings
     TENANT_URL: str
     TENANT_API_KEY: str
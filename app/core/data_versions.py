@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+
+# Expired cached versions are dropped once this many are held
+_MAX_CACHED_VERSIONS = 10000
+
+
+class DataVersions:
+    """
+    Per-tenant data versions shared by every process on the host.
+
+    Ingestion and deletion bump the version of the tenant they write to. The
+    versions live in the SQLite database of the job queue, so a write made by a
+    worker process is seen by the caches of the API processes on their next
+    lookup: cached retrieval results, hot-tenant replicas and cached tenant
+    absence are all tied to the version they were computed against.
+
+    ``get`` runs on the event loop for every retrieval, so versions read from
+    the database are kept in memory for ``cache_ttl`` seconds: a write made by
+    another process is seen within that delay, one made by this process at
+    once. Reads and writes use separate connections, so a read never waits
+    behind a write that is queued for SQLite's write lock; callers on the
+    event loop run ``bump`` in a thread.
+    """
+
+    def __init__(self, path: str = settings.JOB_QUEUE_PATH, cache_ttl: float = settings.DATA_VERSIONS_CACHE_TTL):
+        self.path = path
+        self.cache_ttl = cache_ttl
+        self._read_db: Optional[sqlite3.Connection] = None
+        self._write_db: Optional[sqlite3.Connection] = None
+        self._read_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        # (collection, tenant) -> (expiry, version)
+        self._cache: Dict[Tuple[str, str], Tuple[float, int]] = {}
+        self._cache_lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS data_versions ("
+            "collection TEXT NOT NULL, tenant TEXT NOT NULL, version INTEGER NOT NULL, "
+            "PRIMARY KEY (collection, tenant)) WITHOUT ROWID"
+        )
+        return db
+
+    def _remember(self, key: Tuple[str, str], version: int) -> None:
+        if self.cache_ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            # A concurrent bump may already have cached a newer version
+            if cached is None or cached[1] <= version:
+                self._cache[key] = (now + self.cache_ttl, version)
+            if len(self._cache) > _MAX_CACHED_VERSIONS:
+                for stale in [k for k, (expires, _) in self._cache.items() if expires < now]:
+                    del self._cache[stale]
+
+    def get(self, collection_name: str, tenant_id: Optional[str] = None) -> int:
+        """Return the current version of a tenant's data, 0 if it was never written."""
+        key = (collection_name, tenant_id or "")
+        with self._cache_lock:
+            cached = self._cache.get(key)
+        if cached is not None and cached[0] >= time.monotonic():
+            return cached[1]
+        with self._read_lock:
+            if self._read_db is None:
+                self._read_db = self._open()
+            row = self._read_db.execute(
+                "SELECT version FROM data_versions WHERE collection = ? AND tenant = ?", key
+            ).fetchone()
+        version = row[0] if row is not None else 0
+        self._remember(key, version)
+        return version
+
+    def bump(self, collection_name: str, tenant_id: Optional[str] = None) -> int:
+        """
+        Record that a tenant's data changed and return its new version.
+
+        This may wait for SQLite's write lock; call it via ``asyncio.to_thread``
+        from async code.
+        """
+        key = (collection_name, tenant_id or "")
+        with self._write_lock:
+            if self._write_db is None:
+                self._write_db = self._open()
+            row = self._write_db.execute(
+                "INSERT INTO data_versions (collection, tenant, version) VALUES (?, ?, 1) "
+                "ON CONFLICT (collection, tenant) DO UPDATE SET version = version + 1 "
+                "RETURNING version",
+                key,
+            ).fetchone()
+        self._remember(key, row[0])
+        return row[0]
+
+
+data_versions = DataVersions()
+
+
+def get_data_versions() -> DataVersions:
+    """Return the shared data versions."""
+    return data_versions
@@ -0,0 +1,744 @@
+import asyncio
+import bisect
+import fcntl
+import json
+import math
+import os
+import re
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.embedding_dimensions import (
+    check_collection_dimensions,
+    configured_dimensions,
+)
+from app.core.vector_store import (
+    FILTER_OPERATORS,
+    PropertyFilter,
+    StoredObject,
+    VectorStore,
+)
+
+# Tenant names accepted by Weaviate, which keeps them safe as directory names
+_TENANT_NAME = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+# Directory of the objects of a collection without multi-tenancy
+_DEFAULT_SHARD = "_default"
+# Rows scored per matrix product while assigning rows to IVF lists
+_ASSIGN_CHUNK = 8192
+
+
+@contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    """Exclusive lock shared with other processes using the same store."""
+    with open(path, "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _write_json(path: str, data) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as handle:
+        json.dump(data, handle)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp, path)
+
+
+def _read_json(path: str, default):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return default
+
+
+def _timestamp(value: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value, tz=timezone.utc) if value is not None else None
+
+
+def _matches(properties: Dict[str, Any], filters: List[PropertyFilter]) -> bool:
+    for condition in filters:
+        value = properties.get(condition.property)
+        expected = condition.value
+        try:
+            if condition.operator == "Equal":
+                ok = value == expected
+            elif condition.operator == "NotEqual":
+                ok = value != expected
+            elif condition.operator == "GreaterThan":
+                ok = value is not None and value > expected
+            elif condition.operator == "LessThan":
+                ok = value is not None and value < expected
+            else:
+                present = set(value) if isinstance(value, (list, tuple)) else {value}
+                wanted = set(expected) if isinstance(expected, (list, tuple)) else {expected}
+                ok = bool(present & wanted) if condition.operator == "ContainsAny" else wanted <= present
+        except TypeError:
+            ok = False
+        if not ok:
+            return False
+    return True
+
+
+class _IVFIndex:
+    """Inverted-file index: rows grouped by their nearest of ``nlist`` spherical k-means centroids."""
+
+    def __init__(self, centroids: np.ndarray, lists: List[np.ndarray], indexed_rows: int):
+        self.centroids = centroids
+        self.lists = lists
+        self.indexed_rows = indexed_rows  # Rows appended later are searched exhaustively
+
+    @classmethod
+    def build(cls, matrix: np.ndarray, norms: np.ndarray, live: np.ndarray, nlist: int, seed: int = 0) -> "_IVFIndex":
+        rows = np.flatnonzero(live)
+        nlist = max(1, min(nlist, len(rows)))
+        rng = np.random.default_rng(seed)
+        sample = rows if len(rows) <= nlist * 64 else np.sort(rng.choice(rows, nlist * 64, replace=False))
+        points = matrix[sample] / np.maximum(norms[sample, None], 1e-12)
+        centroids = points[rng.choice(len(points), nlist, replace=False)].copy()
+        for _ in range(10):
+            assignment = np.argmax(points @ centroids.T, axis=1)
+            for cluster in range(nlist):
+                members = points[assignment == cluster]
+                if len(members):
+                    centroids[cluster] = members.sum(axis=0)
+                else:
+                    # Reseed empty clusters with a random point
+                    centroids[cluster] = points[rng.integers(len(points))]
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+        assignment = np.empty(len(rows), dtype=np.int32)
+        for start in range(0, len(rows), _ASSIGN_CHUNK):
+            chunk = rows[start : start + _ASSIGN_CHUNK]
+            assignment[start : start + len(chunk)] = np.argmax(matrix[chunk] @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(nlist + 1))
+        lists = [rows[order[bounds[i] : bounds[i + 1]]] for i in range(nlist)]
+        return cls(centroids, lists, len(matrix))
+
+    def candidates(self, query: np.ndarray, probes: int, total_rows: int) -> np.ndarray:
+        nearest = np.argsort(-(self.centroids @ query))[:probes]
+        return np.concatenate(
+            [self.lists[cluster] for cluster in nearest] + [np.arange(self.indexed_rows, total_rows)]
+        )
+
+
+class _Shard:
+    """
+    Objects of one tenant, or of a collection without multi-tenancy.
+
+    Vectors live in an append-only float32 file that is memory-mapped for
+    search. Object identity and properties live in an append-only JSON lines
+    log of put/delete records that point at vector rows; replaying the log
+    rebuilds the in-memory state. Updating a vector appends a new row and
+    leaves the old one dead. Once dead rows outnumber live ones the shard is
+    compacted into a new generation of files, and ``CURRENT`` is switched
+    atomically. Writers hold an exclusive file lock, and every operation first
+    replays what other processes appended, so several processes can share a
+    store directory.
+    """
+
+    def __init__(self, path: str, dimensions_hint: Optional[int]):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.lock_path = os.path.join(path, "lock")
+        self.dimensions_hint = dimensions_hint
+        self._lock = threading.RLock()
+        self._reset(None)
+
+    def _reset(self, generation: Optional[int]) -> None:
+        self.generation = generation
+        self.dimensions: Optional[int] = None
+        self._log_offset = 0
+        self._rows: Dict[str, int] = {}
+        self._uuids: List[Optional[str]] = []
+        self._properties: List[Optional[Dict]] = []
+        self._times: List[Tuple[float, float]] = []
+        self._live = np.zeros(0, dtype=bool)
+        self._live_dirty = True
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._matrix: Optional[np.ndarray] = None
+        self._sorted: Optional[List[str]] = None
+        self._ivf: Optional[_IVFIndex] = None
+
+    def _files(self, generation: int) -> Tuple[str, str, str]:
+        return (
+            os.path.join(self.path, f"vectors.{generation}.f32"),
+            os.path.join(self.path, f"log.{generation}.jsonl"),
+            os.path.join(self.path, f"meta.{generation}.json"),
+        )
+
+    def _current_generation(self) -> int:
+        try:
+            with open(os.path.join(self.path, "CURRENT")) as handle:
+                return int(handle.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def refresh(self) -> None:
+        """Replay log records appended since the last call, by this or another process. Needs _lock."""
+        generation = self._current_generation()
+        if generation != self.generation:
+            self._reset(generation)
+        vectors_path, log_path, meta_path = self._files(generation)
+        if self.dimensions is None:
+            self.dimensions = _read_json(meta_path, {}).get("dimensions")
+        try:
+            with open(log_path, "rb") as handle:
+                handle.seek(self._log_offset)
+                data = handle.read()
+        except FileNotFoundError:
+            data = b""
+        # A writer may be mid-record; only consume complete lines
+        end = data.rfind(b"\n") + 1
+        if end:
+            self._log_offset += end
+            for line in data[:end].splitlines():
+                if line:
+                    self._apply(json.loads(line))
+        if self.dimensions and os.path.exists(vectors_path):
+            rows = os.path.getsize(vectors_path) // (4 * self.dimensions)
+            if self._matrix is None or len(self._matrix) < rows:
+                self._map(vectors_path, rows)
+
+    def _apply(self, record: Dict) -> None:
+        object_id = record["uuid"]
+        previous = self._rows.pop(object_id, None)
+        if record["op"] == "delete":
+            if previous is not None:
+                self._kill(previous)
+            return
+        row = record["row"]
+        if previous is not None and previous != row:
+            self._kill(previous)
+        while len(self._uuids) <= row:
+            self._uuids.append(None)
+            self._properties.append(None)
+            self._times.append((0.0, 0.0))
+        created = self._times[previous][0] if previous is not None else record["time"]
+        self._rows[object_id] = row
+        self._uuids[row] = object_id
+        self._properties[row] = record["properties"]
+        self._times[row] = (created, record["time"])
+        self._sorted = None
+        self._live_dirty = True
+
+    def _kill(self, row: int) -> None:
+        self._uuids[row] = None
+        self._properties[row] = None
+        self._sorted = None
+        self._live_dirty = True
+
+    def _map(self, vectors_path: str, rows: int) -> None:
+        previous = 0 if self._matrix is None else len(self._matrix)
+        self._matrix = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dimensions)) if rows else None
+        norms = np.empty(rows, dtype=np.float32)
+        norms[:previous] = self._norms[:previous]
+        if rows > previous:
+            norms[previous:] = np.linalg.norm(self._matrix[previous:], axis=1)
+        self._norms = norms
+
+    def _live_mask(self, rows: int) -> np.ndarray:
+        if self._live_dirty or len(self._live) != rows:
+            live = np.zeros(rows, dtype=bool)
+            live[[row for row in self._rows.values() if row < rows]] = True
+            self._live = live
+            self._live_dirty = False
+        return self._live
+
+    def _append(self, vectors: Optional[np.ndarray], records: List[Dict]) -> None:
+        """Append vectors and the log records referencing them. Needs _lock and the file lock."""
+        vectors_path, log_path, meta_path = self._files(self.generation)
+        if vectors is not None and len(vectors):
+            if self.dimensions is None:
+                self.dimensions = int(vectors.shape[1])
+                _write_json(meta_path, {"dimensions": self.dimensions})
+            row_bytes = 4 * self.dimensions
+            size = os.path.getsize(vectors_path) if os.path.exists(vectors_path) else 0
+            start = size // row_bytes
+            with open(vectors_path, "ab") as handle:
+                if size != start * row_bytes:
+                    # Drop a torn row left by a crashed writer
+                    handle.truncate(start * row_bytes)
+                handle.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+                handle.flush()
+                os.fsync(handle.fileno())
+            for record in records:
+                if "row" in record and record["row"] < 0:
+                    record["row"] = start + (-record["row"] - 1)
+        with open(log_path, "a") as handle:
+            handle.write("".join(json.dumps(record, default=str) + "\n" for record in records))
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def insert(self, objects: List[Dict]) -> Dict[str, str]:
+        errors: Dict[str, str] = {}
+        accepted: List[Dict] = []
+        vectors: List[np.ndarray] = []
+        with self._lock, _file_lock(self.lock_path):
+            self.refresh()
+            dimensions = self.dimensions or self.dimensions_hint
+            now = time.time()
+            for obj in objects:
+                object_id = str(obj["uuid"])
+                vector = np.asarray(obj["vector"], dtype=np.float32)
+                if vector.ndim != 1 or (dimensions is not None and len(vector) != dimensions):
+                    errors[object_id] = f"Vector has shape {vector.shape}, expected ({dimensions},)"
+                    continue
+                dimensions = len(vector)
+                vectors.append(vector)
+                # Negative rows are resolved to file positions once the vectors are appended
+                accepted.append(
+                    {"op": "put", "uuid": object_id, "row": -len(vectors), "properties": obj["properties"], "time": now}
+                )
+            if accepted:
+                self._append(np.stack(vectors), accepted)
+                self.refresh()
+        return errors
+
+    def update(self, object_id: str, properties: Dict[str, Any], vector=None) -> None:
+        with self._lock, _file_lock(self.lock_path):
+            self.refresh()
+            row = self._rows.get(object_id)
+            if row is None:
+                raise KeyError(f"Object {object_id} not found")
+            merged = {**self._properties[row], **properties}
+            record = {"op": "put", "uuid": object_id, "row": row, "properties": merged, "time": time.time()}
+            if vector is None:
+                self._append(None, [record])
+            else:
+                record["row"] = -1
+                self._append(np.asarray(vector, dtype=np.float32)[None, :], [record])
+            self.refresh()
+
+    def delete(self, object_ids: List[str]) -> None:
+        with self._lock, _file_lock(self.lock_path):
+            self.refresh()
+            now = time.time()
+            records = [
+                {"op": "delete", "uuid": object_id, "time": now}
+                for object_id in object_ids
+                if object_id in self._rows
+            ]
+            if not records:
+                return
+            self._append(None, records)
+            self.refresh()
+            dead = len(self._uuids) - len(self._rows)
+            if dead >= 1024 and dead > len(self._rows):
+                self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite live rows into a new generation. Needs _lock and the file lock."""
+        generation = self.generation + 1
+        vectors_path, log_path, meta_path = self._files(generation)
+        rows = sorted(self._rows.values())
+        with open(vectors_path, "wb") as handle:
+            for start in range(0, len(rows), _ASSIGN_CHUNK):
+                handle.write(np.ascontiguousarray(self._matrix[rows[start : start + _ASSIGN_CHUNK]]).tobytes())
+            handle.flush()
+            os.fsync(handle.fileno())
+        with open(log_path, "w") as handle:
+            for new_row, row in enumerate(rows):
+                record = {
+                    "op": "put",
+                    "uuid": self._uuids[row],
+                    "row": new_row,
+                    "properties": self._properties[row],
+                    "time": self._times[row][1],
+                }
+                handle.write(json.dumps(record, default=str) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+        _write_json(meta_path, {"dimensions": self.dimensions})
+        with open(os.path.join(self.path, "CURRENT.tmp"), "w") as handle:
+            handle.write(str(generation))
+        os.replace(os.path.join(self.path, "CURRENT.tmp"), os.path.join(self.path, "CURRENT"))
+        for path in self._files(generation - 1):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        print(f"Compacted {self.path}: {len(rows)} live objects")
+        self.refresh()
+
+    def _object(self, row: int, return_properties: Optional[Sequence[str]], include_vector: bool, distance=None) -> StoredObject:
+        properties = self._properties[row]
+        if return_properties is not None:
+            properties = {name: properties[name] for name in return_properties if name in properties}
+        created, updated = self._times[row]
+        return StoredObject(
+            uuid=self._uuids[row],
+            properties=properties,
+            vector=np.array(self._matrix[row]) if include_vector else None,
+            distance=distance,
+            creation_time=_timestamp(created),
+            last_update_time=_timestamp(updated),
+        )
+
+    def _ensure_ivf(self, rows: int, live: np.ndarray) -> Optional[_IVFIndex]:
+        if settings.EMBEDDED_STORE_INDEX != "ivf" or len(self._rows) < settings.EMBEDDED_STORE_IVF_MIN_OBJECTS:
+            return None
+        ivf = self._ivf
+        # Rebuild once a fifth of the rows were appended after the index was built
+        if ivf is None or rows - ivf.indexed_rows > ivf.indexed_rows // 5:
+            nlist = settings.EMBEDDED_STORE_IVF_LISTS or int(math.sqrt(len(self._rows)))
+            started = time.perf_counter()
+            ivf = self._ivf = _IVFIndex.build(self._matrix[:rows], self._norms[:rows], live, nlist)
+            print(f"Built IVF index of {self.path}: {nlist} lists in {time.perf_counter() - started:.2f}s")
+        return ivf
+
+    def search(
+        self,
+        vector,
+        limit: int,
+        max_distance: Optional[float],
+        filters: Optional[List[PropertyFilter]],
+        return_properties: Optional[Sequence[str]],
+        include_vector: bool,
+    ) -> List[StoredObject]:
+        with self._lock:
+            self.refresh()
+            if self._matrix is None or not self._rows:
+                return []
+            query = np.asarray(vector, dtype=np.float32)
+            if len(query) != self.dimensions:
+                raise ValueError(f"Query has {len(query)} dimensions, expected {self.dimensions}")
+            query = query / max(float(np.linalg.norm(query)), 1e-12)
+            rows = len(self._matrix)
+            live = self._live_mask(rows)
+            if filters:
+                live = live.copy()
+                for row in np.flatnonzero(live):
+                    live[row] = _matches(self._properties[row], filters)
+
+            ivf = self._ensure_ivf(rows, self._live_mask(rows))
+            if ivf is not None:
+                candidates = ivf.candidates(query, settings.EMBEDDED_STORE_IVF_PROBES, rows)
+                candidates = candidates[live[candidates]]
+            else:
+                candidates = np.flatnonzero(live)
+            if not len(candidates):
+                return []
+            scores = (self._matrix[candidates] @ query) / np.maximum(self._norms[candidates], 1e-12)
+            k = min(limit, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            results = []
+            for index in top:
+                distance = max(0.0, 1.0 - float(scores[index]))
+                if max_distance is not None and distance > max_distance:
+                    break
+                results.append(self._object(int(candidates[index]), return_properties, include_vector, distance))
+            return results
+
+    def fetch(
+        self,
+        limit: int,
+        after: Optional[str],
+        filters: Optional[List[PropertyFilter]],
+        return_properties: Optional[Sequence[str]],
+        include_vector: bool,
+    ) -> List[StoredObject]:
+        with self._lock:
+            self.refresh()
+            if self._sorted is None:
+                self._sorted = sorted(self._rows)
+            start = bisect.bisect_right(self._sorted, after) if after is not None else 0
+            page = []
+            for object_id in self._sorted[start:]:
+                row = self._rows[object_id]
+                if filters and not _matches(self._properties[row], filters):
+                    continue
+                page.append(self._object(row, return_properties, include_vector))
+                if len(page) >= limit:
+                    break
+            return page
+
+    def get(self, object_id: str) -> Optional[StoredObject]:
+        with self._lock:
+            self.refresh()
+            row = self._rows.get(object_id)
+            return self._object(row, None, True) if row is not None else None
+
+    def count(self) -> int:
+        with self._lock:
+            self.refresh()
+            return len(self._rows)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "objects": len(self._rows),
+                "rows": len(self._uuids),
+                "mapped_bytes": 0 if self._matrix is None else self._matrix.nbytes,
+                "ivf_lists": len(self._ivf.lists) if self._ivf is not None else 0,
+            }
+
+
+class EmbeddedVectorStore(VectorStore):
+    """
+    Vector store kept in local files, for single-node deployments, CI and offline use.
+
+    Layout under ``root``::
+
+        <collection>/collection.json      dimensions and whether it has tenants
+        <collection>/tenants.json         tenant name -> activity status
+        <collection>/tenants/<tenant>/    one shard per tenant
+        <collection>/_default/            the shard of a collection without tenants
+
+    Search is exact (one matrix-vector product over the memory-mapped shard)
+    unless EMBEDDED_STORE_INDEX is "ivf", in which case shards with at least
+    EMBEDDED_STORE_IVF_MIN_OBJECTS objects are searched through an in-memory
+    IVF index probing EMBEDDED_STORE_IVF_PROBES lists. Blocking file work runs
+    in worker threads.
+    """
+
+    name = "embedded"
+
+    def __init__(self, root: str = settings.EMBEDDED_STORE_PATH):
+        self.root = root
+        self._shards: Dict[Tuple[str, Optional[str]], _Shard] = {}
+        self._lock = threading.Lock()
+        self.searches = 0
+
+    def _collection_path(self, collection_name: str) -> str:
+        if not _TENANT_NAME.match(collection_name):
+            raise ValueError(f"Invalid collection name: {collection_name}")
+        return os.path.join(self.root, collection_name)
+
+    def _collection_meta(self, collection_name: str) -> Dict[str, Any]:
+        meta = _read_json(os.path.join(self._collection_path(collection_name), "collection.json"), None)
+        if meta is None:
+            raise ValueError(f"Collection {collection_name} does not exist")
+        return meta
+
+    def _shard(self, collection_name: str, tenant_id: Optional[str], create: bool = False) -> Optional[_Shard]:
+        meta = self._collection_meta(collection_name)
+        if meta["multi_tenant"] != (tenant_id is not None):
+            raise ValueError(
+                f"Collection {collection_name} {'requires' if meta['multi_tenant'] else 'does not take'} a tenant"
+            )
+        key = (collection_name, tenant_id)
+        with self._lock:
+            shard = self._shards.get(key)
+        if shard is not None and (tenant_id is None or os.path.isdir(shard.path)):
+            return shard
+        if tenant_id is None:
+            path = os.path.join(self._collection_path(collection_name), _DEFAULT_SHARD)
+        else:
+            if not _TENANT_NAME.match(tenant_id):
+                raise ValueError(f"Invalid tenant name: {tenant_id}")
+            if tenant_id not in self._read_tenants(collection_name):
+                if not create:
+                    return None
+                self._write_tenants(collection_name, [tenant_id], None)
+            path = os.path.join(self._collection_path(collection_name), "tenants", tenant_id)
+        shard = _Shard(path, meta.get("dimensions"))
+        with self._lock:
+            shard = self._shards.setdefault(key, shard)
+        return shard
+
+    def _read_tenants(self, collection_name: str) -> Dict[str, str]:
+        return _read_json(os.path.join(self._collection_path(collection_name), "tenants.json"), {})
+
+    def _write_tenants(self, collection_name: str, tenant_ids: List[str], status: Optional[str], remove: bool = False) -> None:
+        path = self._collection_path(collection_name)
+        with _file_lock(os.path.join(path, "lock")):
+            tenants = self._read_tenants(collection_name)
+            for tenant_id in tenant_ids:
+                if remove:
+                    tenants.pop(tenant_id, None)
+                elif status is None:
+                    tenants.setdefault(tenant_id, "ACTIVE")
+                elif tenant_id in tenants:
+                    tenants[tenant_id] = status
+            _write_json(os.path.join(path, "tenants.json"), tenants)
+
+    def _prepare(self) -> None:
+        dimensions = configured_dimensions()
+        for collection_name, multi_tenant in (
+            (settings.TENANT_KNOWLEDGE_COLLECTION_NAME, True),
+            (settings.GENERAL_KNOWLEDGE_COLLECTION_NAME, False),
+        ):
+            path = self._collection_path(collection_name)
+            os.makedirs(path, exist_ok=True)
+            meta_path = os.path.join(path, "collection.json")
+            meta = _read_json(meta_path, None)
+            if meta is None:
+                print(f"Creating collection: {collection_name} in {self.root}")
+                meta = {"dimensions": dimensions, "multi_tenant": multi_tenant}
+                _write_json(meta_path, meta)
+            if meta.get("dimensions"):
+                check_collection_dimensions(collection_name, meta["dimensions"])
+
+    async def prepare(self) -> None:
+        await asyncio.to_thread(self._prepare)
+
+    async def get_tenants(
+        self, collection_name: str, tenant_ids: Optional[List[str]] = None
+    ) -> Dict[str, str]:
+        tenants = await asyncio.to_thread(self._read_tenants, collection_name)
+        if tenant_ids is None:
+            return tenants
+        return {tenant_id: tenants[tenant_id] for tenant_id in tenant_ids if tenant_id in tenants}
+
+    async def create_tenants(self, collection_name: str, tenant_ids: List[str]) -> None:
+        for tenant_id in tenant_ids:
+            if not _TENANT_NAME.match(tenant_id):
+                raise ValueError(f"Invalid tenant name: {tenant_id}")
+        await asyncio.to_thread(self._write_tenants, collection_name, tenant_ids, None)
+
+    async def set_tenant_status(self, collection_name: str, tenant_ids: List[str], status: str) -> None:
+        # Shards are opened on demand, so the status is only recorded
+        await asyncio.to_thread(self._write_tenants, collection_name, tenant_ids, status)
+
+    def _delete_tenant(self, collection_name: str, tenant_id: str) -> None:
+        if not _TENANT_NAME.match(tenant_id):
+            raise ValueError(f"Invalid tenant name: {tenant_id}")
+        self._write_tenants(collection_name, [tenant_id], None, remove=True)
+        with self._lock:
+            self._shards.pop((collection_name, tenant_id), None)
+        shutil.rmtree(os.path.join(self._collection_path(collection_name), "tenants", tenant_id), ignore_errors=True)
+
+    async def delete_tenant(self, collection_name: str, tenant_id: str) -> None:
+        await asyncio.to_thread(self._delete_tenant, collection_name, tenant_id)
+
+    async def insert_batch(
+        self, collection_name: str, objects: List[Dict], tenant_id: Optional[str] = None
+    ) -> Dict[str, str]:
+        def insert() -> Dict[str, str]:
+            return self._shard(collection_name, tenant_id, create=True).insert(objects)
+
+        return await asyncio.to_thread(insert)
+
+    async def update(
+        self,
+        collection_name: str,
+        uuid: str,
+        properties: Dict[str, Any],
+        vector=None,
+        tenant_id: Optional[str] = None,
+    ) -> None:
+        def update() -> None:
+            shard = self._shard(collection_name, tenant_id)
+            if shard is None:
+                raise ValueError(f"Tenant {tenant_id} does not exist")
+            shard.update(str(uuid), properties, vector)
+
+        await asyncio.to_thread(update)
+
+    async def get(
+        self, collection_name: str, uuid: str, tenant_id: Optional[str] = None
+    ) -> Optional[StoredObject]:
+        def get() -> Optional[StoredObject]:
+            shard = self._shard(collection_name, tenant_id)
+            return shard.get(str(uuid)) if shard is not None else None
+
+        return await asyncio.to_thread(get)
+
+    async def delete(
+        self, collection_name: str, uuids: List[str], tenant_id: Optional[str] = None
+    ) -> None:
+        def delete() -> None:
+            shard = self._shard(collection_name, tenant_id)
+            if shard is not None:
+                shard.delete([str(object_id) for object_id in uuids])
+
+        await asyncio.to_thread(delete)
+
+    async def search(
+        self,
+        collection_name: str,
+        vector,
+        limit: int,
+        tenant_id: Optional[str] = None,
+        max_distance: Optional[float] = None,
+        filters: Optional[List[PropertyFilter]] = None,
+        return_properties: Optional[Sequence[str]] = None,
+        include_vector: bool = False,
+    ) -> List[StoredObject]:
+        _check_filters(filters)
+
+        def search() -> List[StoredObject]:
+            shard = self._shard(collection_name, tenant_id)
+            if shard is None:
+                raise ValueError(f"Tenant {tenant_id} does not exist")
+            return shard.search(vector, limit, max_distance, filters, return_properties, include_vector)
+
+        self.searches += 1
+        return await asyncio.to_thread(search)
+
+    async def fetch(
+        self,
+        collection_name: str,
+        limit: int,
+        tenant_id: Optional[str] = None,
+        after: Optional[str] = None,
+        filters: Optional[List[PropertyFilter]] = None,
+        return_properties: Optional[Sequence[str]] = None,
+        include_vector: bool = False,
+    ) -> List[StoredObject]:
+        _check_filters(filters)
+
+        def fetch() -> List[StoredObject]:
+            shard = self._shard(collection_name, tenant_id)
+            if shard is None:
+                raise ValueError(f"Tenant {tenant_id} does not exist")
+            return shard.fetch(limit, str(after) if after is not None else None, filters, return_properties, include_vector)
+
+        return await asyncio.to_thread(fetch)
+
+    async def count(self, collection_name: str, tenant_id: Optional[str] = None) -> int:
+        def count() -> int:
+            shard = self._shard(collection_name, tenant_id)
+            return shard.count() if shard is not None else 0
+
+        return await asyncio.to_thread(count)
+
+    def stats(self) -> dict:
+        with self._lock:
+            shards = list(self._shards.values())
+        shard_stats = [shard.stats() for shard in shards]
+        return {
+            "backend": self.name,
+            "path": self.root,
+            "index": settings.EMBEDDED_STORE_INDEX,
+            "open_shards": len(shards),
+            "objects": sum(stats["objects"] for stats in shard_stats),
+            "dead_rows": sum(stats["rows"] - stats["objects"] for stats in shard_stats),
+            "mapped_bytes": sum(stats["mapped_bytes"] for stats in shard_stats),
+            "ivf_indexes": sum(1 for stats in shard_stats if stats["ivf_lists"]),
+            "searches": self.searches,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._shards.clear()
+
+
+def _check_filters(filters: Optional[List[PropertyFilter]]) -> None:
+    for condition in filters or []:
+        if condition.operator not in FILTER_OPERATORS:
+            raise ValueError(f"Unsupported operator: {condition.operator}")
+
+
+embedded_vector_store: Optional[EmbeddedVectorStore] = None
+
+
+def get_embedded_vector_store() -> EmbeddedVectorStore:
+    """Return the embedded vector store, creating it on first use."""
+    global embedded_vector_store
+    if embedded_vector_store is None:
+        embedded_vector_store = EmbeddedVectorStore()
+    return embedded_vector_store
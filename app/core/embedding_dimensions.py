@@ -0,0 +1,112 @@
+import re
+from typing import Dict, Optional, Sequence
+
+import weaviate
+
+from app.core.config import settings
+
+# Native output size of the OpenAI embedding models
+KNOWN_MODEL_DIMENSIONS: Dict[str, int] = {
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+
+_DIMENSIONS_MARKER = re.compile(r"embedding_dimensions=(\d+)")
+
+# Vector dimension of each known collection, read from Weaviate at startup
+collection_dimensions: Dict[str, int] = {}
+
+
+def configured_dimensions() -> Optional[int]:
+    """Dimension of the vectors the configured embedding provider produces, if known."""
+    if settings.EMBEDDING_DIMENSIONS:
+        return settings.EMBEDDING_DIMENSIONS
+    if (settings.EMBEDDING_PROVIDER or settings.AI_AGENT_PROVIDER) == "local":
+        from app.core.ai_agents.local_agent import LocalEmbeddingAgent
+
+        return LocalEmbeddingAgent().model.dimensions
+    return KNOWN_MODEL_DIMENSIONS.get(settings.EMBEDDING_MODEL)
+
+
+def describe_dimensions(dimensions: Optional[int]) -> Optional[str]:
+    """Collection description recording the vector dimension it was created for."""
+    return f"embedding_dimensions={dimensions}" if dimensions else None
+
+
+def read_collection_dimensions(config) -> Optional[int]:
+    """
+    Get the vector dimension recorded for a collection.
+
+    Collections created by this service record it in their description. Older
+    collections fall back to the dimension configured on their OpenAI
+    vectorizer, or the native dimension of its model.
+
+    Args:
+        config: The collection's CollectionConfig
+
+    Returns:
+        The dimension, or None if nothing was recorded
+    """
+    match = _DIMENSIONS_MARKER.search(config.description or "")
+    if match:
+        return int(match.group(1))
+    vectorizer_model = getattr(config.vectorizer_config, "model", None) or {}
+    if vectorizer_model.get("dimensions"):
+        return int(vectorizer_model["dimensions"])
+    return KNOWN_MODEL_DIMENSIONS.get(vectorizer_model.get("model"))
+
+
+def record_collection_dimensions(client: weaviate.WeaviateClient, collection_name: str) -> Optional[int]:
+    """
+    Load a collection's recorded dimension and check it against the configuration.
+
+    Args:
+        client: Weaviate client
+        collection_name: Name of the collection
+
+    Returns:
+        The collection's dimension, or None if the collection does not exist or has none recorded
+
+    Raises:
+        RuntimeError: If the configured embeddings do not fit the collection
+    """
+    if not client.collections.exists(collection_name):
+        return None
+    dimensions = read_collection_dimensions(client.collections.get(collection_name).config.get())
+    if dimensions is None:
+        print(f"Collection {collection_name} has no recorded embedding dimension")
+        return None
+    check_collection_dimensions(collection_name, dimensions)
+    return dimensions
+
+
+def check_collection_dimensions(collection_name: str, dimensions: int) -> None:
+    """
+    Check a collection's dimension against the configuration and remember it.
+
+    Raises:
+        RuntimeError: If the configured embeddings do not fit the collection
+    """
+    expected = configured_dimensions()
+    if expected is not None and expected != dimensions:
+        raise RuntimeError(
+            f"Collection {collection_name} stores {dimensions}-dimension vectors but "
+            f"the configured embeddings have {expected} dimensions (EMBEDDING_DIMENSIONS)"
+        )
+    collection_dimensions[collection_name] = dimensions
+    print(f"Collection {collection_name} uses {dimensions}-dimension vectors")
+
+
+def check_embedding_dimensions(vector: Sequence[float], collection_name: str) -> None:
+    """
+    Ensure a vector fits a collection before it is inserted or used as a query.
+
+    Raises:
+        ValueError: If the vector's length differs from the collection's dimension
+    """
+    expected = collection_dimensions.get(collection_name) or configured_dimensions()
+    if expected is not None and len(vector) != expected:
+        raise ValueError(
+            f"Embedding has {len(vector)} dimensions but collection {collection_name} expects {expected}"
+        )
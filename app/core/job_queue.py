@@ -0,0 +1,316 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Job kinds
+INGEST_S3_OBJECT = "ingest_s3_object"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    tenant_id TEXT NOT NULL DEFAULT '',
+    idempotency_key TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    progress TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (kind, tenant_id, idempotency_key)
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, run_after);
+"""
+
+_JSON_COLUMNS = ("payload", "progress", "result")
+
+
+class LeaseLost(Exception):
+    """The worker's lease on a job expired and the job may run elsewhere."""
+
+
+class IdempotencyKeyConflict(Exception):
+    """An idempotency key was reused for a job with a different payload."""
+
+
+class JobQueue:
+    """
+    Durable job queue stored in SQLite.
+
+    Workers ``claim`` the oldest ready job, which leases it to them for
+    ``lease_seconds``. A worker keeps the lease with ``heartbeat`` (which also
+    records progress) and ends it with ``complete`` or ``fail``. A job whose
+    lease expires, e.g. because its worker died, is handed to the next worker
+    that claims. Failed attempts are retried with exponential backoff until
+    ``max_attempts`` is reached. Enqueueing with an idempotency key that the
+    tenant already used for the same kind of job returns the existing job
+    instead of adding a new one; reusing it for a different payload is refused.
+
+    Every call opens its own connection, so one queue can be shared by threads
+    and the database file by any number of processes on the same host. Claims
+    run in an immediate transaction, so a job is leased to one worker at a time.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.JOB_QUEUE_PATH,
+        lease_seconds: float = settings.JOB_LEASE_SECONDS,
+        max_attempts: int = settings.JOB_MAX_ATTEMPTS,
+        retry_backoff: float = settings.JOB_RETRY_BACKOFF,
+    ):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+                    try:
+                        connection.execute("PRAGMA journal_mode=WAL")
+                        connection.executescript(_SCHEMA)
+                    finally:
+                        connection.close()
+                    self._initialized = True
+        # Autocommit mode; transactions are opened explicitly
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _to_dict(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        for column in _JSON_COLUMNS:
+            if job[column] is not None:
+                job[column] = json.loads(job[column])
+        return job
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        idempotency_key: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+        tenant_id: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Add a job, unless the tenant has a job of this kind with the same idempotency key.
+
+        Args:
+            kind: Job type, selecting the worker handler
+            payload: JSON-serializable job arguments
+            idempotency_key: Optional key identifying the request
+            max_attempts: Attempts before the job fails (default: JOB_MAX_ATTEMPTS)
+            tenant_id: Tenant the job belongs to, scoping its idempotency key
+
+        Returns:
+            Tuple of (the job, whether it was created by this call)
+
+        Raises:
+            IdempotencyKeyConflict: If the key was used for a job with a different payload
+        """
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        tenant_id = tenant_id or ""
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO jobs (id, kind, payload, tenant_id, idempotency_key, status, "
+                "max_attempts, run_after, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    kind,
+                    json.dumps(payload),
+                    tenant_id,
+                    idempotency_key,
+                    QUEUED,
+                    max_attempts or self.max_attempts,
+                    now,
+                    now,
+                    now,
+                ),
+            )
+            created = cursor.rowcount == 1
+            if created:
+                row = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            else:
+                row = connection.execute(
+                    "SELECT * FROM jobs WHERE kind = ? AND tenant_id = ? AND idempotency_key = ?",
+                    (kind, tenant_id, idempotency_key),
+                ).fetchone()
+        job = self._to_dict(row)
+        if not created and job["payload"] != json.loads(json.dumps(payload)):
+            raise IdempotencyKeyConflict(
+                f"Idempotency key {idempotency_key} was already used for job {job['id']} "
+                "with a different payload"
+            )
+        return job, created
+
+    def claim(self, worker_id: str, kinds: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Lease the oldest ready job to a worker.
+
+        Ready jobs are queued jobs whose retry delay has passed, and running
+        jobs whose lease expired. Expired jobs without attempts left fail.
+
+        Args:
+            worker_id: Identity of the claiming worker
+            kinds: Job types the worker handles (default: all)
+
+        Returns:
+            The leased job, or None if no job is ready
+        """
+        now = time.time()
+        kind_filter = ""
+        params: List[Any] = []
+        if kinds:
+            kind_filter = f" AND kind IN ({', '.join('?' for _ in kinds)})"
+            params = list(kinds)
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "UPDATE jobs SET status = ?, error = COALESCE(error, 'Lease expired'), "
+                    "lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                    "WHERE status = ? AND lease_expires < ? AND attempts >= max_attempts",
+                    (FAILED, now, RUNNING, now),
+                )
+                row = connection.execute(
+                    "SELECT id FROM jobs WHERE ((status = ? AND run_after <= ?) "
+                    "OR (status = ? AND lease_expires < ?))" + kind_filter +
+                    " ORDER BY run_after, created_at LIMIT 1",
+                    [QUEUED, now, RUNNING, now] + params,
+                ).fetchone()
+                if row is None:
+                    connection.execute("COMMIT")
+                    return None
+                connection.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, "
+                    "lease_expires = ?, updated_at = ? WHERE id = ?",
+                    (RUNNING, worker_id, now + self.lease_seconds, now, row["id"]),
+                )
+                job = connection.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return self._to_dict(job)
+
+    def _update_leased(self, job_id: str, worker_id: str, assignments: str, params: List[Any]) -> None:
+        with self._connect() as connection:
+            cursor = connection.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                params + [time.time(), job_id, RUNNING, worker_id],
+            )
+        if cursor.rowcount != 1:
+            raise LeaseLost(f"Worker {worker_id} no longer holds the lease on job {job_id}")
+
+    def heartbeat(self, job_id: str, worker_id: str, progress: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Extend a job's lease and record its progress.
+
+        Raises:
+            LeaseLost: If the worker no longer holds the lease
+        """
+        assignments = "lease_expires = ?"
+        params: List[Any] = [time.time() + self.lease_seconds]
+        if progress is not None:
+            assignments += ", progress = ?"
+            params.append(json.dumps(progress, default=str))
+        self._update_leased(job_id, worker_id, assignments, params)
+
+    def complete(self, job_id: str, worker_id: str, result: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Mark a leased job as succeeded.
+
+        Raises:
+            LeaseLost: If the worker no longer holds the lease
+        """
+        self._update_leased(
+            job_id,
+            worker_id,
+            "status = ?, result = ?, error = NULL, lease_owner = NULL, lease_expires = NULL",
+            [SUCCEEDED, json.dumps(result, default=str)],
+        )
+
+    def fail(self, job_id: str, worker_id: str, error: str, attempts: int, max_attempts: int) -> bool:
+        """
+        Record a failed attempt; requeue the job with backoff if it has attempts left.
+
+        Args:
+            job_id: ID of the job
+            worker_id: Identity of the worker holding the lease
+            error: Error message of the attempt
+            attempts: Attempts made so far, including this one
+            max_attempts: Attempts allowed for the job
+
+        Returns:
+            True if the job will be retried, False if it failed for good
+
+        Raises:
+            LeaseLost: If the worker no longer holds the lease
+        """
+        retry = attempts < max_attempts
+        self._update_leased(
+            job_id,
+            worker_id,
+            "status = ?, run_after = ?, error = ?, lease_owner = NULL, lease_expires = NULL",
+            [
+                QUEUED if retry else FAILED,
+                time.time() + self.retry_backoff * 2 ** (attempts - 1),
+                error,
+            ],
+        )
+        return retry
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job, or None if it does not exist."""
+        with self._connect() as connection:
+            row = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row)
+
+    def stats(self) -> dict:
+        """Return the number of jobs per status."""
+        with self._connect() as connection:
+            rows = connection.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["count"] for row in rows}
+
+
+job_queue = JobQueue()
+
+
+def get_job_queue() -> JobQueue:
+    """Return the ingestion job queue."""
+    return job_queue
@@ -0,0 +1,191 @@
+import asyncio
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.data_versions import DataVersions, get_data_versions
+from app.core.vector_store import get_vector_store
+from app.core.weaviate_client import WeaviateClientManager
+
+# Sentinel stored for tenants known not to exist (negative cache)
+ABSENT = None
+
+
+class TenantRegistry:
+    """
+    In-process cache of the tenants of a multi-tenant collection.
+
+    Each entry records the tenant's activity status, or that the tenant does not
+    exist, until its TTL expires. Lookups that miss are resolved with a
+    vector store lookup of just the tenants needed (one bulk lookup for
+    warm-up) instead of listing every tenant. Ingestion and deletion update the registry explicitly,
+    so on the hot path an existence check is a dictionary lookup.
+
+    Tenants are created by worker processes as well, so an absent entry is only
+    served while the tenant's shared data version (see ``DataVersions``) is the
+    one it was recorded at; creating a tenant bumps that version. Concurrent
+    ``ensure`` calls for the same tenant within an event loop share one creation.
+    """
+
+    def __init__(
+        self,
+        collection_name: str = settings.TENANT_KNOWLEDGE_COLLECTION_NAME,
+        ttl: float = settings.TENANT_REGISTRY_TTL,
+        negative_ttl: float = settings.TENANT_REGISTRY_NEGATIVE_TTL,
+        versions: DataVersions = None,
+    ):
+        self.collection_name = collection_name
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.versions = versions or get_data_versions()
+        # tenant -> (status or ABSENT, expiry, data version of an absent tenant)
+        self._entries: Dict[str, Tuple[Optional[str], float, Optional[int]]] = {}
+        self._lock = threading.Lock()
+        # Tenant creations in flight, per event loop
+        self._creating: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self, tenant_id: str, status: Optional[str], version: Optional[int] = None) -> None:
+        if status is ABSENT:
+            ttl = self.negative_ttl
+            if version is None:
+                version = self.versions.get(self.collection_name, tenant_id)
+        else:
+            ttl = self.ttl
+            version = None
+        with self._lock:
+            self._entries[tenant_id] = (status, time.monotonic() + ttl, version)
+
+    def lookup(self, tenant_id: str) -> Tuple[bool, Optional[str]]:
+        """
+        Look a tenant up in the cache only.
+
+        Returns:
+            Tuple of (cache hit, activity status or None if the tenant is absent)
+        """
+        with self._lock:
+            entry = self._entries.get(tenant_id)
+        if entry is not None and entry[0] is ABSENT:
+            if self.versions.get(self.collection_name, tenant_id) != entry[2]:
+                # Created since, possibly by another process
+                entry = None
+        with self._lock:
+            if entry is None or entry[1] < time.monotonic():
+                self.misses += 1
+                return False, ABSENT
+            self.hits += 1
+            return True, entry[0]
+
+    def mark_present(self, tenant_id: str, status: str = "ACTIVE") -> None:
+        """Record that a tenant exists with the given activity status."""
+        self._store(tenant_id, status)
+
+    def mark_absent(self, tenant_id: str) -> None:
+        """Record that a tenant does not exist."""
+        self._store(tenant_id, ABSENT)
+
+    def invalidate(self, tenant_id: Optional[str] = None) -> None:
+        """Drop one tenant, or every tenant when tenant_id is None, from the cache."""
+        with self._lock:
+            if tenant_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(tenant_id, None)
+
+    async def get_status(
+        self, tenant_id: str, weaviate_manager: WeaviateClientManager = None
+    ) -> Optional[str]:
+        """
+        Return the activity status of a tenant, or None if it does not exist.
+
+        Args:
+            tenant_id: ID of the tenant
+            weaviate_manager: Optional Weaviate client manager
+
+        Returns:
+            Activity status name (e.g. "ACTIVE") or None
+        """
+        hit, status = self.lookup(tenant_id)
+        if hit:
+            return status
+        # Read before the lookup, so a tenant created meanwhile is not cached as absent
+        version = self.versions.get(self.collection_name, tenant_id)
+        found = await get_vector_store(weaviate_manager).get_tenants(
+            self.collection_name, [tenant_id]
+        )
+        status = found.get(tenant_id, ABSENT)
+        self._store(tenant_id, status, version)
+        return status
+
+    async def exists(
+        self, tenant_id: str, weaviate_manager: WeaviateClientManager = None
+    ) -> bool:
+        """Return whether a tenant exists."""
+        return await self.get_status(tenant_id, weaviate_manager) is not ABSENT
+
+    async def warm(
+        self, tenant_ids: List[str], weaviate_manager: WeaviateClientManager = None
+    ) -> None:
+        """Resolve several tenants with a single bulk lookup."""
+        missing = [tenant_id for tenant_id in tenant_ids if not self.lookup(tenant_id)[0]]
+        if not missing:
+            return
+        versions = {
+            tenant_id: self.versions.get(self.collection_name, tenant_id) for tenant_id in missing
+        }
+        found = await get_vector_store(weaviate_manager).get_tenants(self.collection_name, missing)
+        for tenant_id in missing:
+            self._store(tenant_id, found.get(tenant_id, ABSENT), versions[tenant_id])
+
+    async def ensure(
+        self, tenant_id: str, weaviate_manager: WeaviateClientManager = None
+    ) -> bool:
+        """
+        Create a tenant if it does not exist.
+
+        Returns:
+            True if the tenant was created by this call, False if it already existed
+            or was created by a concurrent call
+        """
+        creating = self._creating.setdefault(asyncio.get_running_loop(), {})
+        task = creating.get(tenant_id)
+        if task is not None:
+            await asyncio.shield(task)
+            return False
+        if await self.exists(tenant_id, weaviate_manager):
+            return False
+        task = creating.get(tenant_id)
+        if task is not None:
+            # Another caller started creating it while the lookup ran
+            await asyncio.shield(task)
+            return False
+        task = asyncio.create_task(self._create(tenant_id, weaviate_manager))
+        creating[tenant_id] = task
+        task.add_done_callback(lambda _: creating.pop(tenant_id, None))
+        await asyncio.shield(task)
+        return True
+
+    async def _create(self, tenant_id: str, weaviate_manager: WeaviateClientManager) -> None:
+        await get_vector_store(weaviate_manager).create_tenants(self.collection_name, [tenant_id])
+        self.mark_present(tenant_id)
+        # Other processes may have cached the tenant as absent
+        await asyncio.to_thread(self.versions.bump, self.collection_name, tenant_id)
+
+    def stats(self) -> dict:
+        """Return cache size and hit/miss counters."""
+        with self._lock:
+            size = len(self._entries)
+        return {"entries": size, "hits": self.hits, "misses": self.misses}
+
+
+tenant_registry = TenantRegistry()
+
+
+def get_tenant_registry() -> TenantRegistry:
+    """Return the tenant registry instance."""
+    return tenant_registry
@@ -0,0 +1,241 @@
+import asyncio
+import re
+import threading
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from app.core.config import settings
+from app.core.tenant_registry import TenantRegistry, get_tenant_registry
+from app.core.vector_store import VectorStore, get_vector_store
+from app.core.weaviate_client import WeaviateClientManager
+
+# Activity statuses that can serve reads and writes (HOT is the pre-1.26 name)
+ACTIVE_STATUSES = {"ACTIVE", "HOT"}
+
+# Weaviate's message for requests to a tenant that is INACTIVE or OFFLOADED
+_NOT_ACTIVE_ERROR = re.compile(r"tenant.*not active|not active.*tenant", re.IGNORECASE | re.DOTALL)
+
+T = TypeVar("T")
+
+
+def is_tenant_not_active_error(error) -> bool:
+    """Return whether an exception or error message reports that a tenant is not active."""
+    return bool(_NOT_ACTIVE_ERROR.search(str(error)))
+
+
+class TenantTieringManager:
+    """
+    Keeps only the working set of tenants active in the vector store.
+
+    Every retrieval and ingestion records an access for its tenant. A background
+    sweep deactivates tenants that have been idle for longer than ``idle_seconds``
+    (to INACTIVE, or OFFLOADED when an offload module is configured) and records
+    how many tenants sit in each tier. Accessing a tenant that is not active
+    reactivates it and waits, up to ``activation_timeout`` seconds, until it can
+    serve requests again.
+
+    Access times are tracked per process, so a sweep may deactivate a tenant
+    that another process, e.g. an ingestion worker, is using and still has
+    cached as active. Requests that fail because the tenant is not active are
+    retried once through ``run_active``, which reactivates the tenant.
+    """
+
+    def __init__(
+        self,
+        registry: TenantRegistry = None,
+        idle_seconds: float = settings.TENANT_TIERING_IDLE_SECONDS,
+        sweep_interval: float = settings.TENANT_TIERING_SWEEP_INTERVAL,
+        cold_status: str = settings.TENANT_TIERING_COLD_STATUS,
+        activation_timeout: float = settings.TENANT_ACTIVATION_TIMEOUT,
+    ):
+        self.registry = registry or get_tenant_registry()
+        self.idle_seconds = idle_seconds
+        self.sweep_interval = sweep_interval
+        self.cold_status = cold_status
+        self.activation_timeout = activation_timeout
+        self._last_access: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._tiers: Dict[str, int] = {}
+        self._tiers_updated_at: Optional[float] = None
+        self.activations = 0
+        self.deactivations = 0
+
+    def touch(self, tenant_id: str) -> None:
+        """Record an access to a tenant."""
+        with self._lock:
+            self._last_access[tenant_id] = time.time()
+
+    def forget(self, tenant_id: str) -> None:
+        """Stop tracking a tenant, e.g. after it was deleted."""
+        with self._lock:
+            self._last_access.pop(tenant_id, None)
+
+    async def ensure_active(
+        self, tenant_id: str, weaviate_manager: WeaviateClientManager = None
+    ) -> bool:
+        """
+        Record an access and make sure the tenant can serve requests.
+
+        Args:
+            tenant_id: ID of the tenant
+            weaviate_manager: Optional Weaviate client manager
+
+        Returns:
+            False if the tenant does not exist, True once it is active
+
+        Raises:
+            TimeoutError: If the tenant did not become active within activation_timeout
+        """
+        status = await self.registry.get_status(tenant_id, weaviate_manager)
+        if status is None:
+            return False
+        self.touch(tenant_id)
+        if status not in ACTIVE_STATUSES:
+            await self._activate(tenant_id, get_vector_store(weaviate_manager))
+        return True
+
+    async def reactivate(
+        self, tenant_id: str, weaviate_manager: WeaviateClientManager = None
+    ) -> bool:
+        """
+        Reactivate a tenant that a request found not active although the registry had it active.
+
+        Args:
+            tenant_id: ID of the tenant
+            weaviate_manager: Optional Weaviate client manager
+
+        Returns:
+            False if the tenant does not exist, True once it is active
+        """
+        # Deactivated by another process's sweep; the cached status is outdated
+        self.registry.invalidate(tenant_id)
+        return await self.ensure_active(tenant_id, weaviate_manager)
+
+    async def run_active(
+        self,
+        tenant_id: str,
+        operation: Callable[[], Awaitable[T]],
+        weaviate_manager: WeaviateClientManager = None,
+    ) -> T:
+        """
+        Run a request against a tenant, retrying it once if the tenant was deactivated meanwhile.
+
+        Args:
+            tenant_id: ID of the tenant
+            operation: Coroutine function running the request
+            weaviate_manager: Optional Weaviate client manager
+
+        Returns:
+            The result of the request
+        """
+        try:
+            return await operation()
+        except Exception as e:
+            if not is_tenant_not_active_error(e):
+                raise
+        await self.reactivate(tenant_id, weaviate_manager)
+        return await operation()
+
+    async def _activate(self, tenant_id: str, vector_store: VectorStore) -> None:
+        print(f"Reactivating tenant {tenant_id}")
+        collection_name = self.registry.collection_name
+        await vector_store.set_tenant_status(collection_name, [tenant_id], "ACTIVE")
+        self.activations += 1
+
+        # Offloaded tenants pass through ONLOADING before they are usable
+        deadline = time.monotonic() + self.activation_timeout
+        delay = 0.1
+        while True:
+            status = (await vector_store.get_tenants(collection_name, [tenant_id])).get(tenant_id)
+            if status in ACTIVE_STATUSES:
+                self.registry.mark_present(tenant_id, status)
+                return
+            if time.monotonic() >= deadline:
+                self.registry.invalidate(tenant_id)
+                raise TimeoutError(
+                    f"Tenant {tenant_id} did not become active within {self.activation_timeout}s"
+                )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 2.0)
+
+    async def sweep(self, weaviate_manager: WeaviateClientManager = None) -> Dict[str, int]:
+        """
+        Count tenants per tier and deactivate the ones idle past the threshold.
+
+        Returns:
+            Number of tenants per activity status after the sweep
+        """
+        vector_store = get_vector_store(weaviate_manager)
+        collection_name = self.registry.collection_name
+        tenants = await vector_store.get_tenants(collection_name)
+
+        now = time.time()
+        idle: List[str] = []
+        tiers: Counter = Counter()
+        with self._lock:
+            for name, status in tenants.items():
+                if status in ACTIVE_STATUSES:
+                    # Tenants not seen by this process start their idle clock now
+                    last_access = self._last_access.setdefault(name, now)
+                    if settings.TENANT_TIERING_ENABLED and now - last_access > self.idle_seconds:
+                        idle.append(name)
+                        status = self.cold_status
+                tiers[status] += 1
+            for name in set(self._last_access) - set(tenants):
+                del self._last_access[name]
+
+        if idle:
+            print(f"Deactivating {len(idle)} idle tenants to {self.cold_status}")
+            await vector_store.set_tenant_status(collection_name, idle, self.cold_status)
+            for name in idle:
+                self.registry.mark_present(name, self.cold_status)
+            self.deactivations += len(idle)
+
+        self._tiers = dict(tiers)
+        self._tiers_updated_at = now
+        return self._tiers
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"Error sweeping tenant tiers: {str(e)}")
+
+    def start(self) -> None:
+        """Start the background sweep on the running event loop, if tiering is enabled."""
+        # Without tiering the sweep would only count tiers; GET /tenant/tiers counts on request
+        if settings.TENANT_TIERING_ENABLED and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background sweep."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        """Return tenant counts per tier and tiering counters."""
+        return {
+            "enabled": settings.TENANT_TIERING_ENABLED,
+            "tiers": self._tiers,
+            "tiers_updated_at": self._tiers_updated_at,
+            "tracked_tenants": len(self._last_access),
+            "activations": self.activations,
+            "deactivations": self.deactivations,
+        }
+
+
+tenant_tiering_manager = TenantTieringManager()
+
+
+def get_tenant_tiering_manager() -> TenantTieringManager:
+    """Return the tenant tiering manager instance."""
+    return tenant_tiering_manager
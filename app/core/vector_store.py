@@ -0,0 +1,451 @@
+import asyncio
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from weaviate.classes.query import Filter, MetadataQuery, QueryNested
+from weaviate.classes.tenants import Tenant, TenantActivityStatus
+
+from app.core.config import settings
+from app.core.weaviate_client import (
+    WeaviateClientManager,
+    create_required_collections,
+    get_weaviate_manager,
+)
+
+# Operators a PropertyFilter supports, in both backends
+FILTER_OPERATORS = ("Equal", "NotEqual", "GreaterThan", "LessThan", "ContainsAny", "ContainsAll")
+
+# Nested properties of the object properties in the collection schemas (see
+# create_required_collections); Weaviate only returns the nested properties asked for
+OBJECT_PROPERTIES = {"metadata": ["source_id"]}
+
+
+@dataclass
+class StoredObject:
+    """An object read back from a vector store."""
+
+    uuid: str
+    properties: Dict[str, Any]
+    vector: Optional[Any] = None
+    distance: Optional[float] = None  # Cosine distance to the query, for searches
+    creation_time: Optional[datetime] = None
+    last_update_time: Optional[datetime] = None
+
+
+@dataclass
+class PropertyFilter:
+    """Condition on a top-level property. A list of filters matches objects meeting all of them."""
+
+    property: str
+    operator: str  # One of FILTER_OPERATORS
+    value: Any
+
+
+class VectorStore(ABC):
+    """
+    Storage of vectors and their properties, by collection and tenant.
+
+    Collections with multi-tenancy take a ``tenant_id`` on every object
+    operation; other collections take None. Tenant activity statuses use
+    Weaviate's names ("ACTIVE", "INACTIVE", "OFFLOADED", ...). Distances are
+    cosine distances, so a similarity score is ``1 - distance``.
+    """
+
+    name: str
+
+    @abstractmethod
+    async def prepare(self) -> None:
+        """Create the required collections and check their embedding dimensions."""
+
+    @abstractmethod
+    async def get_tenants(
+        self, collection_name: str, tenant_ids: Optional[List[str]] = None
+    ) -> Dict[str, str]:
+        """
+        Look tenants up.
+
+        Args:
+            collection_name: Multi-tenant collection
+            tenant_ids: Tenants to look up, or None for every tenant
+
+        Returns:
+            Activity status by tenant name, for the tenants that exist
+        """
+
+    @abstractmethod
+    async def create_tenants(self, collection_name: str, tenant_ids: List[str]) -> None:
+        """Create tenants, leaving existing ones untouched."""
+
+    @abstractmethod
+    async def set_tenant_status(self, collection_name: str, tenant_ids: List[str], status: str) -> None:
+        """Change the activity status of tenants."""
+
+    @abstractmethod
+    async def delete_tenant(self, collection_name: str, tenant_id: str) -> None:
+        """Delete a tenant and all of its objects."""
+
+    @abstractmethod
+    async def insert_batch(
+        self, collection_name: str, objects: List[Dict], tenant_id: Optional[str] = None
+    ) -> Dict[str, str]:
+        """
+        Insert objects.
+
+        Args:
+            collection_name: Collection to insert into
+            objects: Dicts with "uuid", "properties" and "vector"
+            tenant_id: Tenant to insert into, created if missing
+
+        Returns:
+            Mapping of failed object UUIDs to their error message
+        """
+
+    @abstractmethod
+    async def update(
+        self,
+        collection_name: str,
+        uuid: str,
+        properties: Dict[str, Any],
+        vector=None,
+        tenant_id: Optional[str] = None,
+    ) -> None:
+        """Merge properties into an object and optionally replace its vector."""
+
+    @abstractmethod
+    async def get(
+        self, collection_name: str, uuid: str, tenant_id: Optional[str] = None
+    ) -> Optional[StoredObject]:
+        """Fetch one object by UUID, or None if it does not exist."""
+
+    @abstractmethod
+    async def delete(
+        self, collection_name: str, uuids: List[str], tenant_id: Optional[str] = None
+    ) -> None:
+        """Delete objects by UUID. Unknown UUIDs are ignored."""
+
+    @abstractmethod
+    async def search(
+        self,
+        collection_name: str,
+        vector,
+        limit: int,
+        tenant_id: Optional[str] = None,
+        max_distance: Optional[float] = None,
+        filters: Optional[List[PropertyFilter]] = None,
+        return_properties: Optional[Sequence[str]] = None,
+        include_vector: bool = False,
+    ) -> List[StoredObject]:
+        """
+        Find the objects nearest to a vector.
+
+        Args:
+            collection_name: Collection to search
+            vector: Query vector
+            limit: Maximum number of results
+            tenant_id: Tenant to search in multi-tenant collections
+            max_distance: Only return objects at most this cosine distance away
+            filters: Conditions the objects must meet
+            return_properties: Properties to return, or None for all
+            include_vector: Whether to return each object's vector
+
+        Returns:
+            Objects with their distance, nearest first
+        """
+
+    @abstractmethod
+    async def fetch(
+        self,
+        collection_name: str,
+        limit: int,
+        tenant_id: Optional[str] = None,
+        after: Optional[str] = None,
+        filters: Optional[List[PropertyFilter]] = None,
+        return_properties: Optional[Sequence[str]] = None,
+        include_vector: bool = False,
+    ) -> List[StoredObject]:
+        """
+        List objects in UUID order, one page at a time.
+
+        Args:
+            collection_name: Collection to list
+            limit: Page size
+            tenant_id: Tenant to list in multi-tenant collections
+            after: UUID of the last object of the previous page (cursor); not combinable with filters
+            filters: Conditions the objects must meet
+            return_properties: Properties to return, or None for all; object properties are returned whole
+            include_vector: Whether to return each object's vector
+
+        Returns:
+            Up to ``limit`` objects
+        """
+
+    @abstractmethod
+    async def count(self, collection_name: str, tenant_id: Optional[str] = None) -> int:
+        """Number of objects in a collection or tenant."""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Return backend counters."""
+
+    def close(self) -> None:
+        """Release the backend's resources."""
+        return None
+
+
+def _weaviate_filter(filters: Optional[List[PropertyFilter]]):
+    if not filters:
+        return None
+    conditions = []
+    for condition in filters:
+        prop = Filter.by_property(condition.property)
+        if condition.operator == "Equal":
+            conditions.append(prop.equal(condition.value))
+        elif condition.operator == "NotEqual":
+            conditions.append(prop.not_equal(condition.value))
+        elif condition.operator == "GreaterThan":
+            conditions.append(prop.greater_than(condition.value))
+        elif condition.operator == "LessThan":
+            conditions.append(prop.less_than(condition.value))
+        elif condition.operator == "ContainsAny":
+            conditions.append(prop.contains_any(condition.value))
+        elif condition.operator == "ContainsAll":
+            conditions.append(prop.contains_all(condition.value))
+        else:
+            raise ValueError(f"Unsupported operator: {condition.operator}")
+    return Filter.all_of(conditions)
+
+
+def _weaviate_return_properties(return_properties: Optional[Sequence[str]]) -> Optional[list]:
+    if return_properties is None:
+        return None
+    return [
+        QueryNested(name=name, properties=OBJECT_PROPERTIES[name]) if name in OBJECT_PROPERTIES else name
+        for name in return_properties
+    ]
+
+
+def _weaviate_status(tenant) -> str:
+    status = getattr(tenant, "activity_status", None)
+    return getattr(status, "value", None) or "ACTIVE"
+
+
+def _from_weaviate(obj) -> StoredObject:
+    vector = obj.vector.get("default") if isinstance(obj.vector, dict) else obj.vector
+    metadata = obj.metadata
+    return StoredObject(
+        uuid=str(obj.uuid),
+        properties=obj.properties,
+        vector=vector,
+        distance=getattr(metadata, "distance", None),
+        creation_time=getattr(metadata, "creation_time", None),
+        last_update_time=getattr(metadata, "last_update_time", None),
+    )
+
+
+def _insert_weaviate_batch(
+    client, collection_name: str, tenant_id: Optional[str], objects: List[Dict]
+) -> Dict[str, str]:
+    """Insert objects through Weaviate's server-side batch import."""
+    collection = client.collections.get(collection_name)
+    if tenant_id is not None:
+        collection = collection.with_tenant(tenant_id)
+    if settings.WEAVIATE_BATCH_MODE == "dynamic":
+        batching = collection.batch.dynamic()
+    else:
+        batching = collection.batch.fixed_size(
+            batch_size=settings.WEAVIATE_BATCH_SIZE,
+            concurrent_requests=settings.WEAVIATE_BATCH_CONCURRENCY,
+        )
+    with batching as batch:
+        for obj in objects:
+            batch.add_object(
+                properties=obj["properties"],
+                vector=obj["vector"],
+                uuid=obj["uuid"],
+            )
+    return {
+        str(failed.object_.uuid): failed.message
+        for failed in collection.batch.failed_objects
+    }
+
+
+class WeaviateVectorStore(VectorStore):
+    """Vector store backed by a Weaviate cluster, through the pooled client manager."""
+
+    name = "weaviate"
+
+    def __init__(self, weaviate_manager: WeaviateClientManager):
+        self.weaviate_manager = weaviate_manager
+
+    def _collection(self, client, collection_name: str, tenant_id: Optional[str] = None):
+        collection = client.collections.get(collection_name)
+        return collection.with_tenant(tenant_id) if tenant_id is not None else collection
+
+    async def prepare(self) -> None:
+        await asyncio.to_thread(create_required_collections, self.weaviate_manager)
+
+    async def get_tenants(
+        self, collection_name: str, tenant_ids: Optional[List[str]] = None
+    ) -> Dict[str, str]:
+        def lookup(client):
+            tenants = client.collections.get(collection_name).tenants
+            if tenant_ids is None:
+                return tenants.get()
+            if len(tenant_ids) == 1:
+                tenant = tenants.get_by_name(tenant_ids[0])
+                return {} if tenant is None else {tenant_ids[0]: tenant}
+            return tenants.get_by_names(tenant_ids)
+
+        found = await self.weaviate_manager.run(lookup)
+        return {name: _weaviate_status(tenant) for name, tenant in found.items() if tenant is not None}
+
+    async def create_tenants(self, collection_name: str, tenant_ids: List[str]) -> None:
+        await self.weaviate_manager.run(
+            lambda client: client.collections.get(collection_name).tenants.create(
+                tenants=[Tenant(name=tenant_id) for tenant_id in tenant_ids]
+            )
+        )
+
+    async def set_tenant_status(self, collection_name: str, tenant_ids: List[str], status: str) -> None:
+        await self.weaviate_manager.run(
+            lambda client: client.collections.get(collection_name).tenants.update(
+                tenants=[
+                    Tenant(name=tenant_id, activity_status=TenantActivityStatus(status))
+                    for tenant_id in tenant_ids
+                ]
+            )
+        )
+
+    async def delete_tenant(self, collection_name: str, tenant_id: str) -> None:
+        await self.weaviate_manager.run(
+            lambda client: client.collections.get(collection_name).tenants.remove(tenant_id)
+        )
+
+    async def insert_batch(
+        self, collection_name: str, objects: List[Dict], tenant_id: Optional[str] = None
+    ) -> Dict[str, str]:
+        return await self.weaviate_manager.run(
+            _insert_weaviate_batch, collection_name, tenant_id, objects
+        )
+
+    async def update(
+        self,
+        collection_name: str,
+        uuid: str,
+        properties: Dict[str, Any],
+        vector=None,
+        tenant_id: Optional[str] = None,
+    ) -> None:
+        await self.weaviate_manager.run(
+            lambda client: self._collection(client, collection_name, tenant_id).data.update(
+                uuid=uuid, properties=properties, vector=vector
+            )
+        )
+
+    async def get(
+        self, collection_name: str, uuid: str, tenant_id: Optional[str] = None
+    ) -> Optional[StoredObject]:
+        obj = await self.weaviate_manager.run(
+            lambda client: self._collection(client, collection_name, tenant_id).query.fetch_object_by_id(
+                uuid
+            )
+        )
+        return _from_weaviate(obj) if obj is not None else None
+
+    async def delete(
+        self, collection_name: str, uuids: List[str], tenant_id: Optional[str] = None
+    ) -> None:
+        if not uuids:
+            return
+
+        def delete_objects(client):
+            data = self._collection(client, collection_name, tenant_id).data
+            if len(uuids) == 1:
+                data.delete_by_id(uuids[0])
+                return
+            # Weaviate deletes at most QUERY_MAXIMUM_RESULTS objects per request
+            batch_size = settings.WEAVIATE_DELETE_BATCH_SIZE
+            for start in range(0, len(uuids), batch_size):
+                batch = list(uuids[start : start + batch_size])
+                result = data.delete_many(where=Filter.by_id().contains_any(batch))
+                if result.failed:
+                    raise RuntimeError(
+                        f"Failed to delete {result.failed} of {len(batch)} objects from {collection_name}"
+                    )
+
+        await self.weaviate_manager.run(delete_objects)
+
+    async def search(
+        self,
+        collection_name: str,
+        vector,
+        limit: int,
+        tenant_id: Optional[str] = None,
+        max_distance: Optional[float] = None,
+        filters: Optional[List[PropertyFilter]] = None,
+        return_properties: Optional[Sequence[str]] = None,
+        include_vector: bool = False,
+    ) -> List[StoredObject]:
+        response = await self.weaviate_manager.run(
+            lambda client: self._collection(client, collection_name, tenant_id).query.near_vector(
+                near_vector=vector,
+                limit=limit,
+                distance=max_distance,
+                filters=_weaviate_filter(filters),
+                return_properties=_weaviate_return_properties(return_properties),
+                return_metadata=MetadataQuery(distance=True),
+                include_vector=include_vector,
+            )
+        )
+        return [_from_weaviate(obj) for obj in response.objects]
+
+    async def fetch(
+        self,
+        collection_name: str,
+        limit: int,
+        tenant_id: Optional[str] = None,
+        after: Optional[str] = None,
+        filters: Optional[List[PropertyFilter]] = None,
+        return_properties: Optional[Sequence[str]] = None,
+        include_vector: bool = False,
+    ) -> List[StoredObject]:
+        response = await self.weaviate_manager.run(
+            lambda client: self._collection(client, collection_name, tenant_id).query.fetch_objects(
+                limit=limit,
+                after=after,
+                filters=_weaviate_filter(filters),
+                return_properties=_weaviate_return_properties(return_properties),
+                return_metadata=MetadataQuery(creation_time=True, last_update_time=True),
+                include_vector=include_vector,
+            )
+        )
+        return [_from_weaviate(obj) for obj in response.objects]
+
+    async def count(self, collection_name: str, tenant_id: Optional[str] = None) -> int:
+        return await self.weaviate_manager.run(
+            lambda client: self._collection(client, collection_name, tenant_id)
+            .aggregate.over_all(total_count=True)
+            .total_count
+        )
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "pool": self.weaviate_manager.stats()}
+
+
+def get_vector_store(weaviate_manager: WeaviateClientManager = None) -> VectorStore:
+    """
+    Return the vector store selected by VECTOR_STORE.
+
+    Args:
+        weaviate_manager: Weaviate client manager to use with the Weaviate backend
+
+    Returns:
+        The configured vector store
+    """
+    if settings.VECTOR_STORE == "embedded":
+        from app.core.embedded_vector_store import get_embedded_vector_store
+
+        return get_embedded_vector_store()
+    return WeaviateVectorStore(weaviate_manager or get_weaviate_manager())
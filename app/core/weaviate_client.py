@@ -1,11 +1,28 @@
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from queue import Empty, LifoQueue
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
 import weaviate
 from app.core.config import settings
+from app.core.embedding_dimensions import (
+    configured_dimensions,
+    describe_dimensions,
+    record_collection_dimensions,
+)
 from weaviate.auth import Auth
 from weaviate.classes.init import AdditionalConfig, Timeout
 from weaviate.classes.config import Configure, Property, DataType
 
-def get_weaviate_client():
-    """Return the Weaviate client instance."""
+T = TypeVar("T")
+
+
+def connect_weaviate_client() -> weaviate.WeaviateClient:
+    """Open a new connection to the Weaviate cluster."""
     client = weaviate.connect_to_weaviate_cloud(
         cluster_url=settings.WEAVIATE_URL,
         auth_credentials=Auth.api_key(settings.WEAVIATE_API_KEY),
@@ -18,178 +35,269 @@ def get_weaviate_client():
     print('\033[42m\033[30mweaviate client connected \033[0m');
     return client;
 
-def create_required_collections():
-    client = get_weaviate_client();
+
+class WeaviateClientManager:
+    """
+    Process-wide, bounded pool of long-lived Weaviate clients.
+
+    Clients are created lazily up to ``pool_size`` and handed out through
+    ``checkout()``. Idle clients are health checked before reuse when they have
+    not been used for ``health_check_interval`` seconds, and broken clients are
+    replaced with a fresh connection transparently.
+
+    The Weaviate SDK calls are synchronous, so async code goes through ``run()``,
+    which executes the call on a dedicated executor sized to the pool. The event
+    loop is never blocked and up to ``pool_size`` calls overlap.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = settings.WEAVIATE_POOL_SIZE,
+        checkout_timeout: float = settings.WEAVIATE_POOL_TIMEOUT,
+        health_check_interval: float = settings.WEAVIATE_HEALTH_CHECK_INTERVAL,
+        connect_retries: int = settings.WEAVIATE_CONNECT_RETRIES,
+    ):
+        self.pool_size = pool_size
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        self.connect_retries = connect_retries
+        # Idle clients together with the last time they were known to be healthy
+        self._idle: LifoQueue = LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._clients: set = set()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix="weaviate"
+        )
+
+    def _connect(self) -> weaviate.WeaviateClient:
+        """Open a new client, retrying with backoff on connection errors."""
+        attempt = 0
+        while True:
+            try:
+                client = connect_weaviate_client()
+                break
+            except Exception as e:
+                attempt += 1
+                if attempt > self.connect_retries:
+                    raise
+                print(f"Error connecting to Weaviate (attempt {attempt}): {str(e)}")
+                time.sleep(min(2 ** attempt, 10))
+        with self._lock:
+            self._clients.add(client)
+        return client
+
+    def _discard(self, client: weaviate.WeaviateClient) -> None:
+        with self._lock:
+            self._clients.discard(client)
+        try:
+            client.close()
+        except Exception as e:
+            print(f"Error closing Weaviate client: {str(e)}")
+
+    def _is_healthy(self, client: weaviate.WeaviateClient, checked_at: float) -> bool:
+        if not client.is_connected():
+            return False
+        if time.monotonic() - checked_at < self.health_check_interval:
+            return True
+        try:
+            return client.is_live()
+        except Exception:
+            return False
+
+    def _acquire(self, timeout: Optional[float]) -> weaviate.WeaviateClient:
+        if self._closed:
+            raise RuntimeError("Weaviate client manager is closed")
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(
+                f"Timed out waiting for a Weaviate client (pool size {self.pool_size})"
+            )
+        try:
+            while True:
+                try:
+                    client, checked_at = self._idle.get_nowait()
+                except Empty:
+                    return self._connect()
+                if self._is_healthy(client, checked_at):
+                    return client
+                print("Discarding unhealthy Weaviate client")
+                self._discard(client)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, client: weaviate.WeaviateClient, failed: bool) -> None:
+        if self._closed:
+            self._discard(client)
+        else:
+            # A failed call forces a health check on next checkout
+            self._idle.put((client, 0.0 if failed else time.monotonic()))
+        self._slots.release()
+
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None) -> Iterator[weaviate.WeaviateClient]:
+        """
+        Borrow a connected client from the pool.
+
+        Args:
+            timeout: Seconds to wait for a free client (default: checkout_timeout)
+
+        Yields:
+            A connected Weaviate client that is returned to the pool on exit
+        """
+        client = self._acquire(self.checkout_timeout if timeout is None else timeout)
+        failed = False
+        try:
+            yield client
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self._release(client, failed)
+
+    def _run_with_client(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self.checkout() as client:
+            return fn(client, *args, **kwargs)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking Weaviate call on a pooled client without blocking the event loop.
+
+        Args:
+            fn: Callable invoked as fn(client, *args, **kwargs)
+
+        Returns:
+            The return value of fn
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            functools.partial(self._run_with_client, fn, *args, **kwargs),
+        )
+
+    def stats(self) -> dict:
+        """Return the current pool occupancy."""
+        return {
+            "pool_size": self.pool_size,
+            "open": len(self._clients),
+            "idle": self._idle.qsize(),
+        }
+
+    def close(self) -> None:
+        """Close every pooled client."""
+        self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        while True:
+            try:
+                client, _ = self._idle.get_nowait()
+            except Empty:
+                break
+            self._discard(client)
+        print('\033[41m\033[30mweaviate clients closed \033[0m')
+
+
+weaviate_manager: Optional[WeaviateClientManager] = None
+
+
+def init_weaviate_manager() -> WeaviateClientManager:
+    """Create the process-wide client manager. Called from the app lifespan."""
+    global weaviate_manager
+    if weaviate_manager is None:
+        weaviate_manager = WeaviateClientManager()
+    return weaviate_manager
+
+
+def close_weaviate_manager() -> None:
+    """Close the process-wide client manager. Called from the app lifespan."""
+    global weaviate_manager
+    if weaviate_manager is not None:
+        weaviate_manager.close()
+        weaviate_manager = None
+
+
+def get_weaviate_manager() -> WeaviateClientManager:
+    """Return the Weaviate client manager (FastAPI dependency)."""
+    if weaviate_manager is None:
+        return init_weaviate_manager()
+    return weaviate_manager
+
+
+def create_required_collections(weaviate_manager: WeaviateClientManager = None):
+    if weaviate_manager is None:
+        weaviate_manager = get_weaviate_manager()
+    with weaviate_manager.checkout() as client:
+        _create_required_collections(client)
+
+
+def _create_required_collections(client: weaviate.WeaviateClient):
     try:
         collections = client.collections.list_all()
         collection_names = [collection for collection in collections]
 
         if settings.TENANT_KNOWLEDGE_COLLECTION_NAME not in collection_names:
             print(f"Creating collection: {settings.TENANT_KNOWLEDGE_COLLECTION_NAME}")
+            if (settings.EMBEDDING_PROVIDER or settings.AI_AGENT_PROVIDER) == "local":
+                vectorizer_config = Configure.Vectorizer.none()
+            else:
+                vectorizer_config = Configure.Vectorizer.text2vec_openai(
+                    model=settings.EMBEDDING_MODEL,
+                    dimensions=settings.EMBEDDING_DIMENSIONS,
+                    base_url="https://api.openai.com",
+                    vectorize_collection_name=False,  # Equivalent to "Vectorize class name" being disabled
+                )
             # Create the collection with the specified settings
             client.collections.create(
                 name=settings.TENANT_KNOWLEDGE_COLLECTION_NAME,
-                vectorizer_config=Configure.Vectorizer.text2vec_openai(
-                    model="text-embedding-3-small",
-                        base_url="https://api.openai.com",
-                        vectorize_collection_name=False,  # Equivalent to "Vectorize class name" being disabled
+                # Records the vector dimension the collection is created for
+                description=describe_dimensions(configured_dimensions()),
+                vectorizer_config=vectorizer_config,
+                properties=[
+                    Property(
+                        name="content", data_type=DataType.TEXT, vectorize=True
                     ),
-                    properties=[
-                        Property(
-                            name="content", data_type=DataType.TEXT, vectorize=True
-                        ),
-                        Property(
-                            name="knowledge_type",
-                            data_type=DataType.TEXT,
-                            vectorize=False,
-                        ),
-                        Property(
-                            name="source", data_type=DataType.TEXT, vectorize=False
-                        ),
-                        Property(
-                            name="metadata",
-                            data_type=DataType.OBJECT,
-                            vectorize=False,
-                            nested_properties=[
-                                Property(
-                                    name="source_id", data_type=DataType.TEXT, vectorize=False
-                                ),
-                            ],
-                        ),
-                    ],
-                    multi_tenancy_config=Configure.multi_tenancy(
-                        enabled=True,
-                        auto_tenant_creation=True
-                    ),  # Multi-tenancy disabled
-                )
+                    Property(
+                        name="knowledge_type",
+                        data_type=DataType.TEXT,
+                        vectorize=False,
+                    ),
+                    Property(
+                        name="source", data_type=DataType.TEXT, vectorize=False
+                    ),
+                    Property(
+                        name="content_hash", data_type=DataType.TEXT, skip_vectorization=True
+                    ),
+                    Property(
+                        name="metadata",
+                        data_type=DataType.OBJECT,
+                        vectorize=False,
+                        nested_properties=[
+                            Property(
+                                name="source_id", data_type=DataType.TEXT, vectorize=False
+                            ),
+                        ],
+                    ),
+                ],
+                multi_tenancy_config=Configure.multi_tenancy(
+                    enabled=True,
+                    auto_tenant_creation=True
+                ),
+            )
             print(f"Collection {settings.TENANT_KNOWLEDGE_COLLECTION_NAME} created successfully")
         else:
             print(f"Collection {settings.TENANT_KNOWLEDGE_COLLECTION_NAME} already exists")
+            # Collections created before chunks carried a content hash lack the property
+            collection = client.collections.get(settings.TENANT_KNOWLEDGE_COLLECTION_NAME)
+            if "content_hash" not in {prop.name for prop in collection.config.get().properties}:
+                collection.config.add_property(
+                    Property(name="content_hash", data_type=DataType.TEXT, skip_vectorization=True)
+                )
+                print(f"Added property content_hash to {settings.TENANT_KNOWLEDGE_COLLECTION_NAME}")
+
+        # Refuse to start when the configured embeddings do not fit the collections
+        record_collection_dimensions(client, settings.TENANT_KNOWLEDGE_COLLECTION_NAME)
+        record_collection_dimensions(client, settings.GENERAL_KNOWLEDGE_COLLECTION_NAME)
 
     except Exception as e:
         print(f"Error ensuring collections exist: {str(e)}")
         raise
-    finally:
-        client.close();
-        print('\033[41m\033[30mweaviate client closed \033[0m');
-
-# class WeaviateClientManager:
-#     def __init__(self):
-#         self.client = None
-#         self.retry_count = 0
-#         self.is_ready = False
-
-#     async def connect(self):
-#         print("Connecting to Weaviate")
-#         """Initialize and connect the Weaviate client."""
-#         try:
-#             if(self.client is None):
-#                 self.client = weaviate.connect_to_weaviate_cloud(
-#                     cluster_url=settings.WEAVIATE_URL,
-#                     auth_credentials=Auth.api_key(settings.WEAVIATE_API_KEY),
-#                     skip_init_checks=True,
-#                     additional_config=AdditionalConfig(
-#                     timeout=Timeout(init=30, query=60, insert=120)  # Values in seconds
-#                 ),
-#             )
-#             self.client.connect()
-#             await self.ensure_collections_exist()
-#             self.is_ready = True
-#             print(f"Weaviate client ready: {self.client.is_ready()}")
-#             return self.client
-#         except Exception as e:
-#             print(f"Error connecting to Weaviate: {str(e)}")
-#             raise
-
-#     async def ensure_collections_exist(self):
-#         """Ensure required collections exist, create them if they don't."""
-#         try:
-#             collections = self.client.collections.list_all()
-#             collection_names = [collection for collection in collections]
-
-#             if TENANT_KNOWLEDGE_COLLECTION_NAME not in collection_names:
-#                 print(f"Creating collection: {TENANT_KNOWLEDGE_COLLECTION_NAME}")
-#                 # Create the collection with the specified settings
-#                 self.client.collections.create(
-#                     name=TENANT_KNOWLEDGE_COLLECTION_NAME,
-#                     vectorizer_config=Configure.Vectorizer.text2vec_openai(
-#                         model="text-embedding-3-small",
-#                         base_url="https://api.openai.com",
-#                         vectorize_collection_name=False,  # Equivalent to "Vectorize class name" being disabled
-#                     ),
-#                     properties=[
-#                         Property(
-#                             name="content", data_type=DataType.TEXT, vectorize=True
-#                         ),
-#                         Property(
-#                             name="knowledge_type",
-#                             data_type=DataType.TEXT,
-#                             vectorize=False,
-#                         ),
-#                         Property(
-#                             name="source", data_type=DataType.TEXT, vectorize=False
-#                         ),
-#                         Property(
-#                             name="metadata",
-#                             data_type=DataType.OBJECT,
-#                             vectorize=False,
-#                             nested_properties=[
-#                                 Property(
-#                                     name="source_id", data_type=DataType.TEXT, vectorize=False
-#                                 ),
-#                             ],
-#                         ),
-#                     ],
-#                     multi_tenancy_config=Configure.multi_tenancy(
-#                         enabled=True
-#                     ),  # Multi-tenancy disabled
-#                 )
-#                 print(
-#                     f"Collection {TENANT_KNOWLEDGE_COLLECTION_NAME} created successfully"
-#                 )
-#             else:
-#                 print(f"Collection {TENANT_KNOWLEDGE_COLLECTION_NAME} already exists")
-
-#         except Exception as e:
-#             print(f"Error ensuring collections exist: {str(e)}")
-#             raise
-
-#     def close(self):
-#         """Close the Weaviate client connection."""
-#         if self.client:
-#             self.client.close()
-#             self.is_ready = False
-
-#     def get_client(self):
-#         """Return the Weaviate client instance."""
-#         if not self.client:
-#             while self.retry_count < MAX_RETRY_COUNT:
-#                 try:
-#                     self.connect()
-#                     if self.client:
-#                         break
-#                 except Exception as e:
-#                     self.retry_count += 1
-#                     print(f"Error connecting to Weaviate: {str(e)}")
-#             if not self.client:
-#                 raise RuntimeError(
-#                     "Weaviate client not initialized. Call connect() first."
-#                 )
-#         return self.client
-
-# def initialize_weaviate_manager():
-#     global weaviate_manager
-#     weaviate_manager = WeaviateClientManager()
-#     asyncio.run(weaviate_manager.connect())
-#     sleep(2)
-#     weaviate_manager.close()
-#     return weaviate_manager
-
-# # Dependency to get the Weaviate client
-# def get_weaviate_client():
-#     client = weaviate_manager.get_client()
-#     print(client.is_ready())
-#     if not client.is_ready():
-#         print("Reconnecting to Weaviate")
-#         weaviate_manager.connect()
-#     return client
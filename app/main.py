@@ -1,5 +1,4 @@
 from contextlib import asynccontextmanager
-from app.core import weaviate_client
 import sentry_sdk
 from fastapi import FastAPI
 from fastapi.routing import APIRoute
@@ -7,7 +6,12 @@ from starlette.middleware.cors import CORSMiddleware
 from app.api.main import api_router
 from app.core.config import settings
 from app.core.middleware import APIKeyMiddleware
-from app.core.weaviate_client import create_required_collections
+from app.core.tenant_tiering import get_tenant_tiering_manager
+from app.core.vector_store import get_vector_store
+from app.core.weaviate_client import (
+    close_weaviate_manager,
+    init_weaviate_manager,
+)
 def custom_generate_unique_id(route: APIRoute) -> str:
     return f"{route.tags[0]}-{route.name}"
 
@@ -16,18 +20,29 @@ if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
 
+# Lifespan event to manage the pooled Weaviate client connections and the vector store
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    weaviate_manager = init_weaviate_manager()
+    app.state.weaviate_manager = weaviate_manager
+    vector_store = get_vector_store(weaviate_manager)
+    await vector_store.prepare()
+    tenant_tiering_manager = get_tenant_tiering_manager()
+    tenant_tiering_manager.start()
+    try:
+        yield
+    finally:
+        await tenant_tiering_manager.stop()
+        vector_store.close()
+        close_weaviate_manager()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
 )
-# Lifespan event to manage Weaviate client connection
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    create_required_collections();
-    yield
-
-app = FastAPI(lifespan=lifespan)
 
 
 # Add API key middleware
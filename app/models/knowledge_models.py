@@ -1,7 +1,14 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 
 class RetrievalInput(BaseModel):
     knowledge_id: Optional[str] = None
     query: str
-    retrieval_setting: Optional[dict] = None
\ No newline at end of file
+    retrieval_setting: Optional[dict] = None
+
+class FederatedRetrievalInput(BaseModel):
+    query: str
+    knowledge_ids: List[str] = []
+    include_general: bool = False  # Also search the general knowledge collection
+    weights: Optional[Dict[str, float]] = None  # Per knowledge_id ("general" for the general collection), default 1.0
+    retrieval_setting: Optional[dict] = None
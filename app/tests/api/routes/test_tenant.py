@@ -0,0 +1,66 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.tests.utils.vector_store import make_object
+
+COLLECTION = settings.TENANT_KNOWLEDGE_COLLECTION_NAME
+
+
+@pytest.fixture
+def client():
+    return TestClient(app, headers={"Authorization": f"Bearer {settings.API_KEY}"})
+
+
+@pytest.fixture
+def stored(vector_store, tenant_id):
+    objects = [make_object(f"chunk {index}", [1, index, 0, 0]) for index in range(5)]
+    assert not asyncio.run(vector_store.insert_batch(COLLECTION, objects, tenant_id))
+    return sorted(obj["uuid"] for obj in objects)
+
+
+def list_objects(client, tenant_id, **params):
+    response = client.post(f"{settings.API_V1_STR}/tenant/objects", json=tenant_id, params=params)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_objects_are_streamed_as_ndjson(client, tenant_id, stored) -> None:
+    *objects, last = list_objects(client, tenant_id, page_size=2)
+    assert [obj["uuid"] for obj in objects] == stored
+    assert objects[0]["properties"]["content"].startswith("chunk")
+    assert last == {"done": True, "count": 5, "after": stored[-1]}
+
+
+def test_listing_resumes_after_the_given_object(client, tenant_id, stored) -> None:
+    *objects, last = list_objects(client, tenant_id, page_size=2, after=stored[1], properties=["source"])
+    assert [obj["uuid"] for obj in objects] == stored[2:]
+    assert all(obj["properties"] == {"source": "doc.txt"} for obj in objects)
+    assert last["count"] == 3
+
+
+def test_failure_midway_ends_with_a_resume_token(client, tenant_id, stored, vector_store, monkeypatch) -> None:
+    fetch = vector_store.fetch
+    calls = []
+
+    async def failing_fetch(*args, **kwargs):
+        calls.append(kwargs.get("after"))
+        if len(calls) > 1:
+            raise ConnectionError("connection reset")
+        return await fetch(*args, **kwargs)
+
+    monkeypatch.setattr(vector_store, "fetch", failing_fetch)
+    *objects, last = list_objects(client, tenant_id, page_size=2)
+    assert [obj["uuid"] for obj in objects] == stored[:2]
+    assert last == {"error": "connection reset", "after": stored[1]}
+
+
+@pytest.mark.usefixtures("vector_store")
+def test_unknown_tenant_is_not_found(client) -> None:
+    response = client.post(f"{settings.API_V1_STR}/tenant/objects", json="missing")
+    assert response.status_code == 404
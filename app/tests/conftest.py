@@ -0,0 +1,59 @@
+import asyncio
+import os
+import tempfile
+import uuid
+
+import pytest
+
+# Settings are read when the app modules are imported, so the test
+# environment is set up before any test module imports them. Files the app
+# writes go to a scratch directory, never to the paths of a local .env, and
+# vector store tests run against the embedded backend with 4-dimension vectors.
+_scratch = tempfile.mkdtemp(prefix="app-tests-")
+
+for name, value in {
+    "PROJECT_NAME": "ai-pilot-rag-tests",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_USER": "postgres",
+    "WEAVIATE_URL": "http://localhost:8080",
+    "AWS_ACCESS_KEY_ID": "test",
+    "AWS_SECRET_ACCESS_KEY": "test",
+    "AWS_REGION": "us-east-1",
+    "AWS_S3_BUCKET": "test",
+    "GENERAL_KNOWLEDGE_COLLECTION_NAME": "General",
+    "TENANT_KNOWLEDGE_COLLECTION_NAME": "Tenant",
+    "TENANT_URL": "http://localhost:8001",
+    "TENANT_API_KEY": "test",
+    "AGENT_API_KEY": "test",
+}.items():
+    os.environ.setdefault(name, value)
+
+os.environ.update(
+    {
+        "VECTOR_STORE": "embedded",
+        "EMBEDDING_DIMENSIONS": "4",
+        "JOB_QUEUE_PATH": os.path.join(_scratch, "jobs.sqlite3"),
+        "EMBEDDED_STORE_PATH": os.path.join(_scratch, "vector_store"),
+        "EMBEDDING_CACHE_PATH": os.path.join(_scratch, "embeddings.sqlite3"),
+    }
+)
+
+
+@pytest.fixture
+def vector_store():
+    from app.core.vector_store import get_vector_store
+
+    store = get_vector_store()
+    asyncio.run(store.prepare())
+    return store
+
+
+@pytest.fixture
+def tenant_id(vector_store) -> str:
+    """A new, empty tenant of the tenant collection."""
+    from app.core.config import settings
+
+    name = f"tenant{uuid.uuid4().hex[:12]}"
+    asyncio.run(vector_store.create_tenants(settings.TENANT_KNOWLEDGE_COLLECTION_NAME, [name]))
+    return name
+
@@ -0,0 +1,40 @@
+import asyncio
+
+from app.controllers.tenant_controller import iter_tenant_objects
+from app.core.config import settings
+from app.tests.utils.vector_store import make_object
+
+
+def list_pages(tenant_id, **kwargs):
+    async def collect():
+        return [page async for page in iter_tenant_objects(tenant_id, **kwargs)]
+
+    return asyncio.run(collect())
+
+
+def test_objects_are_listed_page_by_page_in_cursor_order(vector_store, tenant_id) -> None:
+    objects = [make_object(f"chunk {index}", [1, index, 0, 0]) for index in range(5)]
+    asyncio.run(vector_store.insert_batch(settings.TENANT_KNOWLEDGE_COLLECTION_NAME, objects, tenant_id))
+
+    pages = list_pages(tenant_id, page_size=2)
+    assert [len(page) for page in pages] == [2, 2, 1]
+    listed = [obj["uuid"] for page in pages for obj in page]
+    assert listed == sorted(obj["uuid"] for obj in objects)
+
+    # A listing resumes after the last object already seen
+    resumed = list_pages(tenant_id, page_size=2, after=listed[2])
+    assert [obj["uuid"] for page in resumed for obj in page] == listed[3:]
+
+
+def test_listing_returns_only_the_requested_properties(vector_store, tenant_id) -> None:
+    asyncio.run(
+        vector_store.insert_batch(
+            settings.TENANT_KNOWLEDGE_COLLECTION_NAME, [make_object("chunk", [1, 0, 0, 0])], tenant_id
+        )
+    )
+    ((obj,),) = list_pages(tenant_id, properties=["source"])
+    assert obj["properties"] == {"source": "doc.txt"}
+
+
+def test_empty_tenant_has_no_pages(tenant_id) -> None:
+    assert list_pages(tenant_id, page_size=2) == []
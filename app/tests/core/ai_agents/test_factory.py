@@ -0,0 +1,80 @@
+import asyncio
+import base64
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.core.ai_agents.factory import BaseAIAgent, decode_embedding
+
+
+class FakeRawResponse:
+    def __init__(self, response, headers):
+        self.response = response
+        self.headers = headers
+
+    def parse(self):
+        return self.response
+
+
+class FakeClient:
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.calls = []
+        self.options = {}
+        self.embeddings = SimpleNamespace(with_raw_response=SimpleNamespace(create=self.create))
+
+    def with_options(self, **options):
+        self.options.update(options)
+        return self
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        data = [
+            SimpleNamespace(embedding=base64.b64encode(vector.astype(np.float32).tobytes()).decode())
+            for vector in self.vectors
+        ]
+        response = SimpleNamespace(data=data, usage=SimpleNamespace(total_tokens=7))
+        return FakeRawResponse(response, {"x-ratelimit-remaining-tokens": "100"})
+
+
+class FakeAgent(BaseAIAgent):
+    def __init__(self, client):
+        self.client = client
+
+    def initialize(self):
+        pass
+
+    def get_client(self):
+        return self.client
+
+
+def test_decode_base64_embedding_without_float_objects() -> None:
+    vector = np.asarray([0.5, -1.25, 3.0], dtype=np.float32)
+    decoded = decode_embedding(base64.b64encode(vector.tobytes()).decode())
+    assert decoded.dtype == np.float32
+    np.testing.assert_array_equal(decoded, vector)
+    # A view over the decoded bytes, not a converted copy
+    assert not decoded.flags.owndata
+
+
+def test_decode_float_list_embedding() -> None:
+    decoded = decode_embedding([0.5, -1.25, 3.0])
+    assert decoded.dtype == np.float32
+    np.testing.assert_array_equal(decoded, [0.5, -1.25, 3.0])
+
+
+def test_embedding_response_requests_base64_and_keeps_headers(monkeypatch) -> None:
+    monkeypatch.setattr("app.core.ai_agents.factory.settings.EMBEDDING_DIMENSIONS", 3)
+    vectors = [np.asarray([1, 2, 3]), np.asarray([4, 5, 6])]
+    client = FakeClient(vectors)
+    response = asyncio.run(FakeAgent(client).create_embedding_response(["a", "b"], "model", max_retries=0))
+
+    assert client.calls == [
+        {"model": "model", "input": ["a", "b"], "encoding_format": "base64", "dimensions": 3}
+    ]
+    assert client.options == {"max_retries": 0}
+    assert response.total_tokens == 7
+    assert response.headers["x-ratelimit-remaining-tokens"] == "100"
+    for embedding, vector in zip(response.embeddings, vectors, strict=True):
+        assert embedding.dtype == np.float32
+        np.testing.assert_array_equal(embedding, vector)
@@ -0,0 +1,96 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.core.ai_agents.factory import AIAgentFactory, LocalEmbeddingAgentWrapper
+from app.core.ai_agents.local_agent import LocalEmbeddingModel
+from app.tool import ai_tool
+from app.tool.embedding_cache import make_cache_key
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    path = tmp_path / "embeddings.npz"
+    np.savez(
+        path,
+        vocab=np.asarray(["contract", "payment", "notice"]),
+        vectors=np.asarray([[1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype=np.float32),
+        weights=np.asarray([1.0, 3.0, 1.0], dtype=np.float32),
+    )
+    return str(path)
+
+
+def test_encode_pools_weighted_token_vectors(model_path) -> None:
+    model = LocalEmbeddingModel(model_path)
+    embeddings = model.encode(["contract payment", "Notice", "unknown words", "payment payment"])
+
+    assert embeddings.dtype == np.float32
+    assert embeddings.shape == (4, 3)
+    expected = np.asarray([1, 3, 0], dtype=np.float32) / np.sqrt(10)
+    np.testing.assert_allclose(embeddings[0], expected, rtol=1e-6)
+    # Unknown casing falls back to the lower-case token
+    np.testing.assert_allclose(embeddings[1], [0, 0, 1])
+    # Texts without known tokens get a zero vector
+    np.testing.assert_array_equal(embeddings[2], [0, 0, 0])
+    np.testing.assert_allclose(embeddings[3], [0, 1, 0])
+
+
+def test_missing_model_file_is_reported(tmp_path) -> None:
+    with pytest.raises(ValueError):
+        LocalEmbeddingModel(str(tmp_path / "missing.npz"))
+
+
+def test_factory_creates_local_agent() -> None:
+    agent = AIAgentFactory.create_agent("local")
+    assert isinstance(agent, LocalEmbeddingAgentWrapper)
+    assert not agent.rate_limited
+    with pytest.raises(ValueError):
+        AIAgentFactory.create_agent("ai_tool")
+
+
+def test_local_agent_embeds_in_batches(model_path, monkeypatch) -> None:
+    monkeypatch.setattr("app.core.ai_agents.local_agent.settings.LOCAL_EMBEDDING_MODEL_PATH", model_path)
+    monkeypatch.setattr("app.core.ai_agents.local_agent.settings.LOCAL_EMBEDDING_BATCH_SIZE", 2)
+    agent = AIAgentFactory.create_agent("local")
+    monkeypatch.setattr(agent._agent, "_model", None)
+    embeddings = asyncio.run(agent.create_embeddings(["contract", "payment", "notice"], "ignored"))
+    np.testing.assert_allclose(np.vstack(embeddings), np.eye(3, dtype=np.float32))
+
+
+def test_completion_agent_is_created_on_first_use(monkeypatch) -> None:
+    monkeypatch.setattr(ai_tool, "agent_provider", "openai")
+    monkeypatch.setattr(ai_tool, "embedding_provider", "local")
+    created = []
+    create_agent = AIAgentFactory.create_agent
+
+    def record(agent_type):
+        created.append(agent_type)
+        return create_agent(agent_type) if agent_type == "local" else object()
+
+    monkeypatch.setattr(AIAgentFactory, "create_agent", record)
+    tool = ai_tool.AITool()
+    assert isinstance(tool.embedding_agent, LocalEmbeddingAgentWrapper)
+    assert created == ["local"]
+
+    agent = tool.ai_agent
+    assert tool.ai_agent is agent
+    assert created == ["local", "openai"]
+
+
+def test_cache_keys_depend_on_provider_and_model_file(model_path, monkeypatch) -> None:
+    monkeypatch.setattr("app.core.ai_agents.local_agent.settings.LOCAL_EMBEDDING_MODEL_PATH", model_path)
+    local = AIAgentFactory.create_agent("local")
+    monkeypatch.setattr(local._agent, "_model", None)
+    remote = AIAgentFactory.create_agent("openai")
+    model = "text-embedding-ada-002"
+
+    local_key = make_cache_key("payment terms", local.embedding_model_id(model))
+    remote_key = make_cache_key("payment terms", remote.embedding_model_id(model))
+    assert local_key != remote_key
+    assert remote.embedding_model_id(model) == AIAgentFactory.create_agent("openai_async").embedding_model_id(model)
+
+    # A replaced model file is another embedding space
+    np.savez(model_path, vocab=np.asarray(["contract"]), vectors=np.ones((1, 3), dtype=np.float32))
+    monkeypatch.setattr(local._agent, "_model", None)
+    assert make_cache_key("payment terms", local.embedding_model_id(model)) != local_key
@@ -0,0 +1,36 @@
+import threading
+
+from app.core import data_versions as data_versions_module
+from app.core.data_versions import DataVersions
+
+
+def test_versions_are_cached_for_cache_ttl(tmp_path, monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(data_versions_module.time, "monotonic", lambda: now[0])
+    path = str(tmp_path / "jobs.db")
+    versions, other = DataVersions(path, cache_ttl=60), DataVersions(path, cache_ttl=0)
+    assert versions.get("Tenant", "t1") == 0
+    other.bump("Tenant", "t1")
+    # Another process's write is seen once the cached version expires
+    assert versions.get("Tenant", "t1") == 0
+    now[0] += 61
+    assert versions.get("Tenant", "t1") == 1
+
+
+def test_own_bump_is_seen_at_once(tmp_path) -> None:
+    versions = DataVersions(str(tmp_path / "jobs.db"), cache_ttl=60)
+    assert versions.get("Tenant", "t1") == 0
+    assert versions.bump("Tenant", "t1") == 1
+    assert versions.get("Tenant", "t1") == 1
+
+
+def test_reads_do_not_wait_for_a_pending_write(tmp_path) -> None:
+    versions = DataVersions(str(tmp_path / "jobs.db"), cache_ttl=0)
+    versions.bump("Tenant", "t1")
+    # A bump waiting for SQLite's write lock holds the write connection only
+    with versions._write_lock:
+        reader = threading.Thread(target=lambda: versions.get("Tenant", "t1"))
+        reader.start()
+        reader.join(timeout=5)
+        assert not reader.is_alive()
+    assert versions.get("Tenant", "t1") == 1
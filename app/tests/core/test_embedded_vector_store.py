@@ -0,0 +1,146 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.core.embedded_vector_store import EmbeddedVectorStore
+from app.core.vector_store import PropertyFilter
+from app.tests.utils.vector_store import make_object
+
+TENANTS = settings.TENANT_KNOWLEDGE_COLLECTION_NAME
+GENERAL = settings.GENERAL_KNOWLEDGE_COLLECTION_NAME
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = EmbeddedVectorStore(str(tmp_path))
+    asyncio.run(store.prepare())
+    asyncio.run(store.create_tenants(TENANTS, ["t1"]))
+    return store
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_objects_round_trip(store) -> None:
+    obj = make_object("payment terms", [1, 2, 0, 0])
+    assert run(store.insert_batch(TENANTS, [obj], "t1")) == {}
+
+    stored = run(store.get(TENANTS, obj["uuid"], "t1"))
+    assert stored.properties == obj["properties"]
+    np.testing.assert_array_equal(stored.vector, obj["vector"])
+
+    run(store.update(TENANTS, obj["uuid"], {"source": "terms.pdf"}, tenant_id="t1"))
+    stored = run(store.get(TENANTS, obj["uuid"], "t1"))
+    assert stored.properties["source"] == "terms.pdf"
+    assert stored.properties["content"] == "payment terms"
+
+    run(store.delete(TENANTS, [obj["uuid"], "unknown"], "t1"))
+    assert run(store.get(TENANTS, obj["uuid"], "t1")) is None
+    assert run(store.count(TENANTS, "t1")) == 0
+
+
+def test_vectors_of_the_wrong_size_are_rejected(store) -> None:
+    good = make_object("good", [1, 0, 0, 0])
+    bad = make_object("bad", [1, 0, 0])
+    assert list(run(store.insert_batch(TENANTS, [good, bad], "t1"))) == [bad["uuid"]]
+    assert run(store.count(TENANTS, "t1")) == 1
+
+
+def test_search_ranks_by_cosine_distance(store) -> None:
+    objects = [
+        make_object("exact", [2, 0, 0, 0]),
+        make_object("close", [1, 0.2, 0, 0]),
+        make_object("far", [0, 1, 0, 0]),
+    ]
+    run(store.insert_batch(TENANTS, objects, "t1"))
+
+    results = run(store.search(TENANTS, [1, 0, 0, 0], limit=10, tenant_id="t1", max_distance=0.5))
+    assert [obj.properties["content"] for obj in results] == ["exact", "close"]
+    assert results[0].distance == pytest.approx(0.0, abs=1e-6)
+
+    results = run(
+        store.search(
+            TENANTS,
+            [1, 0, 0, 0],
+            limit=10,
+            tenant_id="t1",
+            filters=[PropertyFilter("content", "NotEqual", "exact")],
+            return_properties=["content"],
+        )
+    )
+    assert [obj.properties for obj in results] == [{"content": "close"}, {"content": "far"}]
+
+
+def test_tenants_are_isolated_and_collections_without_tenants_work(store) -> None:
+    run(store.insert_batch(TENANTS, [make_object("t1", [1, 0, 0, 0])], "t1"))
+    run(store.insert_batch(GENERAL, [make_object("general", [1, 0, 0, 0])]))
+
+    with pytest.raises(ValueError):
+        run(store.search(TENANTS, [1, 0, 0, 0], limit=1, tenant_id="t2"))
+    with pytest.raises(ValueError):
+        run(store.search(GENERAL, [1, 0, 0, 0], limit=1, tenant_id="t1"))
+    (result,) = run(store.search(GENERAL, [1, 0, 0, 0], limit=1))
+    assert result.properties["content"] == "general"
+
+
+def test_tenant_status_and_deletion(store) -> None:
+    run(store.create_tenants(TENANTS, ["t2"]))
+    run(store.set_tenant_status(TENANTS, ["t2"], "INACTIVE"))
+    assert run(store.get_tenants(TENANTS, ["t1", "t2", "t3"])) == {"t1": "ACTIVE", "t2": "INACTIVE"}
+
+    run(store.insert_batch(TENANTS, [make_object("t2", [1, 0, 0, 0])], "t2"))
+    run(store.delete_tenant(TENANTS, "t2"))
+    assert run(store.get_tenants(TENANTS)) == {"t1": "ACTIVE"}
+    assert run(store.count(TENANTS, "t2")) == 0
+    with pytest.raises(ValueError):
+        run(store.create_tenants(TENANTS, ["../escape"]))
+
+
+def test_writes_are_seen_by_other_processes(store) -> None:
+    # A second store over the same directory stands in for another process
+    other = EmbeddedVectorStore(store.root)
+    first = make_object("first", [1, 0, 0, 0])
+    run(store.insert_batch(TENANTS, [first], "t1"))
+    assert run(other.count(TENANTS, "t1")) == 1
+
+    second = make_object("second", [0, 1, 0, 0])
+    run(other.insert_batch(TENANTS, [second], "t1"))
+    run(other.delete(TENANTS, [first["uuid"]], "t1"))
+    (result,) = run(store.search(TENANTS, [1, 1, 0, 0], limit=10, tenant_id="t1"))
+    assert result.uuid == second["uuid"]
+
+
+def test_deleted_rows_are_compacted(store) -> None:
+    rng = np.random.default_rng(0)
+    objects = [make_object(f"chunk {index}", rng.normal(size=4)) for index in range(2100)]
+    run(store.insert_batch(TENANTS, objects, "t1"))
+    other = EmbeddedVectorStore(store.root)
+    assert run(other.count(TENANTS, "t1")) == 2100
+
+    run(store.delete(TENANTS, [obj["uuid"] for obj in objects[:1500]], "t1"))
+    stats = store.stats()
+    assert stats["objects"] == 600
+    assert stats["dead_rows"] == 0
+
+    kept = objects[-1]
+    (result,) = run(other.search(TENANTS, kept["vector"], limit=1, tenant_id="t1"))
+    assert result.uuid == kept["uuid"]
+    assert run(other.count(TENANTS, "t1")) == 600
+
+
+def test_ivf_index_finds_stored_vectors(store, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "EMBEDDED_STORE_INDEX", "ivf")
+    monkeypatch.setattr(settings, "EMBEDDED_STORE_IVF_MIN_OBJECTS", 100)
+    monkeypatch.setattr(settings, "EMBEDDED_STORE_IVF_LISTS", 8)
+    monkeypatch.setattr(settings, "EMBEDDED_STORE_IVF_PROBES", 8)
+    rng = np.random.default_rng(1)
+    objects = [make_object(f"chunk {index}", rng.normal(size=4)) for index in range(500)]
+    run(store.insert_batch(TENANTS, objects, "t1"))
+
+    for obj in objects[::50]:
+        (result,) = run(store.search(TENANTS, obj["vector"], limit=1, tenant_id="t1"))
+        assert result.uuid == obj["uuid"]
+    assert store.stats()["ivf_indexes"] == 1
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import embedding_dimensions
+from app.core.embedding_dimensions import (
+    check_collection_dimensions,
+    check_embedding_dimensions,
+    configured_dimensions,
+    describe_dimensions,
+    read_collection_dimensions,
+)
+
+
+@pytest.fixture(autouse=True)
+def openai_embeddings(monkeypatch):
+    monkeypatch.setattr(embedding_dimensions.settings, "EMBEDDING_PROVIDER", "openai")
+    monkeypatch.setattr(embedding_dimensions.settings, "EMBEDDING_MODEL", "text-embedding-3-small")
+    monkeypatch.setattr(embedding_dimensions.settings, "EMBEDDING_DIMENSIONS", None)
+    monkeypatch.setattr(embedding_dimensions, "collection_dimensions", {})
+
+
+def collection_config(description=None, model=None):
+    return SimpleNamespace(description=description, vectorizer_config=SimpleNamespace(model=model))
+
+
+def test_configured_dimensions_prefers_the_reduced_size(monkeypatch) -> None:
+    assert configured_dimensions() == 1536
+    monkeypatch.setattr(embedding_dimensions.settings, "EMBEDDING_DIMENSIONS", 256)
+    assert configured_dimensions() == 256
+
+
+def test_dimensions_are_read_from_description_then_vectorizer() -> None:
+    assert read_collection_dimensions(collection_config(describe_dimensions(512))) == 512
+    assert read_collection_dimensions(collection_config(model={"model": "text-embedding-3-large"})) == 3072
+    assert read_collection_dimensions(collection_config(model={"model": "x", "dimensions": 768})) == 768
+    assert read_collection_dimensions(collection_config("Knowledge base")) is None
+
+
+def test_mismatched_collection_is_refused() -> None:
+    with pytest.raises(RuntimeError):
+        check_collection_dimensions("Tenant", 3072)
+    check_collection_dimensions("Tenant", 1536)
+    assert embedding_dimensions.collection_dimensions == {"Tenant": 1536}
+
+
+def test_vectors_are_checked_against_the_collection(monkeypatch) -> None:
+    monkeypatch.setattr(embedding_dimensions.settings, "EMBEDDING_DIMENSIONS", 256)
+    check_collection_dimensions("Tenant", 256)
+    check_embedding_dimensions([0.0] * 256, "Tenant")
+    with pytest.raises(ValueError):
+        check_embedding_dimensions([0.0] * 1536, "Tenant")
+    # Collections not loaded yet fall back to the configuration
+    with pytest.raises(ValueError):
+        check_embedding_dimensions([0.0] * 1536, "General")
@@ -0,0 +1,120 @@
+import time
+
+import pytest
+
+from app.core.data_versions import DataVersions
+from app.core.job_queue import (
+    FAILED,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    IdempotencyKeyConflict,
+    JobQueue,
+    LeaseLost,
+)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.db"), lease_seconds=30, max_attempts=3, retry_backoff=0)
+
+
+def test_claimed_job_is_leased_to_one_worker(queue) -> None:
+    job, created = queue.enqueue("ingest", {"key": "a.pdf"})
+    assert created
+    assert job["status"] == QUEUED
+
+    claimed = queue.claim("worker-1")
+    assert claimed["id"] == job["id"]
+    assert claimed["status"] == RUNNING
+    assert claimed["attempts"] == 1
+    assert queue.claim("worker-2") is None
+
+    queue.heartbeat(job["id"], "worker-1", {"pages_extracted": 3})
+    with pytest.raises(LeaseLost):
+        queue.heartbeat(job["id"], "worker-2")
+    queue.complete(job["id"], "worker-1", {"chunks": 7})
+
+    job = queue.get(job["id"])
+    assert job["status"] == SUCCEEDED
+    assert job["progress"] == {"pages_extracted": 3}
+    assert job["result"] == {"chunks": 7}
+    assert queue.stats() == {SUCCEEDED: 1}
+
+
+def test_claim_filters_by_kind(queue) -> None:
+    queue.enqueue("other", {})
+    job, _ = queue.enqueue("ingest", {})
+    assert queue.claim("worker-1", kinds=["ingest"])["id"] == job["id"]
+    assert queue.claim("worker-1", kinds=["ingest"]) is None
+
+
+def test_failed_jobs_are_retried_until_max_attempts(queue) -> None:
+    job, _ = queue.enqueue("ingest", {}, max_attempts=2)
+
+    claimed = queue.claim("worker-1")
+    assert queue.fail(job["id"], "worker-1", "boom", claimed["attempts"], claimed["max_attempts"])
+    assert queue.get(job["id"])["status"] == QUEUED
+
+    claimed = queue.claim("worker-1")
+    assert claimed["attempts"] == 2
+    assert not queue.fail(job["id"], "worker-1", "boom", claimed["attempts"], claimed["max_attempts"])
+    job = queue.get(job["id"])
+    assert job["status"] == FAILED
+    assert job["error"] == "boom"
+    assert queue.claim("worker-1") is None
+
+
+def test_retries_back_off(tmp_path) -> None:
+    queue = JobQueue(str(tmp_path / "jobs.db"), lease_seconds=30, max_attempts=3, retry_backoff=60)
+    job, _ = queue.enqueue("ingest", {})
+    claimed = queue.claim("worker-1")
+    queue.fail(job["id"], "worker-1", "boom", claimed["attempts"], claimed["max_attempts"])
+    assert queue.get(job["id"])["run_after"] >= time.time() + 59
+    assert queue.claim("worker-1") is None
+
+
+def test_expired_lease_is_handed_to_the_next_worker(tmp_path) -> None:
+    queue = JobQueue(str(tmp_path / "jobs.db"), lease_seconds=0.05, max_attempts=2, retry_backoff=0)
+    job, _ = queue.enqueue("ingest", {})
+    queue.claim("worker-1")
+    time.sleep(0.1)
+
+    claimed = queue.claim("worker-2")
+    assert claimed["id"] == job["id"]
+    assert claimed["lease_owner"] == "worker-2"
+    with pytest.raises(LeaseLost):
+        queue.complete(job["id"], "worker-1")
+
+    # The last attempt's lease expires too: the job fails instead of running again
+    time.sleep(0.1)
+    assert queue.claim("worker-3") is None
+    job = queue.get(job["id"])
+    assert job["status"] == FAILED
+    assert job["error"] == "Lease expired"
+
+
+def test_idempotency_keys_are_scoped_per_tenant(queue) -> None:
+    first, created = queue.enqueue("ingest", {"key": "a.pdf"}, idempotency_key="k", tenant_id="t1")
+    assert created
+    again, created = queue.enqueue("ingest", {"key": "a.pdf"}, idempotency_key="k", tenant_id="t1")
+    assert not created
+    assert again["id"] == first["id"]
+
+    other, created = queue.enqueue("ingest", {"key": "b.pdf"}, idempotency_key="k", tenant_id="t2")
+    assert created
+    assert other["id"] != first["id"]
+
+    with pytest.raises(IdempotencyKeyConflict):
+        queue.enqueue("ingest", {"key": "b.pdf"}, idempotency_key="k", tenant_id="t1")
+
+
+def test_data_versions_are_shared_between_connections(tmp_path) -> None:
+    path = str(tmp_path / "jobs.db")
+    versions, other = DataVersions(path, cache_ttl=0), DataVersions(path, cache_ttl=0)
+    assert versions.get("Tenant", "t1") == 0
+    assert versions.bump("Tenant", "t1") == 1
+    assert other.bump("Tenant", "t1") == 2
+    assert versions.get("Tenant", "t1") == 2
+    assert versions.get("Tenant", "t2") == 0
+    assert versions.bump("General") == 1
@@ -0,0 +1,88 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.core.data_versions import DataVersions
+from app.core.tenant_registry import TenantRegistry
+
+
+@pytest.fixture
+def versions_path(tmp_path):
+    return str(tmp_path / "versions.sqlite3")
+
+
+@pytest.fixture
+def new_tenant():
+    return f"tenant{uuid.uuid4().hex[:12]}"
+
+
+def make_registry(versions_path):
+    return TenantRegistry(ttl=60, negative_ttl=60, versions=DataVersions(versions_path, cache_ttl=0))
+
+
+@pytest.fixture
+def created(vector_store, monkeypatch):
+    """Tenants passed to create_tenants, which takes a moment as a remote store would."""
+    tenants = []
+    create_tenants = vector_store.create_tenants
+
+    async def slow_create_tenants(collection_name, tenant_ids):
+        tenants.extend(tenant_ids)
+        await asyncio.sleep(0.05)
+        await create_tenants(collection_name, tenant_ids)
+
+    monkeypatch.setattr(vector_store, "create_tenants", slow_create_tenants)
+    return tenants
+
+
+@pytest.mark.usefixtures("vector_store")
+def test_lookups_are_served_from_the_cache(versions_path, tenant_id, new_tenant) -> None:
+    registry = make_registry(versions_path)
+    assert asyncio.run(registry.get_status(tenant_id)) == "ACTIVE"
+    assert not asyncio.run(registry.exists(new_tenant))
+    assert registry.lookup(tenant_id) == (True, "ACTIVE")
+    assert registry.lookup(new_tenant) == (True, None)
+    assert registry.stats()["entries"] == 2
+
+
+@pytest.mark.usefixtures("created")
+def test_tenant_created_by_another_process_is_no_longer_absent(versions_path, new_tenant) -> None:
+    registry = make_registry(versions_path)
+    assert not asyncio.run(registry.exists(new_tenant))
+
+    # Another process, sharing only the data versions and the store
+    assert asyncio.run(make_registry(versions_path).ensure(new_tenant))
+
+    assert registry.lookup(new_tenant) == (False, None)
+    assert asyncio.run(registry.exists(new_tenant))
+
+
+def test_concurrent_first_writes_create_the_tenant_once(versions_path, new_tenant, created) -> None:
+    registry = make_registry(versions_path)
+
+    async def main():
+        return await asyncio.gather(*[registry.ensure(new_tenant) for _ in range(5)])
+
+    assert sorted(asyncio.run(main())) == [False] * 4 + [True]
+    assert created == [new_tenant]
+    assert not asyncio.run(registry.ensure(new_tenant))
+    assert created == [new_tenant]
+
+
+def test_failed_creation_is_reported_to_every_caller(versions_path, vector_store, monkeypatch) -> None:
+    registry = make_registry(versions_path)
+    calls = []
+
+    async def fail(collection_name, tenant_ids):
+        calls.append((collection_name, tenant_ids))
+        await asyncio.sleep(0.01)
+        raise ConnectionError("store unavailable")
+
+    monkeypatch.setattr(vector_store, "create_tenants", fail)
+
+    async def main():
+        return await asyncio.gather(*[registry.ensure("unreachable") for _ in range(3)], return_exceptions=True)
+
+    assert all(isinstance(outcome, ConnectionError) for outcome in asyncio.run(main()))
+    assert len(calls) == 1
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.core.data_versions import DataVersions
+from app.core.tenant_registry import TenantRegistry
+from app.core.tenant_tiering import TenantTieringManager, is_tenant_not_active_error
+
+COLLECTION = settings.TENANT_KNOWLEDGE_COLLECTION_NAME
+
+
+@pytest.fixture
+def manager(tmp_path):
+    registry = TenantRegistry(ttl=60, negative_ttl=60, versions=DataVersions(str(tmp_path / "versions.sqlite3")))
+    return TenantTieringManager(registry=registry, idle_seconds=10, sweep_interval=0.01, activation_timeout=1)
+
+
+def status(vector_store, tenant_id):
+    return asyncio.run(vector_store.get_tenants(COLLECTION, [tenant_id])).get(tenant_id)
+
+
+def test_sweep_deactivates_idle_tenants(manager, vector_store, tenant_id, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "TENANT_TIERING_ENABLED", True)
+    asyncio.run(manager.ensure_active(tenant_id))
+    manager._last_access[tenant_id] = time.time() - 60
+
+    tiers = asyncio.run(manager.sweep())
+
+    assert status(vector_store, tenant_id) == "INACTIVE"
+    assert tiers["INACTIVE"] >= 1
+    # The registry learns the new status without another lookup
+    assert manager.registry.lookup(tenant_id) == (True, "INACTIVE")
+    assert manager.stats()["deactivations"] == 1
+
+
+def test_sweep_only_counts_tiers_when_disabled(manager, vector_store, tenant_id) -> None:
+    manager._last_access[tenant_id] = time.time() - 60
+    tiers = asyncio.run(manager.sweep())
+    assert status(vector_store, tenant_id) == "ACTIVE"
+    assert tiers["ACTIVE"] >= 1
+    assert manager.stats()["deactivations"] == 0
+
+
+def test_accessing_an_inactive_tenant_reactivates_it(manager, vector_store, tenant_id) -> None:
+    asyncio.run(vector_store.set_tenant_status(COLLECTION, [tenant_id], "INACTIVE"))
+    assert asyncio.run(manager.ensure_active(tenant_id))
+    assert status(vector_store, tenant_id) == "ACTIVE"
+    assert manager.registry.lookup(tenant_id) == (True, "ACTIVE")
+    assert manager.stats()["activations"] == 1
+    assert not asyncio.run(manager.ensure_active("missing"))
+
+
+def test_request_to_a_tenant_deactivated_elsewhere_is_retried(manager, vector_store, tenant_id) -> None:
+    asyncio.run(manager.ensure_active(tenant_id))
+    # Another process's sweep deactivates the tenant; this registry still has it active
+    asyncio.run(vector_store.set_tenant_status(COLLECTION, [tenant_id], "INACTIVE"))
+    calls = []
+
+    async def search():
+        calls.append(1)
+        found = (await vector_store.get_tenants(COLLECTION, [tenant_id]))[tenant_id]
+        if found != "ACTIVE":
+            raise RuntimeError(f"tenant {tenant_id} is not active")
+        return "results"
+
+    assert asyncio.run(manager.run_active(tenant_id, search)) == "results"
+    assert len(calls) == 2
+    assert manager.stats()["activations"] == 1
+
+
+def test_other_errors_are_not_retried(manager, tenant_id) -> None:
+    calls = []
+
+    async def fail():
+        calls.append(1)
+        raise RuntimeError("connection reset")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(manager.run_active(tenant_id, fail))
+    assert len(calls) == 1
+    assert is_tenant_not_active_error("Tenant t1 is not active")
+    assert not is_tenant_not_active_error("connection reset")
+
+
+def test_background_sweep_runs_only_with_tiering_enabled(manager, monkeypatch) -> None:
+    sweeps = []
+
+    async def sweep():
+        sweeps.append(1)
+
+    monkeypatch.setattr(manager, "sweep", sweep)
+
+    async def run():
+        manager.start()
+        started = manager._task is not None
+        await asyncio.sleep(0.05)
+        await manager.stop()
+        return started
+
+    assert not asyncio.run(run())
+    assert sweeps == []
+
+    monkeypatch.setattr(settings, "TENANT_TIERING_ENABLED", True)
+    assert asyncio.run(run())
+    assert sweeps
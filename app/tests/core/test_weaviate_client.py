@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core import weaviate_client
+from app.core.weaviate_client import WeaviateClientManager
+from app.tests.utils.weaviate import StubClient
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    clients = []
+
+    def connect():
+        client = StubClient()
+        clients.append(client)
+        return client
+
+    monkeypatch.setattr(weaviate_client, "connect_weaviate_client", connect)
+    return clients
+
+
+def test_run_overlaps_calls_up_to_pool_size(connections) -> None:
+    pool_size = 8
+    delay = 0.2
+    manager = WeaviateClientManager(pool_size=pool_size, checkout_timeout=5)
+
+    async def main() -> float:
+        start = time.perf_counter()
+        await asyncio.gather(*[manager.run(lambda client: time.sleep(delay)) for _ in range(pool_size)])
+        return time.perf_counter() - start
+
+    try:
+        elapsed = asyncio.run(main())
+    finally:
+        manager.close()
+    # Serialized calls would take pool_size * delay
+    assert elapsed < 2 * delay
+    assert len(connections) == pool_size
+
+
+def test_run_reuses_clients_and_never_exceeds_pool_size(connections) -> None:
+    manager = WeaviateClientManager(pool_size=2, checkout_timeout=5)
+
+    async def main() -> None:
+        await asyncio.gather(*[manager.run(lambda client: time.sleep(0.01)) for _ in range(10)])
+
+    try:
+        asyncio.run(main())
+        assert len(connections) <= 2
+        assert manager.stats()["idle"] == len(connections)
+    finally:
+        manager.close()
+    assert all(client.closed for client in connections)
+
+
+def test_broken_client_is_replaced(connections) -> None:
+    manager = WeaviateClientManager(pool_size=1, checkout_timeout=5)
+
+    def fail(client):
+        client.closed = True
+        raise ConnectionError("connection reset")
+
+    async def main():
+        with pytest.raises(ConnectionError):
+            await manager.run(fail)
+        return await manager.run(lambda client: client)
+
+    try:
+        client = asyncio.run(main())
+    finally:
+        manager.close()
+    assert len(connections) == 2
+    assert client is connections[1]
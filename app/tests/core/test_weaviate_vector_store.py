@@ -0,0 +1,52 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import vector_store as vector_store_module
+from app.core.vector_store import WeaviateVectorStore
+
+
+class FakeData:
+    """Records delete requests and, like Weaviate, caps how many objects one request removes."""
+
+    def __init__(self, max_results, failed=0):
+        self.max_results = max_results
+        self.failed = failed
+        self.requests = []
+
+    def delete_many(self, where):
+        self.requests.append(list(where.value))
+        matches = min(len(where.value), self.max_results)
+        return SimpleNamespace(matches=matches, successful=matches - self.failed, failed=self.failed)
+
+    def delete_by_id(self, object_id):
+        self.requests.append([object_id])
+
+
+class FakeManager:
+    def __init__(self, data):
+        collection = SimpleNamespace(data=data, with_tenant=lambda _tenant_id: collection)
+        self.client = SimpleNamespace(collections=SimpleNamespace(get=lambda _name: collection))
+
+    async def run(self, fn, *args, **kwargs):
+        return fn(self.client, *args, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def delete_batch_size(monkeypatch):
+    monkeypatch.setattr(vector_store_module.settings, "WEAVIATE_DELETE_BATCH_SIZE", 3)
+
+
+def test_large_deletes_are_split_into_bounded_requests() -> None:
+    data = FakeData(max_results=3)
+    uuids = [str(uuid.uuid4()) for _ in range(8)]
+    asyncio.run(WeaviateVectorStore(FakeManager(data)).delete("Tenant", uuids, "t1"))
+    assert data.requests == [uuids[0:3], uuids[3:6], uuids[6:8]]
+
+
+def test_failed_deletes_are_reported() -> None:
+    data = FakeData(max_results=3, failed=1)
+    with pytest.raises(RuntimeError, match="Failed to delete 1 of 3"):
+        asyncio.run(WeaviateVectorStore(FakeManager(data)).delete("Tenant", [str(uuid.uuid4()) for _ in range(3)], "t1"))
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from app.core import weaviate_client
+from app.core.config import settings
+from app.core.tenant_tiering import get_tenant_tiering_manager
+from app.main import app, lifespan
+from app.tests.utils.weaviate import StubClient
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    clients = []
+
+    def connect():
+        client = StubClient()
+        clients.append(client)
+        return client
+
+    monkeypatch.setattr(weaviate_client, "connect_weaviate_client", connect)
+    monkeypatch.setattr(weaviate_client, "weaviate_manager", None)
+    return clients
+
+
+def test_lifespan_owns_the_client_manager(connections) -> None:
+    async def main():
+        async with lifespan(app):
+            manager = app.state.weaviate_manager
+            # Routes get the lifespan's manager through the dependency
+            assert weaviate_client.get_weaviate_manager() is manager
+            await asyncio.gather(*[manager.run(lambda client: client.is_live()) for _ in range(3)])
+            assert connections
+            assert not any(client.closed for client in connections)
+        return manager
+
+    manager = asyncio.run(main())
+    assert all(client.closed for client in connections)
+    assert weaviate_client.weaviate_manager is None
+    with pytest.raises(RuntimeError):
+        with manager.checkout():
+            pass
+
+
+def test_lifespan_starts_and_stops_the_tiering_sweep(connections, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "TENANT_TIERING_ENABLED", True)
+    tiering = get_tenant_tiering_manager()
+
+    async def main():
+        async with lifespan(app):
+            assert tiering._task is not None and not tiering._task.done()
+        assert tiering._task is None
+
+    asyncio.run(main())
+    assert not connections
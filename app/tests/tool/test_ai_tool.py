@@ -0,0 +1,90 @@
+import asyncio
+import base64
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.core.ai_agents.factory import BaseAIAgent
+from app.tool import ai_tool
+from app.tool.embedding_cache import EmbeddingCache
+
+
+class FakeEmbeddingsClient:
+    """Answers embedding requests with base64-encoded float32 vectors, as the OpenAI API does."""
+
+    def __init__(self):
+        self.inputs = []
+        self.embeddings = SimpleNamespace(with_raw_response=SimpleNamespace(create=self.create))
+
+    def with_options(self, **options):
+        return self
+
+    def create(self, model, input, encoding_format, **kwargs):
+        assert encoding_format == "base64"
+        self.inputs.append(list(input))
+        data = [
+            SimpleNamespace(
+                embedding=base64.b64encode(np.full(4, len(text), dtype=np.float32).tobytes()).decode()
+            )
+            for text in input
+        ]
+        response = SimpleNamespace(data=data, usage=SimpleNamespace(total_tokens=len(input)))
+        return SimpleNamespace(parse=lambda: response, headers={})
+
+
+class FakeAgent(BaseAIAgent):
+    def __init__(self):
+        self.client = FakeEmbeddingsClient()
+
+    def initialize(self):
+        pass
+
+    def get_client(self):
+        return self.client
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = EmbeddingCache(max_bytes=1 << 20, path=str(tmp_path / "embeddings.sqlite3"))
+    monkeypatch.setattr(ai_tool, "get_embedding_cache", lambda: cache)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def tool(monkeypatch):
+    agent = FakeAgent()
+    monkeypatch.setattr(ai_tool.AIAgentFactory, "create_agent", lambda agent_type: agent)
+    return ai_tool.AITool()
+
+
+def test_decoded_embeddings_are_cached_as_float32(tool, cache) -> None:
+    client = tool.embedding_agent.client
+    first = asyncio.run(tool.get_embeddings_batch(["payment", "notice", "payment"]))
+    assert client.inputs == [["payment", "notice"]]
+    for embedding, length in zip(first, [7, 6, 7], strict=True):
+        assert embedding.dtype == np.float32
+        np.testing.assert_array_equal(embedding, np.full(4, length))
+
+    again = asyncio.run(tool.get_embeddings("payment"))
+    assert client.inputs == [["payment", "notice"]]
+    assert again.dtype == np.float32
+    # Served as a read-only view over the cached bytes
+    assert not again.flags.writeable
+    np.testing.assert_array_equal(again, first[0])
+    assert cache.stats()["memory_hits"] >= 1
+
+
+def test_cached_embeddings_survive_a_restart(tool, cache, monkeypatch) -> None:
+    asyncio.run(tool.get_embeddings("payment"))
+    restarted = EmbeddingCache(max_bytes=1 << 20, path=cache.path)
+    monkeypatch.setattr(ai_tool, "get_embedding_cache", lambda: restarted)
+    try:
+        embedding = asyncio.run(tool.get_embeddings("payment"))
+        assert restarted.stats()["disk_hits"] == 1
+    finally:
+        restarted.close()
+    assert tool.embedding_agent.client.inputs == [["payment"]]
+    assert embedding.dtype == np.float32
+    np.testing.assert_array_equal(embedding, np.full(4, 7))
@@ -0,0 +1,137 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from app.tool.embedding_batcher import EmbeddingBatcher, EmbeddingBatchMetrics
+
+
+class BadInput(Exception):
+    status_code = 400
+
+
+class FakeEmbedder:
+    def __init__(self, bad=()):
+        self.bad = set(bad)
+        self.requests = []
+
+    async def __call__(self, texts, model):
+        self.requests.append(list(texts))
+        await asyncio.sleep(0)
+        if self.bad & set(texts):
+            raise BadInput(f"rejected {sorted(self.bad & set(texts))}")
+        return [np.full(4, len(text), dtype=np.float32) for text in texts]
+
+
+def make_batcher(embedder, **kwargs):
+    return EmbeddingBatcher(embedder, EmbeddingBatchMetrics(kwargs.get("max_batch_size", 64)), **kwargs)
+
+
+def test_concurrent_callers_share_one_request() -> None:
+    embedder = FakeEmbedder()
+    batcher = make_batcher(embedder, max_batch_size=64, max_wait_ms=20)
+
+    async def main():
+        return await asyncio.gather(*[batcher.embed(text, "model") for text in ["a", "bb", "a", "ccc"]])
+
+    embeddings = asyncio.run(main())
+    assert [int(embedding[0]) for embedding in embeddings] == [1, 2, 1, 3]
+    # Identical texts are sent once
+    assert embedder.requests == [["a", "bb", "ccc"]]
+    snapshot = batcher.metrics.snapshot()
+    assert (snapshot["requests"], snapshot["batches"]) == (4, 1)
+
+
+def test_full_batch_is_sent_without_waiting() -> None:
+    embedder = FakeEmbedder()
+    batcher = make_batcher(embedder, max_batch_size=2, max_wait_ms=10_000)
+
+    async def main():
+        start = time.perf_counter()
+        await asyncio.gather(*[batcher.embed(f"text {index}", "model") for index in range(4)])
+        return time.perf_counter() - start
+
+    assert asyncio.run(main()) < 1
+    assert embedder.requests == [["text 0", "text 1"], ["text 2", "text 3"]]
+
+
+def test_partial_batch_is_sent_after_max_wait() -> None:
+    embedder = FakeEmbedder()
+    batcher = make_batcher(embedder, max_batch_size=64, max_wait_ms=50)
+
+    async def main():
+        start = time.perf_counter()
+        await batcher.embed("alone", "model")
+        return time.perf_counter() - start
+
+    assert 0.04 <= asyncio.run(main()) < 1
+    assert embedder.requests == [["alone"]]
+
+
+def test_models_are_batched_separately() -> None:
+    embedder = FakeEmbedder()
+    batcher = make_batcher(embedder, max_wait_ms=10)
+
+    async def main():
+        await asyncio.gather(batcher.embed("a", "small"), batcher.embed("b", "large"))
+
+    asyncio.run(main())
+    assert sorted(embedder.requests) == [["a"], ["b"]]
+
+
+def test_rejected_input_fails_only_its_caller() -> None:
+    embedder = FakeEmbedder(bad={"bad"})
+    batcher = make_batcher(embedder, max_wait_ms=10)
+
+    async def main():
+        return await asyncio.gather(
+            *[batcher.embed(text, "model") for text in ["good", "bad", "fine"]], return_exceptions=True
+        )
+
+    good, bad, fine = asyncio.run(main())
+    assert int(good[0]) == 4
+    assert isinstance(bad, BadInput)
+    assert int(fine[0]) == 4
+    # The batch is retried one text per request
+    assert embedder.requests[0] == ["good", "bad", "fine"]
+    assert sorted(embedder.requests[1:]) == [["bad"], ["fine"], ["good"]]
+    assert batcher.metrics.snapshot()["split_batches"] == 1
+
+
+def test_other_errors_fail_the_whole_batch_without_splitting() -> None:
+    requests = []
+
+    async def unavailable(texts, model):
+        requests.append((list(texts), model))
+        error = Exception("service unavailable")
+        error.status_code = 503
+        raise error
+
+    batcher = make_batcher(unavailable, max_wait_ms=10)
+
+    async def main():
+        return await asyncio.gather(
+            *[batcher.embed(text, "model") for text in ["a", "b"]], return_exceptions=True
+        )
+
+    assert [str(outcome) for outcome in asyncio.run(main())] == ["service unavailable"] * 2
+    assert requests == [(["a", "b"], "model")]
+    assert batcher.metrics.snapshot()["split_batches"] == 0
+
+
+def test_checked_inputs_are_refused_before_batching() -> None:
+    def check_input(text):
+        if len(text) > 3:
+            raise ValueError("too long")
+
+    embedder = FakeEmbedder()
+    batcher = make_batcher(embedder, max_wait_ms=10, check_input=check_input)
+
+    async def main():
+        with pytest.raises(ValueError):
+            await batcher.embed("too long", "model")
+        return await batcher.embed("ok", "model")
+
+    assert int(asyncio.run(main())[0]) == 2
+    assert embedder.requests == [["ok"]]
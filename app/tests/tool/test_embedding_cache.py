@@ -0,0 +1,44 @@
+import numpy as np
+
+from app.tool.embedding_cache import EmbeddingCache, make_cache_key
+
+
+def test_cache_key_depends_on_model_dimensions_and_normalized_text() -> None:
+    key = make_cache_key("payment  terms\n", "model")
+    assert key == make_cache_key(" payment terms", "model")
+    assert key != make_cache_key("payment terms", "other-model")
+    assert key != make_cache_key("payment terms", "model", 256)
+
+
+def test_embeddings_round_trip_as_float32_views(tmp_path) -> None:
+    cache = EmbeddingCache(max_bytes=1 << 20, path=str(tmp_path / "embeddings.sqlite3"))
+    vector = np.asarray([0.25, -0.5, 1.0], dtype=np.float32)
+    packed = cache.put_memory({"key": vector})
+    cache.put_disk(packed)
+
+    found = cache.get_memory(["key", "other"])
+    assert list(found) == ["key"]
+    assert found["key"].dtype == np.float32
+    assert not found["key"].flags.writeable
+    np.testing.assert_array_equal(found["key"], vector)
+
+    # A new process finds the entry on disk
+    restarted = EmbeddingCache(max_bytes=1 << 20, path=cache.path)
+    assert restarted.get_memory(["key"]) == {}
+    np.testing.assert_array_equal(restarted.get_disk(["key", "other"])["key"], vector)
+    assert list(restarted.get_memory(["key"])) == ["key"]
+    assert restarted.stats()["disk_hits"] == 1
+    assert restarted.stats()["misses"] == 1
+    cache.close()
+    restarted.close()
+
+
+def test_memory_tier_evicts_least_recently_used() -> None:
+    vector = np.zeros(64, dtype=np.float32)
+    # Room for two entries of 256 bytes each plus bookkeeping
+    cache = EmbeddingCache(max_bytes=2 * (256 + 120), path=None)
+    cache.put_memory({"a": vector, "b": vector})
+    cache.get_memory(["a"])
+    cache.put_memory({"c": vector})
+    assert set(cache.get_memory(["a", "b", "c"])) == {"a", "c"}
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,189 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.core.ai_agents.factory import EmbeddingResponse
+from app.core.config import settings
+from app.tool import embedding_scheduler
+from app.tool.embedding_scheduler import (
+    EmbeddingScheduler,
+    RateBudget,
+    parse_reset_duration,
+)
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, headers):
+        super().__init__("rate limited")
+        self.response = SimpleNamespace(headers=headers)
+
+
+class ServerError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers={})
+
+
+class FakeAgent:
+    rate_limited = True
+
+    def __init__(self, headers=None, failures=None):
+        self.headers = headers or {}
+        self.failures = list(failures or [])
+        self.requests = []
+
+    async def create_embedding_response(self, texts, model, max_retries=None):
+        self.requests.append(list(texts))
+        if self.failures:
+            raise self.failures.pop(0)
+        return EmbeddingResponse(
+            embeddings=[np.full(4, len(text), dtype=np.float32) for text in texts],
+            total_tokens=sum(len(text) // 4 for text in texts),
+            headers=self.headers,
+        )
+
+
+@pytest.mark.parametrize(
+    "value, seconds", [("20ms", 0.02), ("1s", 1.0), ("6m0s", 360.0), ("1h2m", 3720.0), ("1.5", 1.5)]
+)
+def test_parse_reset_duration(value, seconds) -> None:
+    assert parse_reset_duration(value) == pytest.approx(seconds)
+
+
+@pytest.mark.parametrize("value", [None, "", "soon"])
+def test_parse_reset_duration_rejects_unknown_values(value) -> None:
+    assert parse_reset_duration(value) is None
+
+
+def test_rate_budget_paces_reservations_beyond_capacity() -> None:
+    budget = RateBudget(per_minute=600, headroom=1.0)
+    assert budget.reserve(600) == 0
+    # 600 per minute refills 10 per second
+    assert budget.reserve(50) == pytest.approx(5.0, abs=0.1)
+
+
+def test_rate_budget_of_zero_is_disabled() -> None:
+    # Without a budget, the scheduler sleeps out retry delays itself
+    budget = RateBudget(per_minute=0, headroom=0.9)
+    assert budget.reserve(10**9) == 0
+    budget.pause(60)
+    assert budget.reserve(1) == 0
+
+
+def test_pack_respects_request_limits() -> None:
+    scheduler = EmbeddingScheduler(FakeAgent())
+    scheduler.max_inputs = 3
+    scheduler.max_request_tokens = 9
+    scheduler.max_input_tokens = 8
+    texts = ["a" * 4] * 5 + ["b" * 32, "c" * 4]
+    # 4 characters are one token, 32 characters are eight
+    assert scheduler.pack(texts) == [[0, 1, 2], [3, 4], [5, 6]]
+
+    with pytest.raises(ValueError):
+        scheduler.pack(["d" * 40])
+
+
+def test_embed_returns_embeddings_in_input_order() -> None:
+    agent = FakeAgent()
+    scheduler = EmbeddingScheduler(agent)
+    scheduler.max_inputs = 2
+    texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+    embeddings = asyncio.run(scheduler.embed(texts, "model"))
+    assert [int(embedding[0]) for embedding in embeddings] == [1, 2, 3, 4, 5]
+    assert len(agent.requests) == 3
+
+
+def test_limits_are_taken_from_response_headers() -> None:
+    agent = FakeAgent(
+        headers={
+            "x-ratelimit-limit-tokens": "1000000",
+            "x-ratelimit-remaining-tokens": "999000",
+            "x-ratelimit-limit-requests": "3000",
+            "x-ratelimit-remaining-requests": "2999",
+        }
+    )
+    scheduler = EmbeddingScheduler(agent)
+    assert scheduler.stats()["tpm_limit"] == 0
+    asyncio.run(scheduler.embed(["hello"], "model"))
+    stats = scheduler.stats()
+    assert stats["tpm_limit"] == 1000000
+    assert stats["rpm_limit"] == 3000
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the scheduler's sleeps instead of sleeping."""
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(embedding_scheduler.asyncio, "sleep", sleep)
+    return delays
+
+
+def test_rate_limited_request_is_retried_after_advertised_delay(sleeps) -> None:
+    agent = FakeAgent(
+        failures=[
+            RateLimitError({"retry-after": "2"}),
+            RateLimitError({"retry-after-ms": "10", "x-ratelimit-limit-requests": "3000"}),
+        ]
+    )
+    scheduler = EmbeddingScheduler(agent)
+    # The default configuration has no budgets until the provider reports its limits
+    assert scheduler.stats()["rpm_limit"] == 0
+    embeddings = asyncio.run(scheduler.embed(["hello"], "model"))
+    assert len(embeddings) == 1
+    assert len(agent.requests) == 3
+    assert sleeps[:2] == [2.0, 0.01]
+    assert scheduler.stats()["rate_limited"] == 2
+    # Limits on a 429 response are taken as well
+    assert scheduler.stats()["rpm_limit"] == 3000
+
+
+def test_rate_limited_request_waits_in_real_time() -> None:
+    agent = FakeAgent(failures=[RateLimitError({"retry-after-ms": "200"})])
+    scheduler = EmbeddingScheduler(agent)
+    start = time.perf_counter()
+    asyncio.run(scheduler.embed(["hello"], "model"))
+    assert time.perf_counter() - start >= 0.2
+
+
+@pytest.mark.parametrize(
+    "error",
+    [ServerError(500), ServerError(503), ServerError(408), ConnectionResetError("reset"), TimeoutError()],
+)
+def test_transient_errors_are_retried_with_backoff(sleeps, error) -> None:
+    agent = FakeAgent(failures=[error, error])
+    scheduler = EmbeddingScheduler(agent)
+    embeddings = asyncio.run(scheduler.embed(["hello"], "model"))
+    assert len(embeddings) == 1
+    assert len(agent.requests) == 3
+    assert sleeps == [2, 4]
+    assert scheduler.stats()["failed_requests"] == 2
+    assert scheduler.stats()["rate_limited"] == 0
+
+
+@pytest.mark.usefixtures("sleeps")
+def test_transient_errors_fail_after_the_client_retry_count(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "AGENT_MAX_RETRIES", 2)
+    agent = FakeAgent(failures=[ServerError(502)] * 3)
+    scheduler = EmbeddingScheduler(agent)
+    with pytest.raises(ServerError):
+        asyncio.run(scheduler.embed(["hello"], "model"))
+    assert len(agent.requests) == 3
+
+
+def test_other_errors_are_not_retried(sleeps) -> None:
+    agent = FakeAgent(failures=[ServerError(400)])
+    scheduler = EmbeddingScheduler(agent)
+    with pytest.raises(ServerError):
+        asyncio.run(scheduler.embed(["hello"], "model"))
+    assert len(agent.requests) == 1
+    assert sleeps == []
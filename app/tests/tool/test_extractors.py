@@ -0,0 +1,129 @@
+import zipfile
+
+import pytest
+from openpyxl import Workbook
+
+from app.core.config import settings
+from app.tool import extractors
+from app.tool.extractors import (
+    UnsupportedDocumentType,
+    _iter_text_blocks,
+    extract_csv,
+    extract_docx,
+    extract_html,
+    extract_pdf,
+    extract_text,
+    extract_xlsx,
+    get_extractor,
+)
+
+DOCUMENT_XML = (
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+    "<w:p><w:r><w:t>First </w:t></w:r><w:r><w:t>paragraph</w:t></w:r></w:p>"
+    "<w:p></w:p>"
+    "<w:p><w:r><w:t>Name</w:t><w:tab/><w:t>Value</w:t><w:br/><w:t>next line</w:t></w:r></w:p>"
+    "</w:body></w:document>"
+)
+
+
+def extract(extractor, path):
+    updates = []
+    segments = list(extractor(str(path), updates.append))
+    return segments, updates
+
+
+@pytest.mark.parametrize(
+    "key, content_type, extractor",
+    [
+        ("report.pdf", None, extract_pdf),
+        ("REPORT.PDF", "application/octet-stream", extract_pdf),
+        ("notes.md", None, extract_text),
+        ("data.csv", "text/csv; charset=utf-8", extract_csv),
+        ("upload", "text/html", extract_html),
+        # The content type the uploader set wins over the extension
+        ("sheet.txt", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", extract_xlsx),
+        # An unknown content type falls back to the extension
+        ("letter.docx", "application/x-unknown", extract_docx),
+    ],
+)
+def test_get_extractor(key, content_type, extractor) -> None:
+    assert get_extractor(key, content_type) is extractor
+
+
+def test_unsupported_documents_are_refused() -> None:
+    with pytest.raises(UnsupportedDocumentType, match=r"\.csv"):
+        get_extractor("image.png", "image/png")
+
+
+def test_text_blocks_never_split_words(monkeypatch) -> None:
+    monkeypatch.setattr(extractors, "TEXT_BLOCK_SIZE", 4)
+    blocks = list(_iter_text_blocks(["alpha be", "ta gam", "ma  delta"]))
+    assert "".join(blocks) == "alpha beta gamma  delta"
+    assert all(block[-1].isspace() for block in blocks[:-1])
+    assert [word for block in blocks for word in block.split()] == ["alpha", "beta", "gamma", "delta"]
+
+    # Text without whitespace is cut rather than buffered without bound
+    blocks = list(_iter_text_blocks(["x" * 10] * 3))
+    assert len(blocks) == 2
+
+
+def test_extract_text(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(extractors, "TEXT_BLOCK_SIZE", 16)
+    path = tmp_path / "notes.txt"
+    text = " ".join(f"word{index}" for index in range(50))
+    path.write_text(text, encoding="utf-8")
+    segments, updates = extract(extract_text, path)
+    assert "".join(segments) == text
+    assert len(segments) > 1
+    assert updates[0] == {"bytes": len(text), "bytes_read": 0}
+    assert updates[-1] == {"bytes_read": len(text)}
+
+
+def test_extract_csv(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "EXTRACTION_ROWS_PER_SEGMENT", 2)
+    path = tmp_path / "data.csv"
+    path.write_text("name,city,\nAda,London,x\n,,\nAlan,,\nGrace,Arlington\n", encoding="utf-8")
+    segments, updates = extract(extract_csv, path)
+    assert segments == [
+        "name: Ada | city: London | Column 3: x\nname: Alan",
+        "name: Grace | city: Arlington",
+    ]
+    assert updates == [{"rows_extracted": 2}, {"rows_extracted": 3}]
+
+
+def test_extract_xlsx(tmp_path) -> None:
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "People"
+    sheet.append(["name", "age"])
+    sheet.append(["Ada", 36])
+    other = workbook.create_sheet("Cities")
+    other.append(["city"])
+    other.append(["London"])
+    path = tmp_path / "data.xlsx"
+    workbook.save(path)
+
+    segments, updates = extract(extract_xlsx, path)
+    assert segments == ["Sheet: People\nname: Ada | age: 36", "Sheet: Cities\ncity: London"]
+    assert updates[-1] == {"rows_extracted": 2}
+
+
+def test_extract_docx(tmp_path) -> None:
+    path = tmp_path / "letter.docx"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("word/document.xml", DOCUMENT_XML)
+    segments, updates = extract(extract_docx, path)
+    assert segments == ["First paragraph", "Name\tValue\nnext line"]
+    assert updates == [{"paragraphs_extracted": 2}]
+
+
+def test_extract_html(tmp_path) -> None:
+    path = tmp_path / "page.html"
+    path.write_text(
+        "<html><head><title>Title</title><style>p { color: red }</style></head>"
+        "<body><script>var hidden = 1;</script><table><tr><td>a</td><td>b</td></tr></table>"
+        "<p>Fish &amp; chips</p></body></html>",
+        encoding="utf-8",
+    )
+    segments, _ = extract(extract_html, path)
+    assert "".join(segments).split() == ["Title", "a", "b", "Fish", "&", "chips"]
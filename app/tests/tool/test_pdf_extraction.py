@@ -0,0 +1,65 @@
+import pytest
+
+from app.core.config import settings
+from app.tests.utils.pdf import make_pdf
+from app.tool import pdf_extraction
+from app.tool.pdf_extraction import (
+    PdfExtractionPool,
+    default_extraction_processes,
+    iter_pdf_page_texts,
+)
+
+PAGE_TEXTS = [f"page {index} text" for index in range(20)]
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(make_pdf(PAGE_TEXTS))
+    return str(path)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = PdfExtractionPool(processes=2, pages_per_task=3)
+    monkeypatch.setattr(pdf_extraction, "pdf_extraction_pool", pool)
+    yield pool
+    pool.shutdown()
+
+
+def test_pool_extracts_pages_in_order(pool, pdf_path) -> None:
+    pages = list(pool.iter_page_texts(pdf_path, len(PAGE_TEXTS)))
+    assert [text.strip() for text, _ in pages] == PAGE_TEXTS
+    assert not any(timed_out for _, timed_out in pages)
+    # The processes are kept for the next document
+    executor = pool._executor
+    assert list(pool.iter_page_texts(pdf_path, 2)) == pages[:2]
+    assert pool._executor is executor
+
+
+def test_large_documents_are_extracted_by_the_pool(pool, pdf_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "PDF_EXTRACTION_MIN_PAGES", 16)
+    updates = []
+    texts = list(iter_pdf_page_texts(pdf_path, updates.append))
+    assert [text.strip() for text in texts] == PAGE_TEXTS
+    assert pool._executor is not None
+    assert updates[0] == {"pages": 20, "pages_extracted": 0}
+    assert updates[-1] == {"pages_extracted": 20, "pages_timed_out": 0}
+
+
+def test_small_documents_are_extracted_in_process(pool, pdf_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "PDF_EXTRACTION_MIN_PAGES", 100)
+    texts = list(iter_pdf_page_texts(pdf_path))
+    assert [text.strip() for text in texts] == PAGE_TEXTS
+    assert pool._executor is None
+
+
+def test_processes_default_to_the_cores_of_each_worker(monkeypatch) -> None:
+    monkeypatch.setattr(pdf_extraction.os, "cpu_count", lambda: 8)
+    monkeypatch.setattr(settings, "WORKER_PROCESSES", 2)
+    assert default_extraction_processes() == 4
+    assert PdfExtractionPool(processes=0).processes == 4
+    assert PdfExtractionPool(processes=3).processes == 3
+
+    monkeypatch.setattr(settings, "WORKER_PROCESSES", 16)
+    assert default_extraction_processes() == 1
@@ -0,0 +1,98 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.core.data_versions import DataVersions
+from app.tool import retrieval_cache as retrieval_cache_module
+from app.tool.retrieval_cache import RetrievalCache
+
+
+@pytest.fixture
+def versions_path(tmp_path):
+    return str(tmp_path / "jobs.sqlite3")
+
+
+@pytest.fixture
+def cache(versions_path):
+    return RetrievalCache(
+        ttl=60,
+        max_entries_per_tenant=10,
+        max_tenants=10,
+        semantic=True,
+        semantic_threshold=0.95,
+        versions=DataVersions(versions_path, cache_ttl=0),
+    )
+
+
+def retrieve(cache, query, embedding, results, tenant_id="t1"):
+    searches = []
+
+    async def embed(_text):
+        return np.asarray(embedding, dtype=np.float32)
+
+    async def search(vector):
+        searches.append(vector)
+        return results
+
+    key = cache.make_key(query, 5, 0.5)
+    found = asyncio.run(cache.retrieve("Tenant", tenant_id, query, key, embed, search))
+    return found, len(searches)
+
+
+@pytest.fixture(autouse=True)
+def cache_enabled(monkeypatch):
+    monkeypatch.setattr(retrieval_cache_module.settings, "RETRIEVAL_CACHE_ENABLED", True)
+
+
+def test_repeated_query_is_served_from_cache(cache) -> None:
+    assert retrieve(cache, "Payment terms", [1, 0], ["a"]) == (["a"], 1)
+    assert retrieve(cache, " Payment  terms ", [1, 0], ["b"]) == (["a"], 0)
+    assert retrieve(cache, "payment terms", [1, 0], ["c"], tenant_id="t2") == (["c"], 1)
+    assert cache.stats()["exact_hits"] == 1
+
+
+def test_queries_differing_in_case_have_different_keys(cache) -> None:
+    assert cache.make_key("US  exports", 5, 0.5) == cache.make_key(" US exports", 5, 0.5)
+    assert cache.make_key("US exports", 5, 0.5) != cache.make_key("us exports", 5, 0.5)
+    cache.semantic = False
+    retrieve(cache, "US exports", [1, 0], ["a"])
+    assert retrieve(cache, "us exports", [1, 0], ["b"]) == (["b"], 1)
+
+
+def test_similar_query_is_served_in_semantic_mode(cache) -> None:
+    retrieve(cache, "payment terms", [1, 0], ["a"])
+    assert retrieve(cache, "terms of payment", [0.99, 0.05], ["b"]) == (["a"], 0)
+    assert retrieve(cache, "notice period", [0, 1], ["c"]) == (["c"], 1)
+    assert cache.stats()["semantic_hits"] == 1
+
+
+def test_bump_invalidates_only_the_written_tenant(cache) -> None:
+    retrieve(cache, "payment terms", [1, 0], ["a"])
+    retrieve(cache, "payment terms", [1, 0], ["a"], tenant_id="t2")
+    asyncio.run(cache.bump("Tenant", "t1"))
+    assert retrieve(cache, "payment terms", [1, 0], ["b"]) == (["b"], 1)
+    assert retrieve(cache, "payment terms", [1, 0], ["b"], tenant_id="t2") == (["a"], 0)
+
+
+def test_write_in_another_process_invalidates(cache, versions_path) -> None:
+    retrieve(cache, "payment terms", [1, 0], ["a"])
+    # A worker process bumps the version through its own connection
+    DataVersions(versions_path).bump("Tenant", "t1")
+    assert retrieve(cache, "payment terms", [1, 0], ["b"]) == (["b"], 1)
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_results_of_an_older_version_are_not_stored(cache) -> None:
+    key = cache.make_key("payment terms", 5, 0.5)
+    version = cache.version("Tenant", "t1")
+    asyncio.run(cache.bump("Tenant", "t1"))
+    cache.store("Tenant", "t1", key, ["stale"], version)
+    assert cache.get("Tenant", "t1", key) is None
+    assert cache.stats()["stale_stores"] == 1
+
+
+def test_entries_expire_after_ttl(cache) -> None:
+    cache.ttl = -1
+    retrieve(cache, "payment terms", [1, 0], ["a"])
+    assert retrieve(cache, "payment terms", [1, 0], ["b"]) == (["b"], 1)
@@ -0,0 +1,164 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.tests.utils.vector_store import make_object
+from app.tool.retrieval_cache import RetrievalCache
+from app.tool.retrieval_engine import RetrievalEngine
+from app.tool.single_flight import SingleFlight
+from app.tool.tenant_replica import HotTenantReplicas
+
+COLLECTION = settings.TENANT_KNOWLEDGE_COLLECTION_NAME
+
+QUERY_VECTORS = {
+    "payment": [1, 0, 0, 0],
+    "notice": [0, 1, 0, 0],
+}
+
+
+class FakeAITool:
+    def __init__(self):
+        self.embedded = []
+
+    async def get_embeddings(self, text):
+        self.embedded.append([text])
+        return np.asarray(QUERY_VECTORS[text], dtype=np.float32)
+
+    async def get_embeddings_batch(self, texts):
+        self.embedded.append(list(texts))
+        return [np.asarray(QUERY_VECTORS[text], dtype=np.float32) for text in texts]
+
+
+@pytest.fixture
+def ai_tool():
+    return FakeAITool()
+
+
+@pytest.fixture
+def engine(ai_tool):
+    return RetrievalEngine(
+        ai_tool=ai_tool,
+        cache=RetrievalCache(semantic=False),
+        single_flight=SingleFlight(),
+        replicas=HotTenantReplicas(),
+    )
+
+
+def insert(vector_store, tenant_id, objects):
+    failed = asyncio.run(vector_store.insert_batch(COLLECTION, objects, tenant_id))
+    assert not failed
+
+
+def test_threshold_and_top_k_are_pushed_down(engine, vector_store, tenant_id) -> None:
+    insert(
+        vector_store,
+        tenant_id,
+        [
+            make_object("exact", [1, 0, 0, 0]),
+            make_object("close", [0.9, 0.1, 0, 0]),
+            make_object("related", [0.6, 0.8, 0, 0]),
+            make_object("unrelated", [0, 0, 1, 0]),
+        ],
+    )
+
+    results = asyncio.run(engine.retrieve(COLLECTION, "payment", top_k=10, score_threshold=0.5, tenant_id=tenant_id))
+    assert [result["content"] for result in results] == ["exact", "close", "related"]
+    assert results[0]["metadata"]["score"] == pytest.approx(1.0)
+    assert all(result["metadata"]["score"] >= 0.5 for result in results)
+
+    results = asyncio.run(engine.retrieve(COLLECTION, "payment", top_k=1, score_threshold=0.0, tenant_id=tenant_id))
+    assert [result["content"] for result in results] == ["exact"]
+
+
+def test_only_requested_properties_are_returned(engine, vector_store, tenant_id) -> None:
+    insert(vector_store, tenant_id, [make_object("exact", [1, 0, 0, 0], source="terms.pdf")])
+
+    (result,) = asyncio.run(engine.retrieve(COLLECTION, "payment", tenant_id=tenant_id))
+    assert result["title"] == "terms.pdf"
+    assert "properties" not in result and "vector" not in result
+
+    (result,) = asyncio.run(
+        engine.retrieve(
+            COLLECTION,
+            "payment",
+            tenant_id=tenant_id,
+            return_properties=("content", "knowledge_type"),
+            include_vector=True,
+        )
+    )
+    assert result["title"] == ""
+    assert result["properties"] == {"knowledge_type": "document"}
+    assert result["vector"] == [1, 0, 0, 0]
+
+
+@pytest.mark.usefixtures("vector_store")
+def test_unknown_tenant_has_no_results(engine) -> None:
+    assert asyncio.run(engine.retrieve(COLLECTION, "payment", tenant_id="missing")) == []
+
+
+def test_repeated_retrieval_is_served_from_cache(engine, ai_tool, vector_store, tenant_id) -> None:
+    insert(vector_store, tenant_id, [make_object("exact", [1, 0, 0, 0])])
+    first = asyncio.run(engine.retrieve(COLLECTION, "payment", tenant_id=tenant_id))
+    second = asyncio.run(engine.retrieve(COLLECTION, "payment", tenant_id=tenant_id))
+    assert first == second
+    assert ai_tool.embedded == [["payment"]]
+
+
+def test_batch_embeds_distinct_queries_once(engine, ai_tool, vector_store, tenant_id) -> None:
+    insert(vector_store, tenant_id, [make_object("payment terms", [1, 0, 0, 0]), make_object("notice", [0, 1, 0, 0])])
+    requests = [
+        {"query": query, "top_k": 1, "score_threshold": 0.5, "tenant_id": tenant_id}
+        for query in ("payment", "notice", "payment")
+    ]
+
+    responses = asyncio.run(engine.retrieve_batch(COLLECTION, requests))
+    assert [response["results"][0]["content"] for response in responses] == ["payment terms", "notice", "payment terms"]
+    assert ai_tool.embedded == [["payment", "notice"]]
+
+
+def test_failed_query_does_not_fail_the_batch(engine, monkeypatch, vector_store, tenant_id) -> None:
+    insert(vector_store, tenant_id, [make_object("payment terms", [1, 0, 0, 0])])
+    retrieve = engine.retrieve
+
+    async def retrieve_or_fail(collection_name, query, **kwargs):
+        if query == "notice":
+            raise RuntimeError("search failed")
+        return await retrieve(collection_name, query, **kwargs)
+
+    monkeypatch.setattr(engine, "retrieve", retrieve_or_fail)
+    requests = [
+        {"query": query, "top_k": 1, "score_threshold": 0.5, "tenant_id": tenant_id} for query in ("notice", "payment")
+    ]
+
+    failed, succeeded = asyncio.run(engine.retrieve_batch(COLLECTION, requests))
+    assert failed == {"results": [], "error": "search failed"}
+    assert succeeded["results"][0]["content"] == "payment terms"
+
+
+def test_federated_retrieval_merges_weighted_scores(engine, ai_tool, vector_store, tenant_id) -> None:
+    other_tenant = f"{tenant_id}b"
+    asyncio.run(vector_store.create_tenants(COLLECTION, [other_tenant]))
+    insert(vector_store, tenant_id, [make_object("first", [1, 0, 0, 0]), make_object("third", [0.6, 0.8, 0, 0])])
+    insert(vector_store, other_tenant, [make_object("second", [0.9, 0.1, 0, 0])])
+    general = settings.GENERAL_KNOWLEDGE_COLLECTION_NAME
+    assert not asyncio.run(vector_store.insert_batch(general, [make_object("general", [1, 0, 0, 0])]))
+
+    response = asyncio.run(
+        engine.retrieve_federated(
+            "payment",
+            [(COLLECTION, tenant_id, 1.0), (COLLECTION, other_tenant, 1.0), (general, None, 0.5), ("Missing", None, 1.0)],
+            top_k=3,
+            score_threshold=0.5,
+        )
+    )
+
+    results = response["results"]
+    assert [result["content"] for result in results] == ["first", "second", "third"]
+    assert [result["metadata"]["knowledge_id"] for result in results] == [tenant_id, other_tenant, tenant_id]
+    scores = [result["metadata"]["weighted_score"] for result in results]
+    assert scores == sorted(scores, reverse=True)
+    assert [error["collection"] for error in response["errors"]] == ["Missing"]
+    # The query is embedded once for every target
+    assert ai_tool.embedded == [["payment"]]
@@ -0,0 +1,97 @@
+import asyncio
+import io
+
+import pytest
+
+from app.core.config import settings
+from app.tool import s3
+from app.tool.s3 import download_s3_object, process_s3_object
+
+
+class Body:
+    def __init__(self, data, fail_after=None):
+        self.data = data
+        self.fail_after = fail_after
+
+    def iter_chunks(self, chunk_size):
+        for start in range(0, len(self.data), 4):
+            if self.fail_after is not None and start >= self.fail_after:
+                raise ConnectionError("connection reset")
+            yield self.data[start : start + 4]
+
+
+class StubS3Client:
+    def __init__(self, data, content_type="", failures=0):
+        self.data = data
+        self.content_type = content_type
+        self.failures = failures
+        self.ranges = []
+
+    def head_object(self, Bucket, Key):
+        return {"ContentLength": len(self.data), "ContentType": self.content_type}
+
+    def get_object(self, Bucket, Key, Range):
+        self.ranges.append(Range)
+        start, end = (int(value) for value in Range.removeprefix("bytes=").split("-"))
+        fail_after = None
+        if self.failures:
+            self.failures -= 1
+            fail_after = 4
+        return {"Body": Body(self.data[start : end + 1], fail_after)}
+
+
+def test_download_requests_the_object_in_parts() -> None:
+    data = bytes(range(100))
+    client = StubS3Client(data)
+    file = io.BytesIO()
+    download_s3_object(client, "doc.pdf", file, len(data), part_size=40)
+    assert file.read() == data
+    assert client.ranges == ["bytes=0-39", "bytes=40-79", "bytes=80-99"]
+
+
+def test_broken_part_is_requested_again() -> None:
+    data = bytes(range(100))
+    client = StubS3Client(data, failures=2)
+    file = io.BytesIO()
+    download_s3_object(client, "doc.pdf", file, len(data), part_size=40)
+    # The partial writes of the broken transfers are discarded
+    assert file.read() == data
+    assert client.ranges == ["bytes=0-39"] * 3 + ["bytes=40-79", "bytes=80-99"]
+
+
+def test_download_gives_up_after_the_retries(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "S3_DOWNLOAD_PART_RETRIES", 1)
+    client = StubS3Client(bytes(100), failures=2)
+    with pytest.raises(ConnectionError):
+        download_s3_object(client, "doc.pdf", io.BytesIO(), 100, part_size=40)
+    assert len(client.ranges) == 2
+
+
+def test_process_s3_object_streams_chunks_to_the_store(monkeypatch) -> None:
+    words = [f"word{index}" for index in range(2000)]
+    client = StubS3Client(" ".join(words).encode(), content_type="text/plain")
+    synced = {}
+    statuses = []
+
+    async def sync(chunks, tenant_id, source, progress=None):
+        synced.update(tenant_id=tenant_id, source=source, chunks=[chunk async for chunk in chunks])
+        progress({"chunks_stored": len(synced["chunks"])})
+        return {"status": "success", "inserted": len(synced["chunks"])}
+
+    async def update_document_status(key, status):
+        statuses.append((key, status))
+
+    monkeypatch.setattr(s3, "get_s3_client", lambda: client)
+    monkeypatch.setattr(s3, "sync_source_records_with_tenant_id", sync)
+    monkeypatch.setattr(s3, "update_document_status", update_document_status)
+    monkeypatch.setattr(settings, "S3_DOWNLOAD_PART_SIZE", 4096)
+    updates = []
+
+    result = asyncio.run(process_s3_object("t1", "notes", updates.append))
+
+    assert result["inserted"] == len(synced["chunks"]) > 1
+    assert " ".join(chunk["content"] for chunk in synced["chunks"]).split() == words
+    assert (synced["tenant_id"], synced["source"]) == ("t1", "notes")
+    assert statuses == [("notes", "done")]
+    assert [update["stage"] for update in updates if "stage" in update] == ["downloading", "ingesting", "done"]
+    assert {"bytes_read": len(client.data)} in updates
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from app.tool import single_flight as single_flight_module
+from app.tool.single_flight import SingleFlight
+
+
+@pytest.fixture(autouse=True)
+def single_flight_enabled(monkeypatch):
+    monkeypatch.setattr(single_flight_module.settings, "RETRIEVAL_SINGLE_FLIGHT_ENABLED", True)
+
+
+def test_identical_calls_share_one_run() -> None:
+    group = SingleFlight()
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return ["result"]
+
+    async def main():
+        return await asyncio.gather(*[group.do("key", compute) for _ in range(5)], group.do("other", compute))
+
+    results = asyncio.run(main())
+    assert results == [["result"]] * 6
+    assert len(runs) == 2
+    assert group.stats()["collapsed"] == 4
+    assert group.stats()["in_flight"] == 0
+
+
+def test_every_caller_receives_the_error() -> None:
+    group = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("search failed")
+
+    async def main():
+        return await asyncio.gather(*[group.do("key", fail) for _ in range(3)], return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(main()))
+
+
+def test_cancelled_caller_does_not_cancel_the_others() -> None:
+    group = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        first = asyncio.create_task(group.do("key", compute))
+        second = asyncio.create_task(group.do("key", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "result"
+    assert group.stats()["cancelled"] == 0
+
+
+def test_new_caller_after_last_cancel_starts_a_fresh_run() -> None:
+    group = SingleFlight()
+    started = []
+
+    async def compute():
+        started.append(1)
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            # Cleanup keeps the cancelled run alive a little longer
+            await asyncio.sleep(0.05)
+            raise
+        return len(started)
+
+    async def main():
+        caller = asyncio.create_task(group.do("key", compute))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        await asyncio.sleep(0)
+        return await group.do("key", compute)
+
+    assert asyncio.run(main()) == 2
+    assert group.stats()["cancelled"] == 1
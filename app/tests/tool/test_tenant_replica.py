@@ -0,0 +1,73 @@
+import asyncio
+
+import numpy as np
+
+from app.core.config import settings
+from app.tests.utils.vector_store import make_object
+from app.tool.retrieval_cache import get_retrieval_cache
+from app.tool.tenant_replica import HotTenantReplicas, TenantReplica
+
+COLLECTION = settings.TENANT_KNOWLEDGE_COLLECTION_NAME
+
+
+def test_replica_search_is_exact_top_k() -> None:
+    matrix = np.asarray([[1, 0], [0, 1], [0.8, 0.6]], dtype=np.float32)
+    replica = TenantReplica(["a", "b", "c"], matrix, ["A", "B", "C"], ["", "", ""], version=0)
+    assert [(uuid, round(score, 3)) for uuid, score, _ in replica.search([2, 0], 2, 0.0)] == [
+        ("a", 1.0),
+        ("c", 0.8),
+    ]
+    assert [uuid for uuid, _, _ in replica.search([0, 1], 3, 0.5)] == ["b", "c"]
+    assert replica.search([0, 0], 3, 0.0) == []
+
+
+def search_repeatedly(replicas, tenant_id, times, bump_after=None):
+    """Search a tenant, waiting for background loads between searches."""
+
+    async def main():
+        answers = []
+        for index in range(times):
+            answers.append(await replicas.search(COLLECTION, tenant_id, [1, 0, 0, 0], 2, 0.5, None))
+            await asyncio.gather(*list(replicas._tasks))
+            if index == bump_after:
+                await get_retrieval_cache().bump(COLLECTION, tenant_id)
+        return answers
+
+    return asyncio.run(main())
+
+
+def test_hot_tenant_is_served_from_its_replica(vector_store, tenant_id) -> None:
+    objects = [
+        make_object("exact", [1, 0, 0, 0], source="a.txt"),
+        make_object("close", [0.9, 0.1, 0, 0]),
+        make_object("unrelated", [0, 1, 0, 0]),
+    ]
+    asyncio.run(vector_store.insert_batch(COLLECTION, objects, tenant_id))
+    replicas = HotTenantReplicas(max_bytes=1 << 20, max_objects=100, hot_accesses=2, ttl=60, verify_rate=0)
+
+    first, second, third = search_repeatedly(replicas, tenant_id, 3)
+    assert first is None and second is None
+    assert [result["content"] for result in third] == ["exact", "close"]
+    assert third[0]["title"] == "a.txt"
+    assert replicas.stats()["loads"] == 1
+    assert replicas.stats()["hits"] == 1
+
+
+def test_write_to_the_tenant_drops_its_replica(vector_store, tenant_id) -> None:
+    asyncio.run(vector_store.insert_batch(COLLECTION, [make_object("exact", [1, 0, 0, 0])], tenant_id))
+    replicas = HotTenantReplicas(max_bytes=1 << 20, max_objects=100, hot_accesses=1, ttl=60, verify_rate=0)
+
+    answers = search_repeatedly(replicas, tenant_id, 3, bump_after=1)
+    assert answers[1] is not None
+    assert answers[2] is None
+    # The hot tenant is reloaded at its new version
+    assert replicas.stats()["loads"] == 2
+
+
+def test_large_tenant_is_not_replicated(vector_store, tenant_id) -> None:
+    objects = [make_object(f"chunk {index}", [1, index, 0, 0]) for index in range(3)]
+    asyncio.run(vector_store.insert_batch(COLLECTION, objects, tenant_id))
+    replicas = HotTenantReplicas(max_bytes=1 << 20, max_objects=2, hot_accesses=1, ttl=60, verify_rate=0)
+
+    assert search_repeatedly(replicas, tenant_id, 3) == [None, None, None]
+    assert replicas.stats()["loads"] == 0
@@ -0,0 +1,182 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.tool import vectorDB_tool
+from app.tool.vectorDB_tool import (
+    chunk_uuid,
+    store_vector_record_with_tenant_id,
+    sync_source_records_with_tenant_id,
+)
+from app.utils.helpers import content_hash
+
+COLLECTION = settings.TENANT_KNOWLEDGE_COLLECTION_NAME
+
+
+class FakeAITool:
+    def __init__(self):
+        self.embedded = []
+
+    async def get_embeddings(self, text):
+        self.embedded.append(text)
+        return np.full(4, len(text), dtype=np.float32)
+
+
+def items(contents, source="doc.txt"):
+    return [
+        {
+            "content": content,
+            "source": source,
+            "knowledge_type": "document",
+            "metadata": {"source_id": f"{index}_{source}"},
+        }
+        for index, content in enumerate(contents)
+    ]
+
+
+def stored_chunks(vector_store, tenant_id):
+    objects = asyncio.run(
+        vector_store.fetch(COLLECTION, 100, tenant_id=tenant_id, return_properties=["content", "metadata"])
+    )
+    return {obj.uuid: (obj.properties["content"], obj.properties["metadata"]["source_id"]) for obj in objects}
+
+
+@pytest.fixture
+def sync(tenant_id):
+    def sync(contents, ai_tool, source="doc.txt"):
+        return asyncio.run(
+            sync_source_records_with_tenant_id(items(contents, source), tenant_id, source, ai_tool=ai_tool)
+        )
+
+    return sync
+
+
+def test_chunk_uuids_are_deterministic() -> None:
+    chunk_hash = content_hash("alpha")
+    assert chunk_uuid("t1", "doc.txt", chunk_hash) == chunk_uuid("t1", "doc.txt", chunk_hash)
+    assert len({
+        chunk_uuid("t1", "doc.txt", chunk_hash),
+        chunk_uuid("t2", "doc.txt", chunk_hash),
+        chunk_uuid("t1", "other.txt", chunk_hash),
+        chunk_uuid("t1", "doc.txt", chunk_hash, occurrence=1),
+    }) == 4
+
+
+def test_resync_embeds_only_changed_chunks(sync, vector_store, tenant_id) -> None:
+    ai_tool = FakeAITool()
+    result = sync(["alpha", "beta", "gamma", "beta"], ai_tool)
+    assert (result["inserted"], result["skipped"], result["deleted"]) == (4, 0, 0)
+
+    ai_tool = FakeAITool()
+    result = sync(["new", "alpha", "beta", "beta"], ai_tool)
+    assert ai_tool.embedded == ["new"]
+    assert (result["inserted"], result["skipped"], result["moved"], result["deleted"]) == (1, 3, 2, 1)
+
+    # Unchanged chunks keep their UUID; the two that moved get their new position
+    assert sorted(stored_chunks(vector_store, tenant_id).values()) == [
+        ("alpha", "1_doc.txt"),
+        ("beta", "2_doc.txt"),
+        ("beta", "3_doc.txt"),
+        ("new", "0_doc.txt"),
+    ]
+
+
+def test_unchanged_document_is_not_rewritten(sync) -> None:
+    sync(["alpha", "beta"], FakeAITool())
+    ai_tool = FakeAITool()
+    result = sync(["alpha", "beta"], ai_tool)
+    assert ai_tool.embedded == []
+    assert (result["inserted"], result["skipped"], result["moved"], result["deleted"]) == (0, 2, 0, 0)
+
+
+def test_other_documents_are_left_alone(sync, vector_store, tenant_id) -> None:
+    sync(["alpha"], FakeAITool(), source="other.txt")
+    result = sync(["beta"], FakeAITool())
+    sync(["gamma"], FakeAITool())
+    assert result["deleted"] == 0
+    assert sorted(content for content, _ in stored_chunks(vector_store, tenant_id).values()) == ["alpha", "gamma"]
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the backoff delays, sleeping for none of them."""
+    delays = []
+    sleep = asyncio.sleep
+
+    async def record(delay, result=None):
+        delays.append(delay)
+        return await sleep(0, result)
+
+    monkeypatch.setattr(vectorDB_tool.asyncio, "sleep", record)
+    return delays
+
+
+@pytest.fixture
+def rejections(vector_store, monkeypatch):
+    """Make the store reject objects by content, a given number of times each."""
+    rejected = {}
+    batches = []
+    insert_batch = vector_store.insert_batch
+
+    async def flaky_insert_batch(collection_name, objects, tenant_id=None):
+        batches.append([obj["properties"]["content"] for obj in objects])
+        errors = {}
+        accepted = []
+        for obj in objects:
+            content = obj["properties"]["content"]
+            if rejected.get(content, 0) > 0:
+                rejected[content] -= 1
+                errors[obj["uuid"]] = "connection reset"
+            else:
+                accepted.append(obj)
+        errors.update(await insert_batch(collection_name, accepted, tenant_id))
+        return errors
+
+    monkeypatch.setattr(vector_store, "insert_batch", flaky_insert_batch)
+    return rejected, batches
+
+
+def store(tenant_id):
+    contents = [f"chunk {index}" for index in range(5)]
+    return asyncio.run(store_vector_record_with_tenant_id(items(contents), tenant_id, ai_tool=FakeAITool()))
+
+
+def test_items_are_imported_in_batches(vector_store, tenant_id, rejections, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "WEAVIATE_BATCH_SIZE", 2)
+    _, batches = rejections
+    result = store(tenant_id)
+    assert (result["status"], result["inserted"], result["failed"]) == ("success", 5, [])
+    assert batches == [["chunk 0", "chunk 1"], ["chunk 2", "chunk 3"], ["chunk 4"]]
+    assert [batch["objects"] for batch in result["batches"]] == [2, 2, 1]
+    assert asyncio.run(vector_store.count(COLLECTION, tenant_id)) == 5
+
+
+def test_rejected_objects_are_rebatched_with_backoff(
+    vector_store, tenant_id, rejections, sleeps, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "WEAVIATE_BATCH_RETRY_BACKOFF", 0.5)
+    rejected, batches = rejections
+    rejected.update({"chunk 1": 2, "chunk 3": 1})
+
+    result = store(tenant_id)
+
+    assert (result["status"], result["inserted"], result["failed"]) == ("success", 5, [])
+    # The rejected objects alone are sent again, after 0.5s and then 1s
+    assert batches[1:] == [["chunk 1", "chunk 3"], ["chunk 1"]]
+    assert sleeps == [0.5, 1.0]
+    assert asyncio.run(vector_store.count(COLLECTION, tenant_id)) == 5
+
+
+@pytest.mark.usefixtures("sleeps")
+def test_objects_rejected_after_every_retry_are_reported(vector_store, tenant_id, rejections) -> None:
+    rejected, batches = rejections
+    rejected["chunk 2"] = settings.WEAVIATE_BATCH_MAX_RETRIES + 1
+
+    result = store(tenant_id)
+
+    assert (result["status"], result["inserted"]) == ("partial", 4)
+    assert result["failed"] == [{"data": "2_doc.txt", "message": "connection reset"}]
+    assert len(batches) == 1 + settings.WEAVIATE_BATCH_MAX_RETRIES
+    assert asyncio.run(vector_store.count(COLLECTION, tenant_id)) == 4
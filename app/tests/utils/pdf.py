@@ -0,0 +1,33 @@
+
+
+def make_pdf(page_texts: list[str]) -> bytes:
+    """Build a PDF with one line of text per page."""
+    page_numbers = [4 + 2 * index for index in range(len(page_texts))]
+    out = b"%PDF-1.4\n"
+    offsets = {}
+
+    def add(number, data):
+        nonlocal out
+        offsets[number] = len(out)
+        out += f"{number} 0 obj\n".encode() + data + b"\nendobj\n"
+
+    add(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{number} 0 R" for number in page_numbers)
+    add(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_texts)} >>".encode())
+    add(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for number, text in zip(page_numbers, page_texts, strict=True):
+        stream = f"BT /F1 12 Tf 20 800 Td ({text}) Tj ET"
+        add(
+            number,
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {number + 1} 0 R >>".encode(),
+        )
+        add(number + 1, f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode())
+
+    xref = len(out)
+    size = max(offsets) + 1
+    out += f"xref\n0 {size}\n0000000000 65535 f \n".encode()
+    for number in range(1, size):
+        out += f"{offsets[number]:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
@@ -0,0 +1,123 @@
+import asyncio
+import random
+import string
+import threading
+
+import pytest
+
+from app.utils.helpers import (
+    _is_chunk_boundary,
+    iter_content_chunks,
+    iterate_in_thread,
+    split_content_into_chunks,
+)
+
+WORDS = "the contract party shall pay notice within days of term service data liability agreement clause".split()
+
+
+def test_iterate_in_thread_yields_items_in_order() -> None:
+    async def main():
+        return [item async for item in iterate_in_thread(iter(range(100)), buffer_size=3)]
+
+    assert asyncio.run(main()) == list(range(100))
+
+
+def test_iterate_in_thread_produces_a_bounded_number_of_items_ahead() -> None:
+    produced = []
+
+    def items():
+        for index in range(100):
+            produced.append(index)
+            yield index
+
+    async def main():
+        iterator = iterate_in_thread(items(), buffer_size=4)
+        first = await iterator.__anext__()
+        await asyncio.sleep(0.1)
+        ahead = len(produced)
+        await iterator.aclose()
+        return first, ahead
+
+    first, ahead = asyncio.run(main())
+    assert first == 0
+    # The queue holds buffer_size items, plus one waiting to be put and one being produced
+    assert ahead <= 4 + 3
+
+
+def test_iterate_in_thread_raises_the_iterator_error() -> None:
+    def items():
+        yield 1
+        raise ValueError("bad page")
+
+    async def main():
+        return [item async for item in iterate_in_thread(items(), buffer_size=2)]
+
+    with pytest.raises(ValueError, match="bad page"):
+        asyncio.run(main())
+
+
+def test_iterator_can_be_closed_after_iterate_in_thread_stops() -> None:
+    closed = threading.Event()
+
+    def items():
+        try:
+            index = 0
+            while True:
+                yield index
+                index += 1
+        finally:
+            closed.set()
+
+    async def main():
+        iterator = items()
+        async for item in iterate_in_thread(iterator, buffer_size=2):
+            if item == 5:
+                break
+        return iterator
+
+    iterator = asyncio.run(main())
+    iterator.close()
+    assert closed.is_set()
+
+
+def test_streamed_chunks_match_chunks_of_the_joined_text() -> None:
+    pages = [" ".join(f"page{page}word{index}" for index in range(300)) for page in range(5)]
+    streamed = list(iter_content_chunks(pages, "doc.pdf", chunk_size=200))
+    assert streamed == split_content_into_chunks(" ".join(pages), "doc.pdf", chunk_size=200)
+    assert [chunk["metadata"]["source_id"] for chunk in streamed] == [
+        f"{index}_doc.pdf" for index in range(len(streamed))
+    ]
+
+
+def changed_chunks(words, edited_words, **kwargs):
+    """Return how many chunks of the words are not among the chunks of the edited words."""
+    original = iter_content_chunks([" ".join(words)], "doc.pdf", **kwargs)
+    edited = iter_content_chunks([" ".join(edited_words)], "doc.pdf", **kwargs)
+    return len({chunk["content_hash"] for chunk in original} - {chunk["content_hash"] for chunk in edited})
+
+
+def test_content_defined_chunks_survive_an_early_edit() -> None:
+    rnd = random.Random(0)
+    words = [rnd.choice(WORDS) for _ in range(20000)]
+    edited_words = words[:10] + ["inserted", "words"] + words[10:]
+    # Only the chunk around the edit changes
+    assert changed_chunks(words, edited_words, content_defined=True) == 1
+    # Fixed-size chunks all shift, until the words happen to line up again
+    assert changed_chunks(words, edited_words) > 10
+
+
+def test_content_defined_chunks_mostly_end_at_content_boundaries() -> None:
+    rnd = random.Random(1)
+    vocabulary = [
+        "".join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(2, 9))) for _ in range(3000)
+    ]
+    words = [rnd.choice(vocabulary) for _ in range(30000)]
+    chunks = list(iter_content_chunks([" ".join(words)], "doc.pdf", content_defined=True))
+    capped = [
+        chunk for chunk in chunks[:-1] if not _is_chunk_boundary(*chunk["content"].split()[-2:])
+    ]
+    assert len(capped) < 0.05 * len(chunks)
+    for position in (5, 50, 500):
+        edited_words = words[:position] + ["inserted", "words"] + words[position:]
+        # A chunk cut at the size cap would shift its successors until a content boundary resyncs them
+        assert changed_chunks(words, edited_words, content_defined=True) <= 2
@@ -0,0 +1,12 @@
+import uuid
+
+import numpy as np
+
+
+def make_object(content: str, vector, source: str = "doc.txt") -> dict:
+    """An object to insert, with a random UUID and its vector as float32."""
+    return {
+        "uuid": str(uuid.uuid4()),
+        "properties": {"content": content, "source": source, "knowledge_type": "document"},
+        "vector": np.asarray(vector, dtype=np.float32),
+    }
@@ -0,0 +1,14 @@
+class StubClient:
+    """Stands in for a connected Weaviate client."""
+
+    def __init__(self):
+        self.closed = False
+
+    def is_connected(self) -> bool:
+        return not self.closed
+
+    def is_live(self) -> bool:
+        return not self.closed
+
+    def close(self) -> None:
+        self.closed = True
@@ -1,12 +1,21 @@
 from typing import Dict, List, Optional
-from app.core.ai_agents.factory import AIAgentFactory
+from app.core.ai_agents.factory import AIAgentFactory, BaseAIAgent
 from app.core.config import settings
+from app.tool.embedding_batcher import EmbeddingBatcher, EmbeddingBatchMetrics
+from app.tool.embedding_cache import get_embedding_cache, make_cache_key
+from app.tool.embedding_scheduler import EmbeddingScheduler
 import asyncio
+import threading
+import weakref
 from concurrent.futures import ThreadPoolExecutor
 from typing import List
+import numpy as np
 
 # Get the configured AI agent provider
-agent_provider = settings.AI_AGENT_PROVIDER  # Will be "openai" or "ai_tool"
+agent_provider = settings.AI_AGENT_PROVIDER  # Will be "openai" or "openai_async"
+
+# Get the configured embedding provider, defaulting to the agent provider
+embedding_provider = settings.EMBEDDING_PROVIDER or agent_provider
 
 # Get the configured embedding model
 embedding_model = (
@@ -16,8 +25,87 @@ embedding_model = (
 
 class AITool:
     def __init__(self):
-        self.ai_agent = AIAgentFactory.create_agent(agent_provider)
-        self.client = self.ai_agent.get_client()
+        self._ai_agent: Optional[BaseAIAgent] = None
+        self._ai_agent_lock = threading.Lock()
+        # Embeddings may come from a different provider than completions
+        self.embedding_agent = (
+            AIAgentFactory.create_agent(embedding_provider)
+            if embedding_provider and embedding_provider != agent_provider
+            else self.ai_agent
+        )
+        # Every embedding request is packed and paced under the provider rate limits
+        self.embedding_scheduler = EmbeddingScheduler(self.embedding_agent)
+        # Concurrent get_embeddings calls are coalesced by one batcher per event loop
+        self.batch_metrics = EmbeddingBatchMetrics(settings.EMBEDDING_BATCH_MAX_SIZE)
+        self._batchers: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, EmbeddingBatcher] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def ai_agent(self) -> BaseAIAgent:
+        """
+        Completion agent, created on first use.
+
+        With a separate embedding provider (e.g. EMBEDDING_PROVIDER=local) the
+        service embeds and retrieves offline, without AGENT_API_KEY, until a
+        completion is requested.
+        """
+        if self._ai_agent is None:
+            with self._ai_agent_lock:
+                if self._ai_agent is None:
+                    self._ai_agent = AIAgentFactory.create_agent(agent_provider)
+        return self._ai_agent
+
+    @property
+    def client(self):
+        """Provider client (async agents hand out one client per event loop)."""
+        return self.ai_agent.get_client()
+
+    def _get_batcher(self) -> EmbeddingBatcher:
+        loop = asyncio.get_running_loop()
+        batcher = self._batchers.get(loop)
+        if batcher is None:
+            batcher = EmbeddingBatcher(
+                self.embedding_scheduler.embed,
+                self.batch_metrics,
+                check_input=self.embedding_scheduler.check_input,
+            )
+            self._batchers[loop] = batcher
+        return batcher
+
+    async def _embed_uncached(self, texts: List[str], model: str) -> List[np.ndarray]:
+        if settings.EMBEDDING_BATCH_ENABLED:
+            batcher = self._get_batcher()
+            return list(await asyncio.gather(*[batcher.embed(text, model) for text in texts]))
+        return await self.embedding_scheduler.embed(texts, model)
+
+    async def _embed_cached(self, texts: List[str], model: str, embed_missing) -> List[np.ndarray]:
+        """
+        Resolve embeddings from the memory and disk cache tiers, embedding only the misses.
+
+        Args:
+            texts: Input texts
+            model: The embedding model
+            embed_missing: Coroutine function embedding a list of uncached texts
+
+        Returns:
+            One embedding per input text, in input order
+        """
+        cache = get_embedding_cache()
+        # Keyed by provider and model identity: embeddings of different models are not comparable
+        model_id = self.embedding_agent.embedding_model_id(model)
+        keys = [make_cache_key(text, model_id, settings.EMBEDDING_DIMENSIONS) for text in texts]
+        found = cache.get_memory(set(keys))
+        missing = {key: text for key, text in zip(keys, texts, strict=True) if key not in found}
+        if missing:
+            found.update(await asyncio.to_thread(cache.get_disk, list(missing)))
+            missing = {key: text for key, text in missing.items() if key not in found}
+        if missing:
+            vectors = dict(zip(missing, await embed_missing(list(missing.values())), strict=True))
+            packed = cache.put_memory(vectors)
+            await asyncio.to_thread(cache.put_disk, packed)
+            found.update(vectors)
+        return [found[key] for key in keys]
 
     async def get_completion(
         self,
@@ -39,7 +127,8 @@ class AITool:
             The generated completion text
         """
         try:
-            response = await self.client.chat.completions.create(
+            response = await self.ai_agent.request(
+                self.client.chat.completions.create,
                 model=model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=temperature,
@@ -53,23 +142,30 @@ class AITool:
         self,
         text: str,
         model: str = embedding_model,
-    ) -> List[float]:
+    ) -> np.ndarray:
         """
         Get embeddings for a text using OpenAI's API.
 
+        Results are served from the embedding cache when EMBEDDING_CACHE_ENABLED is
+        set. Concurrent cache misses are coalesced into batched requests by the
+        micro-batcher when EMBEDDING_BATCH_ENABLED is set. Embeddings are
+        contiguous float32 arrays end to end and can be passed to Weaviate as is.
+
         Args:
             text: The input text to get embeddings for
             model: The model to use (default: text-embedding-ada-002)
 
         Returns:
-            List of embedding values
+            float32 embedding array
         """
         try:
-            response =  self.client.embeddings.create(
-                model=model,
-                input=text,
-            )
-            return response.data[0].embedding
+            if settings.EMBEDDING_CACHE_ENABLED:
+                embeddings = await self._embed_cached(
+                    [text], model, lambda missing: self._embed_uncached(missing, model)
+                )
+            else:
+                embeddings = await self._embed_uncached([text], model)
+            return embeddings[0]
         except Exception as e:
             raise Exception(f"Error getting embeddings from OpenAI: {str(e)}")
 
@@ -77,7 +173,7 @@ class AITool:
         self,
         texts: List[str],
         model: str = embedding_model,
-    ) -> List[List[float]]:
+    ) -> List[np.ndarray]:
         """
         Get embeddings for multiple texts using OpenAI's API.
 
@@ -86,14 +182,14 @@ class AITool:
             model: The model to use (default: text-embedding-ada-002)
 
         Returns:
-            List of embedding lists
+            List of float32 embedding arrays
         """
         try:
-            response = await self.client.embeddings.create(
-                model=model,
-                input=texts,
-            )
-            return [data.embedding for data in response.data]
+            if settings.EMBEDDING_CACHE_ENABLED:
+                return await self._embed_cached(
+                    texts, model, lambda missing: self.embedding_scheduler.embed(missing, model)
+                )
+            return await self.embedding_scheduler.embed(texts, model)
         except Exception as e:
             raise Exception(f"Error getting batch embeddings from OpenAI: {str(e)}")
 
@@ -118,7 +214,8 @@ class AITool:
         """
         prompt = f"""Given an input question, create a syntactically correct {db_dialect} query to run to help find the answer.Unless the user specifies in his question a specific number of examples they wish to obtain, always limit your query to at most {top_k} results. You can order the results by a relevant column to return the most interesting examples in the database. Never query for all the columns from a specific table, only ask for a the few relevant columns given the question. Pay attention to use only the column names that you can see in the schema description. Be careful to not query for columns that do not exist. Also, pay attention to which column is in which table. Only use the following these tables:{tables_info}. Question: {user_query}."""
         try:
-            response =  self.client.chat.completions.create(
+            response = await self.ai_agent.request(
+                self.client.chat.completions.create,
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": str(prompt)}],  # Ensure prompt is string
                 temperature=0.0,  # Use 0 temperature for deterministic SQL generation
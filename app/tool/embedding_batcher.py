@@ -0,0 +1,178 @@
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.core.config import settings
+
+EmbedBatchFn = Callable[[List[str], str], Awaitable[List[np.ndarray]]]
+
+
+def is_input_error(error: BaseException) -> bool:
+    """
+    Return whether a failed embedding request was rejected because of its inputs.
+
+    Such requests fail the same way when retried, but the inputs that are not
+    at fault succeed on their own. Rate limiting, timeouts and server errors
+    are not input errors.
+    """
+    if isinstance(error, ValueError):
+        return True
+    status_code = getattr(error, "status_code", None)
+    return status_code is not None and 400 <= status_code < 500 and status_code not in (408, 409, 429)
+
+
+class EmbeddingBatchMetrics:
+    """Counters describing how well concurrent embedding requests are coalesced."""
+
+    def __init__(self, max_batch_size: int):
+        self.max_batch_size = max_batch_size
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.batched_texts = 0
+        self.failed_batches = 0
+        self.split_batches = 0
+        self.total_queue_delay = 0.0
+        self.max_queue_delay = 0.0
+
+    def record(self, requests: int, unique_texts: int, queue_delays: List[float], failed: bool) -> None:
+        with self._lock:
+            self.requests += requests
+            self.batches += 1
+            self.batched_texts += unique_texts
+            self.failed_batches += int(failed)
+            self.total_queue_delay += sum(queue_delays)
+            self.max_queue_delay = max(self.max_queue_delay, max(queue_delays, default=0.0))
+
+    def record_split(self) -> None:
+        with self._lock:
+            self.split_batches += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            batches = self.batches or 1
+            requests = self.requests or 1
+            return {
+                "requests": self.requests,
+                "batches": self.batches,
+                "failed_batches": self.failed_batches,
+                "split_batches": self.split_batches,
+                "avg_batch_size": round(self.batched_texts / batches, 2),
+                "batch_fill_ratio": round(self.batched_texts / batches / self.max_batch_size, 3),
+                "avg_queue_delay_ms": round(self.total_queue_delay / requests * 1000, 3),
+                "max_queue_delay_ms": round(self.max_queue_delay * 1000, 3),
+            }
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent single-text embedding requests into batched provider calls.
+
+    Requests are queued per model and flushed when ``max_batch_size`` texts are
+    waiting or ``max_wait_ms`` has passed since the first one arrived, whichever
+    comes first. Identical texts in a batch are sent once. A batcher is bound to
+    the event loop it is first used on.
+
+    One caller's input must not fail the callers it was batched with: inputs
+    are validated with ``check_input`` before they are queued, and a batch the
+    provider rejects because of its inputs (see ``is_input_error``) is retried
+    one text per request, so only the offending callers get the error.
+    """
+
+    def __init__(
+        self,
+        embed_batch: EmbedBatchFn,
+        metrics: EmbeddingBatchMetrics,
+        max_batch_size: int = settings.EMBEDDING_BATCH_MAX_SIZE,
+        max_wait_ms: float = settings.EMBEDDING_BATCH_MAX_WAIT_MS,
+        check_input: Optional[Callable[[str], None]] = None,
+    ):
+        self.embed_batch = embed_batch
+        self.metrics = metrics
+        self.check_input = check_input
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: Dict[str, List[Tuple[str, asyncio.Future, float]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: set = set()
+
+    async def embed(self, text: str, model: str) -> np.ndarray:
+        """
+        Queue a text for the next batch and wait for its embedding.
+
+        Args:
+            text: The input text to embed
+            model: The embedding model to use
+
+        Returns:
+            The float32 embedding of the text
+
+        Raises:
+            ValueError: If check_input rejects the text
+        """
+        if self.check_input is not None:
+            self.check_input(text)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._pending.setdefault(model, [])
+        queue.append((text, future, time.perf_counter()))
+        if len(queue) >= self.max_batch_size:
+            self._flush(model)
+        elif model not in self._timers:
+            self._timers[model] = loop.call_later(self.max_wait, self._flush, model)
+        return await future
+
+    def _flush(self, model: str) -> None:
+        timer = self._timers.pop(model, None)
+        if timer is not None:
+            timer.cancel()
+        queue = self._pending.pop(model, [])
+        while queue:
+            batch, queue = queue[: self.max_batch_size], queue[self.max_batch_size :]
+            task = asyncio.get_running_loop().create_task(self._send(model, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, model: str, batch: List[Tuple[str, asyncio.Future, float]]) -> None:
+        sent_at = time.perf_counter()
+        queue_delays = [sent_at - enqueued_at for _, _, enqueued_at in batch]
+        texts = list(dict.fromkeys(text for text, _, _ in batch))
+        try:
+            outcomes = await self._embed_texts(texts, model)
+        except asyncio.CancelledError:
+            for _, future, _ in batch:
+                future.cancel()
+            raise
+        failed = any(isinstance(outcome, BaseException) for outcome in outcomes.values())
+        self.metrics.record(len(batch), len(texts), queue_delays, failed)
+
+        for text, future, _ in batch:
+            if future.done():
+                # The caller was cancelled while waiting
+                continue
+            outcome = outcomes[text]
+            if isinstance(outcome, BaseException):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    async def _embed_texts(
+        self, texts: List[str], model: str
+    ) -> Dict[str, Union[np.ndarray, BaseException]]:
+        """Embed texts in one request, or one by one if the request is rejected because of an input."""
+        try:
+            return dict(zip(texts, await self.embed_batch(texts, model), strict=True))
+        except Exception as e:
+            if len(texts) == 1 or not is_input_error(e):
+                return dict.fromkeys(texts, e)
+        self.metrics.record_split()
+        outcomes = await asyncio.gather(
+            *[self.embed_batch([text], model) for text in texts], return_exceptions=True
+        )
+        return {
+            text: outcome if isinstance(outcome, BaseException) else outcome[0]
+            for text, outcome in zip(texts, outcomes, strict=True)
+        }
@@ -0,0 +1,189 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+# Approximate per-entry bookkeeping cost of the in-memory tier (key, node, refs)
+_ENTRY_OVERHEAD = 120
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different inputs share a cache entry."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def make_cache_key(text: str, model: str, dimensions: Optional[int] = None) -> str:
+    """
+    Content address of an embedding: hash of the model, dimensions and normalized text.
+
+    The model is the agent's embedding_model_id, which names the provider and,
+    for the local model, the model file's identity.
+    """
+    digest = hashlib.sha256()
+    digest.update(model.encode())
+    if dimensions:
+        digest.update(f"@{dimensions}".encode())
+    digest.update(b"\0")
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier, content-addressed embedding cache.
+
+    Embeddings are stored as packed float32 bytes under ``make_cache_key`` and
+    handed out as read-only float32 arrays over those bytes (no copy). The
+    first tier is an in-memory LRU bounded by ``max_bytes``; the second is a
+    SQLite file that survives restarts and is shared by every process on the
+    host. Entries found on disk are promoted to memory.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = settings.EMBEDDING_CACHE_MAX_BYTES,
+        path: Optional[str] = (
+            settings.EMBEDDING_CACHE_PATH if settings.EMBEDDING_CACHE_DISK_ENABLED else None
+        ),
+    ):
+        self.max_bytes = max_bytes
+        self.path = path
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._db = db
+        return self._db
+
+    @staticmethod
+    def _pack(vector: np.ndarray) -> bytes:
+        return np.asarray(vector, dtype=np.float32).tobytes()
+
+    @staticmethod
+    def _unpack(data: bytes) -> np.ndarray:
+        return np.frombuffer(data, dtype=np.float32)
+
+    def _remember(self, key: str, data: bytes) -> None:
+        """Insert into the memory tier, evicting least recently used entries. Needs _lock."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = data
+        self._memory_bytes += len(data) + _ENTRY_OVERHEAD
+        while self._memory_bytes > self.max_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted) + _ENTRY_OVERHEAD
+            self.evictions += 1
+
+    def get_memory(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Look keys up in the memory tier."""
+        found = {}
+        with self._lock:
+            for key in keys:
+                data = self._memory.get(key)
+                if data is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = self._unpack(data)
+            self.memory_hits += len(found)
+        return found
+
+    def get_disk(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Look keys up in the disk tier (blocking) and promote hits to memory."""
+        if not self.path or not keys:
+            with self._lock:
+                self.misses += len(keys)
+            return {}
+        rows = []
+        with self._db_lock:
+            db = self._connect()
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                rows.extend(
+                    db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+                )
+        found = {}
+        with self._lock:
+            for key, data in rows:
+                self._remember(key, data)
+                found[key] = self._unpack(data)
+            self.disk_hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_memory(self, items: Dict[str, np.ndarray]) -> Dict[str, bytes]:
+        """Store embeddings in the memory tier and return their packed form."""
+        packed = {key: self._pack(vector) for key, vector in items.items()}
+        with self._lock:
+            for key, data in packed.items():
+                self._remember(key, data)
+        return packed
+
+    def put_disk(self, packed: Dict[str, bytes]) -> None:
+        """Persist packed embeddings to the disk tier (blocking)."""
+        if not self.path or not packed:
+            return
+        with self._db_lock:
+            db = self._connect()
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    packed.items(),
+                )
+            self.disk_writes += len(packed)
+
+    def stats(self) -> dict:
+        """Return cache occupancy and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "max_bytes": self.max_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_writes": self.disk_writes,
+            }
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+embedding_cache = EmbeddingCache()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Return the embedding cache instance."""
+    return embedding_cache
@@ -0,0 +1,305 @@
+import asyncio
+import math
+import re
+import threading
+import time
+from typing import List, Mapping, Optional
+
+import numpy as np
+import openai
+
+from app.core.ai_agents.factory import BaseAIAgent
+from app.core.config import settings
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse rate-limit reset durations such as "20ms", "1s" or "6m0s" into seconds."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Whether a failed provider request may succeed when sent again (timeouts, resets, 5xx)."""
+    if isinstance(error, (openai.APIConnectionError, ConnectionError, TimeoutError)):
+        return True
+    status_code = getattr(error, "status_code", None)
+    return status_code in (408, 409) or (isinstance(status_code, int) and status_code >= 500)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English text (about four characters per token)."""
+    return max(1, math.ceil(len(text) / 4))
+
+
+class RateBudget:
+    """
+    Per-minute budget refilled continuously (a token bucket that may go negative).
+
+    Callers reserve capacity up front and are told how long to wait until the
+    reservation is covered, so concurrent callers are paced in arrival order.
+    A limit of 0 disables the budget.
+    """
+
+    def __init__(self, per_minute: int, headroom: float):
+        self.headroom = headroom
+        self._lock = threading.Lock()
+        self.set_limit(per_minute)
+
+    def set_limit(self, per_minute: int) -> None:
+        with self._lock:
+            self.per_minute = per_minute
+            self.capacity = per_minute * self.headroom
+            self.rate = self.capacity / 60.0
+            self.level = self.capacity
+            self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self, amount: float) -> float:
+        """Reserve capacity and return the seconds to wait before using it."""
+        if self.per_minute <= 0:
+            return 0.0
+        with self._lock:
+            self._refill()
+            self.level -= amount
+            return max(0.0, -self.level / self.rate)
+
+    def adjust(self, amount: float) -> None:
+        """Correct an earlier reservation (positive amounts consume more)."""
+        if self.per_minute <= 0:
+            return
+        with self._lock:
+            self._refill()
+            self.level -= amount
+
+    def observe_remaining(self, remaining: float, reset_seconds: Optional[float]) -> None:
+        """Align the budget with the provider's view of what is left in the window."""
+        if self.per_minute <= 0:
+            return
+        with self._lock:
+            self._refill()
+            self.level = min(self.level, remaining - (1 - self.headroom) * self.per_minute)
+            if remaining <= 0 and reset_seconds:
+                self.level = min(self.level, -reset_seconds * self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Block new work for the given number of seconds."""
+        if self.per_minute <= 0:
+            return
+        with self._lock:
+            self._refill()
+            self.level = min(self.level, -seconds * self.rate)
+
+
+class EmbeddingScheduler:
+    """
+    Packs embedding inputs into provider requests and paces them under rate limits.
+
+    Inputs are packed in order into requests holding at most
+    EMBEDDING_MAX_INPUTS_PER_REQUEST texts and EMBEDDING_MAX_TOKENS_PER_REQUEST
+    estimated tokens. Every request reserves its tokens and one request from the
+    tokens-per-minute and requests-per-minute budgets first, sleeping until both
+    are available, so throughput stays just under the quota instead of bursting
+    into 429s. Rate-limit headers on each response re-align the budgets (and
+    lower the configured limits to the provider's when those are tighter, or
+    supply them when none are configured, the default: the quota of the key in
+    use is then followed as it changes). A 429 is retried here rather than by
+    the client, after the advertised retry delay, which also pauses all other
+    callers once the limits are known. Timeouts, connection errors and 5xx
+    responses are retried with backoff, up to AGENT_MAX_RETRIES times. Agents that are not rate limited (the local CPU
+    model) are called directly.
+    """
+
+    def __init__(self, ai_agent: BaseAIAgent):
+        self.ai_agent = ai_agent
+        headroom = settings.EMBEDDING_RATE_LIMIT_HEADROOM
+        self.tokens = RateBudget(settings.EMBEDDING_RATE_LIMIT_TPM, headroom)
+        self.requests = RateBudget(settings.EMBEDDING_RATE_LIMIT_RPM, headroom)
+        self.max_inputs = settings.EMBEDDING_MAX_INPUTS_PER_REQUEST
+        self.max_request_tokens = settings.EMBEDDING_MAX_TOKENS_PER_REQUEST
+        self.max_input_tokens = settings.EMBEDDING_MAX_TOKENS_PER_INPUT
+        self.max_retries = settings.EMBEDDING_RATE_LIMIT_MAX_RETRIES
+        self._stats_lock = threading.Lock()
+        self.sent_requests = 0
+        self.sent_tokens = 0
+        self.rate_limited = 0
+        self.failed_requests = 0
+        self.throttled_seconds = 0.0
+
+    def check_input(self, text: str) -> None:
+        """
+        Reject an input the provider would refuse, before it is batched with others.
+
+        Raises:
+            ValueError: If the input exceeds the per-input token limit
+        """
+        if not self.ai_agent.rate_limited:
+            return
+        tokens = estimate_tokens(text)
+        if tokens > self.max_input_tokens:
+            raise ValueError(
+                f"Input has about {tokens} tokens, above the limit of {self.max_input_tokens}"
+            )
+
+    def pack(self, texts: List[str]) -> List[List[int]]:
+        """
+        Group input indexes into requests that respect the per-request limits.
+
+        Raises:
+            ValueError: If a single input exceeds the per-input token limit
+        """
+        requests: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for index, text in enumerate(texts):
+            tokens = estimate_tokens(text)
+            if tokens > self.max_input_tokens:
+                raise ValueError(
+                    f"Input {index} has about {tokens} tokens, above the limit of {self.max_input_tokens}"
+                )
+            if current and (
+                len(current) >= self.max_inputs
+                or current_tokens + tokens > self.max_request_tokens
+            ):
+                requests.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            requests.append(current)
+        return requests
+
+    async def embed(self, texts: List[str], model: str) -> List[np.ndarray]:
+        """
+        Embed texts with as few paced requests as the provider limits allow.
+
+        Args:
+            texts: Input texts
+            model: Embedding model name
+
+        Returns:
+            One float32 embedding per input text, in input order
+        """
+        if not texts:
+            return []
+        if not self.ai_agent.rate_limited:
+            return await self.ai_agent.create_embeddings(texts, model)
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+
+        async def send(indexes: List[int]) -> None:
+            batch = [texts[i] for i in indexes]
+            for i, embedding in zip(indexes, await self._send(batch, model), strict=True):
+                results[i] = embedding
+
+        await asyncio.gather(*[send(indexes) for indexes in self.pack(texts)])
+        return results
+
+    async def _send(self, texts: List[str], model: str) -> List[np.ndarray]:
+        estimated = sum(estimate_tokens(text) for text in texts)
+        attempt = 0
+        failures = 0
+        while True:
+            wait = max(self.tokens.reserve(estimated), self.requests.reserve(1))
+            if wait > 0:
+                with self._stats_lock:
+                    self.throttled_seconds += wait
+                await asyncio.sleep(wait)
+            try:
+                response = await self.ai_agent.create_embedding_response(
+                    texts, model, max_retries=0
+                )
+            except Exception as e:
+                # A rejected request consumed nothing; the retry reserves again
+                self.tokens.adjust(-estimated)
+                self.requests.adjust(-1)
+                headers = getattr(getattr(e, "response", None), "headers", None) or {}
+                if getattr(e, "status_code", None) == 429:
+                    if attempt >= self.max_retries:
+                        raise
+                    attempt += 1
+                    delay = self._retry_delay(headers, attempt)
+                    with self._stats_lock:
+                        self.rate_limited += 1
+                    print(f"Embedding request rate limited, retrying in {delay:.2f}s (attempt {attempt})")
+                    self._observe_headers(headers)
+                    # Other callers wait out the delay through the budgets (when limits are known)
+                    self.tokens.pause(delay)
+                    self.requests.pause(delay)
+                elif is_transient_error(e):
+                    if failures >= settings.AGENT_MAX_RETRIES:
+                        raise
+                    failures += 1
+                    delay = self._retry_delay(headers, failures)
+                    with self._stats_lock:
+                        self.failed_requests += 1
+                    print(f"Embedding request failed ({str(e)}), retrying in {delay:.2f}s (attempt {failures})")
+                else:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+
+            if response.total_tokens is not None:
+                self.tokens.adjust(response.total_tokens - estimated)
+            self._observe_headers(response.headers)
+            with self._stats_lock:
+                self.sent_requests += 1
+                self.sent_tokens += response.total_tokens or estimated
+            return response.embeddings
+
+    @staticmethod
+    def _retry_delay(headers: Mapping[str, str], attempt: int) -> float:
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms:
+            try:
+                return float(retry_after_ms) / 1000
+            except ValueError:
+                pass
+        for name in ("retry-after", "x-ratelimit-reset-tokens", "x-ratelimit-reset-requests"):
+            delay = parse_reset_duration(headers.get(name))
+            if delay:
+                return delay
+        return min(2 ** attempt, 60)
+
+    def _observe_headers(self, headers: Mapping[str, str]) -> None:
+        for budget, kind, configured in (
+            (self.tokens, "tokens", settings.EMBEDDING_RATE_LIMIT_TPM),
+            (self.requests, "requests", settings.EMBEDDING_RATE_LIMIT_RPM),
+        ):
+            limit = headers.get(f"x-ratelimit-limit-{kind}")
+            if limit and limit.isdigit():
+                effective = int(limit) if configured <= 0 else min(configured, int(limit))
+                if effective != budget.per_minute:
+                    budget.set_limit(effective)
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining and remaining.isdigit():
+                budget.observe_remaining(
+                    int(remaining),
+                    parse_reset_duration(headers.get(f"x-ratelimit-reset-{kind}")),
+                )
+
+    def stats(self) -> dict:
+        """Return pacing counters and the limits currently in force."""
+        with self._stats_lock:
+            return {
+                "requests": self.sent_requests,
+                "tokens": self.sent_tokens,
+                "rate_limited": self.rate_limited,
+                "failed_requests": self.failed_requests,
+                "throttled_seconds": round(self.throttled_seconds, 3),
+                "tpm_limit": self.tokens.per_minute,
+                "rpm_limit": self.requests.per_minute,
+            }
@@ -0,0 +1,293 @@
+"""
+Text extractors for ingested documents.
+
+Extractors are registered per content type and file extension. Each one reads
+a document from a file and yields its text in segments (PDF pages, spreadsheet
+row batches, DOCX paragraphs, HTML and plain text blocks) as it reads, so the
+chunker downstream never needs the whole text at once.
+"""
+import csv
+import os
+import xml.etree.ElementTree as ElementTree
+import zipfile
+from html.parser import HTMLParser
+from typing import (
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from openpyxl import load_workbook
+
+from app.core.config import settings
+from app.tool.pdf_extraction import iter_pdf_page_texts
+
+# Extractor: (path, progress callback) -> text segments
+Extractor = Callable[[str, Callable[[Dict], None]], Iterator[str]]
+
+# Bytes of text read per block from text-based formats
+TEXT_BLOCK_SIZE = 64 * 1024
+
+# Content types S3 reports when the uploader did not set one
+GENERIC_CONTENT_TYPES = {"", "application/octet-stream", "binary/octet-stream"}
+
+_extractors_by_content_type: Dict[str, Extractor] = {}
+_extractors_by_extension: Dict[str, Extractor] = {}
+
+
+class UnsupportedDocumentType(ValueError):
+    """No extractor is registered for a document's content type or extension."""
+
+
+def register_extractor(content_types: Sequence[str], extensions: Sequence[str]):
+    """
+    Register an extractor for content types and file extensions.
+
+    Args:
+        content_types: MIME types handled, e.g. "text/csv"
+        extensions: File extensions handled, including the dot, e.g. ".csv"
+    """
+    def decorator(extractor: Extractor) -> Extractor:
+        for content_type in content_types:
+            _extractors_by_content_type[content_type] = extractor
+        for extension in extensions:
+            _extractors_by_extension[extension] = extractor
+        return extractor
+
+    return decorator
+
+
+def get_extractor(key: str, content_type: Optional[str] = None) -> Extractor:
+    """
+    Return the extractor for a document.
+
+    A specific content type takes precedence over the file extension.
+
+    Args:
+        key: File name or object key of the document
+        content_type: Optional MIME type of the document
+
+    Returns:
+        The extractor
+
+    Raises:
+        UnsupportedDocumentType: If neither the content type nor the extension is supported
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type not in GENERIC_CONTENT_TYPES and media_type in _extractors_by_content_type:
+        return _extractors_by_content_type[media_type]
+    extension = os.path.splitext(key)[1].lower()
+    if extension in _extractors_by_extension:
+        return _extractors_by_extension[extension]
+    raise UnsupportedDocumentType(
+        f"Unsupported document type for {key} (content type: {content_type or 'unknown'}). "
+        f"Supported extensions: {', '.join(sorted(_extractors_by_extension))}"
+    )
+
+
+def _split_at_whitespace(text: str) -> Tuple[str, str]:
+    """Split text after its last whitespace, so no word is cut in two."""
+    for index in range(len(text) - 1, -1, -1):
+        if text[index].isspace():
+            return text[: index + 1], text[index + 1 :]
+    return "", text
+
+
+def _iter_text_blocks(texts: Iterable[str]) -> Iterator[str]:
+    """Re-cut a stream of text pieces at whitespace, holding back partial words."""
+    carry = ""
+    for text in texts:
+        block, carry = _split_at_whitespace(carry + text)
+        if block:
+            yield block
+        elif len(carry) > 4 * TEXT_BLOCK_SIZE:
+            # Text without whitespace; cut it rather than buffering it all
+            yield carry + " "
+            carry = ""
+    if carry:
+        yield carry
+
+
+def _read_text(path: str, progress: Callable[[Dict], None]) -> Iterator[str]:
+    """Read a text file in blocks, reporting the file size and the bytes read."""
+    with open(path, encoding="utf-8", errors="replace") as file:
+        progress({"bytes": os.fstat(file.fileno()).st_size, "bytes_read": 0})
+        while True:
+            text = file.read(TEXT_BLOCK_SIZE)
+            if not text:
+                return
+            yield text
+            progress({"bytes_read": file.buffer.tell()})
+
+
+def _format_row(header: List[str], row: Sequence) -> str:
+    cells = [
+        f"{name}: {value}"
+        # Rows may be shorter or longer than the header
+        for name, value in zip(header, row, strict=False)
+        if value is not None and str(value).strip() != ""
+    ]
+    return " | ".join(cells)
+
+
+def _iter_row_segments(
+    rows: Iterable[Sequence],
+    progress: Callable[[Dict], None],
+    title: Optional[str] = None,
+    count: int = 0,
+) -> Generator[str, None, int]:
+    """
+    Yield batches of rows, each row formatted as "column: value" pairs under the first row's names.
+
+    Returns the row count, starting from count, for progress across sheets.
+    """
+    header: Optional[List[str]] = None
+    lines: List[str] = [f"Sheet: {title}"] if title else []
+    for row in rows:
+        if header is None:
+            header = [
+                str(name).strip() if name is not None and str(name).strip() else f"Column {index + 1}"
+                for index, name in enumerate(row)
+            ]
+            continue
+        line = _format_row(header, row)
+        if not line:
+            continue
+        lines.append(line)
+        count += 1
+        if len(lines) >= settings.EXTRACTION_ROWS_PER_SEGMENT:
+            yield "\n".join(lines)
+            lines = []
+            progress({"rows_extracted": count})
+    if lines:
+        yield "\n".join(lines)
+    progress({"rows_extracted": count})
+    return count
+
+
+@register_extractor(["application/pdf"], [".pdf"])
+def extract_pdf(path: str, progress: Callable[[Dict], None]) -> Iterator[str]:
+    """Yield the text of each page."""
+    return iter_pdf_page_texts(path, progress)
+
+
+@register_extractor(["text/plain", "text/markdown", "text/x-markdown"], [".txt", ".md", ".mdx", ".markdown"])
+def extract_text(path: str, progress: Callable[[Dict], None]) -> Iterator[str]:
+    """Yield blocks of the text, cut at whitespace."""
+    return _iter_text_blocks(_read_text(path, progress))
+
+
+@register_extractor(["text/csv"], [".csv"])
+def extract_csv(path: str, progress: Callable[[Dict], None]) -> Iterator[str]:
+    """Yield batches of rows, read one row at a time."""
+    with open(path, encoding="utf-8-sig", errors="replace", newline="") as file:
+        yield from _iter_row_segments(csv.reader(file), progress)
+
+
+@register_extractor(
+    ["application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"], [".xlsx", ".xlsm"]
+)
+def extract_xlsx(path: str, progress: Callable[[Dict], None]) -> Iterator[str]:
+    """Yield batches of rows of every sheet, streamed from the workbook."""
+    # Read-only workbooks parse rows lazily instead of loading every sheet
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        count = 0
+        for sheet in workbook.worksheets:
+            count = yield from _iter_row_segments(
+                sheet.iter_rows(values_only=True), progress, sheet.title, count
+            )
+    finally:
+        workbook.close()
+
+
+_WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+@register_extractor(
+    ["application/vnd.openxmlformats-officedocument.wordprocessingml.document"], [".docx"]
+)
+def extract_docx(path: str, progress: Callable[[Dict], None]) -> Iterator[str]:
+    """Yield the text of each paragraph, parsed incrementally from the document XML."""
+    count = 0
+    with zipfile.ZipFile(path) as archive, archive.open("word/document.xml") as document:
+        for _, element in ElementTree.iterparse(document, events=("end",)):
+            if element.tag != f"{_WORD_NAMESPACE}p":
+                continue
+            parts = []
+            for node in element.iter():
+                if node.tag == f"{_WORD_NAMESPACE}t" and node.text:
+                    parts.append(node.text)
+                elif node.tag == f"{_WORD_NAMESPACE}tab":
+                    parts.append("\t")
+                elif node.tag in (f"{_WORD_NAMESPACE}br", f"{_WORD_NAMESPACE}cr"):
+                    parts.append("\n")
+            # Parsed paragraphs are dropped, so memory stays flat
+            element.clear()
+            text = "".join(parts)
+            if text.strip():
+                count += 1
+                yield text
+                if count % 100 == 0:
+                    progress({"paragraphs_extracted": count})
+    progress({"paragraphs_extracted": count})
+
+
+class _HTMLTextParser(HTMLParser):
+    """Collects the visible text of an HTML document as it is fed."""
+
+    # Tags whose content is not text
+    SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg"}
+    # Tags that separate words, e.g. "<td>a</td><td>b</td>"
+    BLOCK_TAGS = {
+        "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "figcaption",
+        "figure", "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main",
+        "nav", "ol", "p", "pre", "section", "table", "td", "th", "title", "tr", "ul",
+    }
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.pieces: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self.pieces.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in self.BLOCK_TAGS:
+            self.pieces.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.pieces.append(data)
+
+    def drain(self) -> str:
+        text = "".join(self.pieces)
+        self.pieces = []
+        return text
+
+
+@register_extractor(["text/html", "application/xhtml+xml"], [".html", ".htm", ".xhtml"])
+def extract_html(path: str, progress: Callable[[Dict], None]) -> Iterator[str]:
+    """Yield the visible text, parsed block by block without building a tree."""
+    parser = _HTMLTextParser()
+
+    def texts() -> Iterator[str]:
+        for block in _read_text(path, progress):
+            parser.feed(block)
+            yield parser.drain()
+        parser.close()
+        yield parser.drain()
+
+    return _iter_text_blocks(texts())
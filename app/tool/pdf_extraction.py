@@ -0,0 +1,216 @@
+"""
+PDF text extraction.
+
+PyPDF2's extract_text is pure Python and CPU-bound, so extracting a large
+document on the ingestion thread keeps one core busy while the others idle.
+Documents of PDF_EXTRACTION_MIN_PAGES pages or more are instead split into
+page ranges that a shared pool of processes extracts in parallel; the texts
+are yielded back in page order.
+"""
+import multiprocessing
+import os
+import signal
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from PyPDF2 import PdfReader
+
+from app.core.config import settings
+
+
+class PageTimeout(Exception):
+    """Extracting a page took longer than the per-page timeout."""
+
+
+# Reader of the document a pool process is working on, kept across page ranges
+_open_document: Optional[Tuple[Tuple, BinaryIO, PdfReader]] = None
+
+
+def _raise_page_timeout(_signum, _frame) -> None:
+    raise PageTimeout()
+
+
+def _init_extraction_process() -> None:
+    signal.signal(signal.SIGALRM, _raise_page_timeout)
+    # Ctrl-C is handled by the parent, which lets running jobs finish
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _extract_page_range(path: str, start: int, end: int, page_timeout: float) -> Tuple[List[str], List[int]]:
+    """Extract pages [start, end) of a PDF in a pool process."""
+    global _open_document
+    stat = os.stat(path)
+    # Temporary file names can be reused, so the file's identity includes its inode
+    identity = (path, stat.st_ino, stat.st_mtime_ns)
+    if _open_document is None or _open_document[0] != identity:
+        if _open_document is not None:
+            _open_document[1].close()
+        file = open(path, "rb")
+        _open_document = (identity, file, PdfReader(file))
+    reader = _open_document[2]
+
+    texts: List[str] = []
+    timed_out: List[int] = []
+    for index in range(start, end):
+        try:
+            signal.setitimer(signal.ITIMER_REAL, page_timeout)
+            try:
+                text = reader.pages[index].extract_text() or ""
+            finally:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        except PageTimeout:
+            text = ""
+            timed_out.append(index)
+        texts.append(text)
+    return texts, timed_out
+
+
+def default_extraction_processes() -> int:
+    """Return the pool size of a worker: the CPU cores divided among the host's worker processes."""
+    return max(1, (os.cpu_count() or 1) // max(1, settings.WORKER_PROCESSES))
+
+
+class PdfExtractionPool:
+    """
+    Process pool extracting PDF page ranges, shared by all ingestion jobs of a process.
+
+    Processes are started on first use and kept for later documents. A page
+    whose extraction exceeds page_timeout contributes no text instead of
+    stalling the job. With processes 0, the pool size is
+    default_extraction_processes(), so the pools of all workers of a host
+    together use one process per CPU core.
+    """
+
+    def __init__(
+        self,
+        processes: int = settings.PDF_EXTRACTION_PROCESSES,
+        pages_per_task: int = settings.PDF_EXTRACTION_PAGES_PER_TASK,
+        page_timeout: float = settings.PDF_EXTRACTION_PAGE_TIMEOUT,
+    ):
+        self._processes = processes
+        self.pages_per_task = max(1, pages_per_task)
+        self.page_timeout = page_timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def processes(self) -> int:
+        # Resolved on use, so a worker started with --processes divides the cores by its own count
+        return self._processes or default_extraction_processes()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    # Forking a process that runs threads is unsafe
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_extraction_process,
+                )
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_page_texts(self, path: str, page_count: int) -> Iterator[Tuple[str, bool]]:
+        """
+        Extract the pages of a PDF in parallel, in page order.
+
+        At most two page ranges per process are in flight, so the texts held in
+        memory stay bounded however long the document is.
+
+        Args:
+            path: Path of the PDF file
+            page_count: Number of pages in the document
+
+        Yields:
+            Tuple of (page text, whether the page timed out)
+
+        Raises:
+            BrokenProcessPool: If a pool process died; the pool is replaced for later documents
+        """
+        executor = self._get_executor()
+        futures: Deque = deque()
+        next_start = 0
+
+        def submit_next() -> None:
+            nonlocal next_start
+            end = min(next_start + self.pages_per_task, page_count)
+            future = executor.submit(_extract_page_range, path, next_start, end, self.page_timeout)
+            futures.append((next_start, future))
+            next_start = end
+
+        try:
+            while next_start < page_count and len(futures) < 2 * self.processes:
+                submit_next()
+            while futures:
+                start, future = futures.popleft()
+                texts, timed_out = future.result()
+                if next_start < page_count:
+                    submit_next()
+                for index, text in enumerate(texts, start):
+                    yield text, index in timed_out
+        except BrokenProcessPool:
+            self._discard_executor(executor)
+            raise
+        finally:
+            for _, future in futures:
+                future.cancel()
+
+    def shutdown(self) -> None:
+        """Stop the pool processes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+pdf_extraction_pool = PdfExtractionPool()
+
+
+def get_pdf_extraction_pool() -> PdfExtractionPool:
+    """Return the shared PDF extraction pool."""
+    return pdf_extraction_pool
+
+
+def iter_pdf_page_texts(path: str, progress: Optional[Callable[[Dict], None]] = None) -> Iterator[str]:
+    """
+    Extract the text of a PDF one page at a time.
+
+    Documents of PDF_EXTRACTION_MIN_PAGES pages or more are extracted by the
+    shared process pool, unless it has a single process (PDF_EXTRACTION_PROCESSES
+    is 1, or the host has no more CPU cores than worker processes).
+
+    Args:
+        path: Path of the PDF file; pages are read from it on demand
+        progress: Optional callback receiving the page count and pages extracted
+
+    Yields:
+        The text of each page, in order
+    """
+    with open(path, "rb") as file:
+        reader = PdfReader(file)
+        page_count = len(reader.pages)
+        if progress is not None:
+            progress({"pages": page_count, "pages_extracted": 0})
+
+        pool = get_pdf_extraction_pool()
+        if pool.processes > 1 and page_count >= settings.PDF_EXTRACTION_MIN_PAGES:
+            pages = pool.iter_page_texts(path, page_count)
+        else:
+            pages = ((page.extract_text() or "", False) for page in reader.pages)
+
+        timed_out = 0
+        for index, (text, page_timed_out) in enumerate(pages):
+            if page_timed_out:
+                timed_out += 1
+                print(f"Extracting page {index + 1} of {path} timed out, skipping it")
+            yield text
+            if progress is not None:
+                progress({"pages_extracted": index + 1, "pages_timed_out": timed_out})
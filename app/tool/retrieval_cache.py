@@ -0,0 +1,247 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.data_versions import DataVersions, get_data_versions
+from app.tool.embedding_cache import normalize_text
+
+# (collection name, tenant id or None for collections without multi-tenancy)
+Scope = Tuple[str, Optional[str]]
+# (whitespace-normalized query, top_k, score_threshold, response variant)
+QueryKey = Tuple[str, int, float, Hashable]
+
+
+class RetrievalCache:
+    """
+    Per-tenant cache of retrieval results.
+
+    Results are keyed by tenant, normalized query, ``top_k``,
+    ``score_threshold`` and the response variant (e.g. the returned
+    properties). In semantic mode a miss on the exact key can still be
+    served by a cached query of the same tenant and retrieval settings whose
+    embedding is within ``semantic_threshold`` cosine similarity.
+
+    Every tenant has a version counter that ingestion and deletion bump. The
+    counters are shared by all processes (see ``DataVersions``), so a write
+    made by a worker process invalidates the API processes' entries too. A
+    tenant's entries are only served while its version is the one they were
+    computed against, and results computed against an older version are not
+    stored, so a retrieval racing with an ingestion cannot cache stale results.
+    Entries also expire after ``ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        ttl: float = settings.RETRIEVAL_CACHE_TTL,
+        max_entries_per_tenant: int = settings.RETRIEVAL_CACHE_MAX_ENTRIES_PER_TENANT,
+        max_tenants: int = settings.RETRIEVAL_CACHE_MAX_TENANTS,
+        semantic: bool = settings.RETRIEVAL_CACHE_SEMANTIC_ENABLED,
+        semantic_threshold: float = settings.RETRIEVAL_CACHE_SEMANTIC_THRESHOLD,
+        versions: DataVersions = None,
+    ):
+        self.ttl = ttl
+        self.max_entries_per_tenant = max_entries_per_tenant
+        self.max_tenants = max_tenants
+        self.semantic = semantic
+        self.semantic_threshold = semantic_threshold
+        self.versions = versions or get_data_versions()
+        # scope -> (version, query key -> (expires, unit query embedding or None, results))
+        self._scopes: OrderedDict[Scope, Tuple[int, OrderedDict[QueryKey, tuple]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.stale_stores = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(
+        query: str, top_k: int, score_threshold: float, variant: Hashable = None
+    ) -> QueryKey:
+        # Whitespace only: case can change a query's meaning (e.g. "US" vs "us")
+        return (normalize_text(query), int(top_k), float(score_threshold), variant)
+
+    def version(self, collection_name: str, tenant_id: Optional[str] = None) -> int:
+        """Current version of a tenant; pass it back to ``store``."""
+        return self.versions.get(collection_name, tenant_id)
+
+    async def bump(self, collection_name: str, tenant_id: Optional[str] = None) -> None:
+        """Invalidate a tenant's cached results, in every process, after its data changed."""
+        await asyncio.to_thread(self.versions.bump, collection_name, tenant_id)
+        with self._lock:
+            self._scopes.pop((collection_name, tenant_id), None)
+            self.invalidations += 1
+
+    def _entries(self, scope: Scope, version: int) -> Optional["OrderedDict[QueryKey, tuple]"]:
+        """Entries of a tenant if they were cached at version; older ones are dropped. Needs _lock."""
+        cached = self._scopes.get(scope)
+        if cached is None or cached[0] > version:
+            return None
+        if cached[0] < version:
+            # The tenant was written to, possibly by another process
+            del self._scopes[scope]
+            self.invalidations += 1
+            return None
+        return cached[1]
+
+    def get(
+        self,
+        collection_name: str,
+        tenant_id: Optional[str],
+        key: QueryKey,
+        version: Optional[int] = None,
+    ) -> Optional[List[Dict]]:
+        """Look up the exact query, at the tenant's current version unless one is given."""
+        scope = (collection_name, tenant_id)
+        if version is None:
+            version = self.version(collection_name, tenant_id)
+        with self._lock:
+            entries = self._entries(scope, version)
+            entry = entries.get(key) if entries is not None else None
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del entries[key]
+                if not self.semantic:
+                    self.misses += 1
+                return None
+            entries.move_to_end(key)
+            self._scopes.move_to_end(scope)
+            self.exact_hits += 1
+            return entry[2]
+
+    def get_similar(
+        self,
+        collection_name: str,
+        tenant_id: Optional[str],
+        key: QueryKey,
+        embedding,
+        version: Optional[int] = None,
+    ) -> Optional[List[Dict]]:
+        """Look up a cached query with the same settings and a near-identical embedding."""
+        if not self.semantic:
+            return None
+        scope = (collection_name, tenant_id)
+        if version is None:
+            version = self.version(collection_name, tenant_id)
+        now = time.monotonic()
+        query = self._unit(embedding)
+        with self._lock:
+            entries = self._entries(scope, version)
+            candidates = [
+                (cached_key, entry)
+                for cached_key, entry in (entries or {}).items()
+                if cached_key[1:] == key[1:] and entry[0] >= now and entry[1] is not None
+            ]
+            if query is not None and candidates:
+                similarities = np.stack([entry[1] for _, entry in candidates]) @ query
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.semantic_threshold:
+                    cached_key, entry = candidates[best]
+                    entries.move_to_end(cached_key)
+                    self._scopes.move_to_end(scope)
+                    self.semantic_hits += 1
+                    return entry[2]
+            self.misses += 1
+            return None
+
+    def store(
+        self,
+        collection_name: str,
+        tenant_id: Optional[str],
+        key: QueryKey,
+        results: List[Dict],
+        version: int,
+        embedding=None,
+    ) -> None:
+        """Cache results computed against ``version`` of the tenant's data."""
+        scope = (collection_name, tenant_id)
+        unit = self._unit(embedding) if self.semantic else None
+        current = self.version(collection_name, tenant_id)
+        with self._lock:
+            if current != version:
+                self.stale_stores += 1
+                return
+            entries = self._entries(scope, version)
+            if entries is None:
+                entries = OrderedDict()
+                self._scopes[scope] = (version, entries)
+                while len(self._scopes) > self.max_tenants:
+                    self._scopes.popitem(last=False)
+            entries[key] = (time.monotonic() + self.ttl, unit, results)
+            entries.move_to_end(key)
+            self._scopes.move_to_end(scope)
+            while len(entries) > self.max_entries_per_tenant:
+                entries.popitem(last=False)
+
+    async def retrieve(
+        self,
+        collection_name: str,
+        tenant_id: Optional[str],
+        query: str,
+        key: QueryKey,
+        embed: Callable[[str], Awaitable[Any]],
+        search: Callable[[Any], Awaitable[List[Dict]]],
+    ) -> List[Dict]:
+        """
+        Serve a retrieval from the cache, or run it and cache its results.
+
+        Args:
+            collection_name: Collection searched
+            tenant_id: Tenant searched, None for collections without multi-tenancy
+            query: The search query
+            key: Cache key of the query, from ``make_key``
+            embed: Coroutine function embedding the query
+            search: Coroutine function running the search for a query embedding
+
+        Returns:
+            The retrieval results
+        """
+        if not settings.RETRIEVAL_CACHE_ENABLED:
+            return await search(await embed(query))
+        version = self.version(collection_name, tenant_id)
+        results = self.get(collection_name, tenant_id, key, version)
+        if results is not None:
+            return results
+        embedding = await embed(query)
+        results = self.get_similar(collection_name, tenant_id, key, embedding, version)
+        if results is not None:
+            return results
+        results = await search(embedding)
+        self.store(collection_name, tenant_id, key, results, version, embedding)
+        return results
+
+    @staticmethod
+    def _unit(embedding) -> Optional[np.ndarray]:
+        if embedding is None:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else None
+
+    def stats(self) -> dict:
+        """Return cache occupancy and hit/miss counters."""
+        with self._lock:
+            lookups = self.exact_hits + self.semantic_hits + self.misses
+            return {
+                "tenants": len(self._scopes),
+                "entries": sum(len(entries) for _, entries in self._scopes.values()),
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.exact_hits + self.semantic_hits) / lookups, 3) if lookups else None,
+                "stale_stores": self.stale_stores,
+                "invalidations": self.invalidations,
+            }
+
+
+retrieval_cache = RetrievalCache()
+
+
+def get_retrieval_cache() -> RetrievalCache:
+    """Return the retrieval cache instance."""
+    return retrieval_cache
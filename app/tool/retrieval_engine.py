@@ -0,0 +1,292 @@
+import asyncio
+import heapq
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.embedding_dimensions import check_embedding_dimensions
+from app.core.tenant_registry import get_tenant_registry
+from app.core.tenant_tiering import get_tenant_tiering_manager
+from app.core.vector_store import StoredObject, get_vector_store
+from app.core.weaviate_client import WeaviateClientManager, get_weaviate_manager
+from app.tool.ai_tool import AITool, get_ai_tool
+from app.tool.retrieval_cache import RetrievalCache, get_retrieval_cache
+from app.tool.single_flight import SingleFlight, get_retrieval_single_flight
+from app.tool.tenant_replica import HotTenantReplicas, get_tenant_replicas
+
+# Properties the retrieval endpoints respond with
+DEFAULT_RETURN_PROPERTIES = ("content", "source")
+
+
+class RetrievalEngine:
+    """
+    Embeds a query and runs a thresholded near_vector search against a collection.
+
+    ``score_threshold`` is pushed down to the vector store as a distance
+    cutoff (score = 1 - cosine distance), so below-threshold objects are never
+    sent back. Only the requested properties are fetched and vectors are left out
+    unless asked for. Identical concurrent requests share one computation and
+    results go through the per-tenant retrieval cache. With
+    TENANT_REPLICA_ENABLED, cache misses on hot tenants are answered from
+    in-process replicas by exact search.
+    """
+
+    def __init__(
+        self,
+        ai_tool: AITool = None,
+        cache: RetrievalCache = None,
+        single_flight: SingleFlight = None,
+        replicas: HotTenantReplicas = None,
+    ):
+        self.ai_tool = ai_tool or get_ai_tool()
+        self.cache = cache or get_retrieval_cache()
+        self.single_flight = single_flight or get_retrieval_single_flight()
+        self.replicas = replicas or get_tenant_replicas()
+
+    async def retrieve(
+        self,
+        collection_name: str,
+        query: str,
+        top_k: int = 10,
+        score_threshold: float = 0.4,
+        tenant_id: Optional[str] = None,
+        return_properties: Sequence[str] = DEFAULT_RETURN_PROPERTIES,
+        include_vector: bool = False,
+        weaviate_manager: WeaviateClientManager = None,
+        embedding=None,
+    ) -> List[Dict]:
+        """
+        Retrieve the objects most similar to a query.
+
+        Args:
+            collection_name: Collection to search
+            query: The search query
+            top_k: Maximum number of results
+            score_threshold: Minimum similarity score (1 - distance)
+            tenant_id: Tenant to search in multi-tenant collections
+            return_properties: Object properties to fetch
+            include_vector: Whether to return each object's vector
+            weaviate_manager: Optional Weaviate client manager
+            embedding: Precomputed query embedding, skips embedding the query
+
+        Returns:
+            Results with "content", "title" and "metadata" ({"score"}), plus
+            "properties" with any other requested property and "vector" when requested
+        """
+        if weaviate_manager is None:
+            weaviate_manager = get_weaviate_manager()
+        return_properties = tuple(return_properties)
+        key = RetrievalCache.make_key(
+            query, top_k, score_threshold, (return_properties, include_vector)
+        )
+
+        async def embed(text: str):
+            if embedding is not None:
+                return embedding
+            return await self.ai_tool.get_embeddings(text)
+
+        async def search(embedding) -> List[Dict]:
+            check_embedding_dimensions(embedding, collection_name)
+            vector_store = get_vector_store(weaviate_manager)
+
+            async def near_vector(properties: Sequence[str] = return_properties) -> List[StoredObject]:
+                async def run() -> List[StoredObject]:
+                    return await vector_store.search(
+                        collection_name,
+                        embedding,
+                        limit=top_k,
+                        tenant_id=tenant_id,
+                        max_distance=round(1 - score_threshold, 6),
+                        return_properties=properties,
+                        include_vector=include_vector,
+                    )
+
+                tiering = get_tenant_tiering_manager()
+                if tenant_id is not None and collection_name == tiering.registry.collection_name:
+                    return await tiering.run_active(tenant_id, run, weaviate_manager)
+                return await run()
+
+            if (
+                settings.TENANT_REPLICA_ENABLED
+                and tenant_id is not None
+                and return_properties == DEFAULT_RETURN_PROPERTIES
+                and not include_vector
+            ):
+                async def verify() -> List[str]:
+                    return [obj.uuid for obj in await near_vector(())]
+
+                results = await self.replicas.search(
+                    collection_name, tenant_id, embedding, top_k, score_threshold, weaviate_manager, verify
+                )
+                if results is not None:
+                    return results
+
+            return [self._to_result(obj, include_vector) for obj in await near_vector()]
+
+        async def compute() -> List[Dict]:
+            tiering = get_tenant_tiering_manager()
+            if tenant_id is not None and collection_name == tiering.registry.collection_name:
+                # Records the access and reactivates the tenant if it was tiered down
+                if not await tiering.ensure_active(tenant_id, weaviate_manager):
+                    return []
+            return await self.cache.retrieve(
+                collection_name, tenant_id, query, key, embed, search
+            )
+
+        return await self.single_flight.do((collection_name, tenant_id, *key), compute)
+
+    async def retrieve_batch(
+        self,
+        collection_name: str,
+        requests: List[Dict],
+        weaviate_manager: WeaviateClientManager = None,
+    ) -> List[Dict]:
+        """
+        Run many retrievals with one embedding request and a bounded search fan-out.
+
+        All distinct queries are embedded together, then the searches run
+        concurrently, at most RETRIEVAL_BATCH_CONCURRENCY at a time. A failing
+        query does not fail the others.
+
+        Args:
+            collection_name: Collection to search
+            requests: Dicts with "query", "top_k", "score_threshold" and "tenant_id"
+            weaviate_manager: Optional Weaviate client manager
+
+        Returns:
+            One {"results": [...]} per request, in request order, with an
+            "error" message instead of results for failed queries
+        """
+        queries = list(dict.fromkeys(request["query"] for request in requests))
+        try:
+            embeddings = dict(zip(queries, await self.ai_tool.get_embeddings_batch(queries), strict=True))
+        except Exception as e:
+            return [{"results": [], "error": str(e)} for _ in requests]
+
+        semaphore = asyncio.Semaphore(settings.RETRIEVAL_BATCH_CONCURRENCY)
+
+        async def run(request: Dict) -> Dict:
+            async with semaphore:
+                try:
+                    results = await self.retrieve(
+                        collection_name,
+                        request["query"],
+                        top_k=request["top_k"],
+                        score_threshold=request["score_threshold"],
+                        tenant_id=request.get("tenant_id"),
+                        weaviate_manager=weaviate_manager,
+                        embedding=embeddings[request["query"]],
+                    )
+                except Exception as e:
+                    return {"results": [], "error": str(e)}
+            return {"results": results}
+
+        return list(await asyncio.gather(*[run(request) for request in requests]))
+
+    async def retrieve_federated(
+        self,
+        query: str,
+        targets: List[Tuple[str, Optional[str], float]],
+        top_k: int = 10,
+        score_threshold: float = 0.4,
+        weaviate_manager: WeaviateClientManager = None,
+    ) -> Dict:
+        """
+        Retrieve a global top-k across several collections and tenants.
+
+        The query is embedded once and every target is searched in parallel.
+        Scores are comparable across targets (1 - cosine distance of the same
+        embedding), so hits are merged with a heap on score x target weight.
+        Tenants are resolved with one bulk lookup first. A failing target is
+        reported in "errors" without failing the others.
+
+        Args:
+            query: The search query
+            targets: (collection name, tenant id or None, weight) per target
+            top_k: Maximum number of merged results
+            score_threshold: Minimum unweighted similarity score
+            weaviate_manager: Optional Weaviate client manager
+
+        Returns:
+            {"results": [...], "errors": [...]}; each result's metadata carries
+            its "score", "weighted_score", "collection" and "knowledge_id"
+        """
+        if weaviate_manager is None:
+            weaviate_manager = get_weaviate_manager()
+        registry = get_tenant_registry()
+        tenant_ids = [
+            tenant_id
+            for collection_name, tenant_id, _ in targets
+            if tenant_id is not None and collection_name == registry.collection_name
+        ]
+        if tenant_ids:
+            await registry.warm(list(dict.fromkeys(tenant_ids)), weaviate_manager)
+        embedding = await self.ai_tool.get_embeddings(query)
+
+        async def search(target: Tuple[str, Optional[str], float]) -> List[Dict]:
+            collection_name, tenant_id, _ = target
+            return await self.retrieve(
+                collection_name,
+                query,
+                top_k=top_k,
+                score_threshold=score_threshold,
+                tenant_id=tenant_id,
+                weaviate_manager=weaviate_manager,
+                embedding=embedding,
+            )
+
+        outcomes = await asyncio.gather(*[search(target) for target in targets], return_exceptions=True)
+        candidates = []
+        errors = []
+        for (collection_name, tenant_id, weight), outcome in zip(targets, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                errors.append(
+                    {"collection": collection_name, "knowledge_id": tenant_id, "error": str(outcome)}
+                )
+                continue
+            for result in outcome:
+                candidates.append(
+                    (result["metadata"]["score"] * weight, collection_name, tenant_id, result)
+                )
+
+        merged = []
+        for weighted_score, collection_name, tenant_id, result in heapq.nlargest(
+            top_k, candidates, key=lambda candidate: candidate[0]
+        ):
+            # Cached results are shared, so annotate a copy
+            merged.append({
+                **result,
+                "metadata": {
+                    **result["metadata"],
+                    "weighted_score": weighted_score,
+                    "collection": collection_name,
+                    "knowledge_id": tenant_id,
+                },
+            })
+        return {"results": merged, "errors": errors}
+
+    @staticmethod
+    def _to_result(obj: StoredObject, include_vector: bool) -> Dict:
+        properties = obj.properties
+        result = {
+            "content": properties.get("content", ""),
+            "title": properties.get("source", ""),
+            "metadata": {"score": 1 - obj.distance},
+        }
+        extra = {name: value for name, value in properties.items() if name not in DEFAULT_RETURN_PROPERTIES}
+        if extra:
+            result["properties"] = extra
+        if include_vector:
+            vector = obj.vector
+            result["vector"] = vector.tolist() if hasattr(vector, "tolist") else vector
+        return result
+
+
+retrieval_engine: Optional[RetrievalEngine] = None
+
+
+def get_retrieval_engine() -> RetrievalEngine:
+    """Return the retrieval engine, creating it on first use."""
+    global retrieval_engine
+    if retrieval_engine is None:
+        retrieval_engine = RetrievalEngine()
+    return retrieval_engine
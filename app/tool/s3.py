@@ -1,10 +1,12 @@
 import boto3
 from app.core.config import settings
-from io import BytesIO
-from PyPDF2 import PdfReader
 import asyncio
-from app.utils.helpers import split_content_into_chunks
-from app.tool.vectorDB_tool import store_vector_record_with_tenant_id
+import os
+import tempfile
+from typing import BinaryIO, Callable, Dict, Optional
+from app.utils.helpers import iter_content_chunks, iterate_in_thread
+from app.tool.extractors import get_extractor
+from app.tool.vectorDB_tool import sync_source_records_with_tenant_id
 from app.tool.tenant import update_document_status
 
 def get_s3_client():
@@ -23,26 +25,100 @@ def get_s3_bucket():
     bucket = s3_client.Bucket(settings.AWS_S3_BUCKET)
     return bucket
 
-async def process_s3_object(tenant_id: str, key: str):
-    """Return the S3 object instance."""
+def download_s3_object(
+    s3_client, key: str, fileobj: BinaryIO, size: int, part_size: int = settings.S3_DOWNLOAD_PART_SIZE
+) -> None:
+    """
+    Download an S3 object into a file with ranged GETs.
+
+    Parts are streamed to the file as they arrive, so memory use is bounded by
+    the read size rather than the object size. A part whose transfer breaks off
+    is requested again, up to S3_DOWNLOAD_PART_RETRIES times.
+
+    Args:
+        s3_client: boto3 S3 client
+        key: S3 object key
+        fileobj: Writable, seekable binary file
+        size: Size of the object in bytes
+        part_size: Bytes requested per ranged GET
+    """
+    for start in range(0, size, part_size):
+        end = min(start + part_size, size) - 1
+        for attempt in range(settings.S3_DOWNLOAD_PART_RETRIES + 1):
+            fileobj.seek(start)
+            fileobj.truncate()
+            try:
+                response = s3_client.get_object(
+                    Bucket=settings.AWS_S3_BUCKET, Key=key, Range=f"bytes={start}-{end}"
+                )
+                for piece in response["Body"].iter_chunks(chunk_size=1024 * 1024):
+                    fileobj.write(piece)
+                break
+            except Exception as e:
+                if attempt == settings.S3_DOWNLOAD_PART_RETRIES:
+                    raise
+                print(f"Retrying bytes {start}-{end} of S3 object {key}: {str(e)}")
+    fileobj.flush()
+    fileobj.seek(0)
+
+async def process_s3_object(
+    tenant_id: str, key: str, progress: Optional[Callable[[Dict], None]] = None
+) -> Dict:
+    """
+    Download a document from S3, then chunk, embed and store it in a tenant's knowledge base.
+
+    The extractor is chosen by the object's content type or the key's extension.
+    The object is spooled to a temporary file and its text extracted segment by
+    segment (PDF pages, spreadsheet rows, paragraphs). Chunks are embedded and
+    stored while later segments are still being extracted, and neither the file
+    nor its full text is held in memory. Re-uploading a document only embeds its
+    new or changed chunks and deletes the chunks it no longer contains.
+
+    Args:
+        tenant_id: Tenant to store the document under
+        key: S3 object key of the document
+        progress: Optional callback receiving progress updates
+
+    Returns:
+        The storage result: status, inserted, unchanged and deleted counts, failed items and batch stats
+
+    Raises:
+        UnsupportedDocumentType: If no extractor handles the document
+        Exception: If the document could not be processed, so the job can be retried
+    """
+    report = progress or (lambda update: None)
     s3_client = get_s3_client()
     try:
-        # Get the PDF object from S3
-        response = s3_client.get_object(Bucket=settings.AWS_S3_BUCKET, Key=key)
-
-        # Read the PDF content into memory
-        pdf_data = response['Body'].read()
-        
-        # Create BytesIO object from PDF data
-        pdf_file = BytesIO(pdf_data)
-        reader = PdfReader(pdf_file)
-        content = " ".join([page.extract_text() for page in reader.pages])
-        chunks = split_content_into_chunks(content,key);
-        await store_vector_record_with_tenant_id(chunks, tenant_id);
+        head = await asyncio.to_thread(s3_client.head_object, Bucket=settings.AWS_S3_BUCKET, Key=key)
+        extract = get_extractor(key, head.get("ContentType"))
+        suffix = os.path.splitext(key)[1]
+        with tempfile.NamedTemporaryFile(prefix="s3-object-", suffix=suffix) as document_file:
+            report({"stage": "downloading", "bytes": head["ContentLength"]})
+            await asyncio.to_thread(
+                download_s3_object, s3_client, key, document_file, head["ContentLength"]
+            )
+
+            report({"stage": "ingesting"})
+            chunks = iterate_in_thread(
+                iter_content_chunks(
+                    extract(document_file.name, report),
+                    key,
+                    content_defined=settings.CONTENT_DEFINED_CHUNKING,
+                ),
+                buffer_size=2 * settings.WEAVIATE_BATCH_SIZE,
+            )
+            try:
+                result = await sync_source_records_with_tenant_id(chunks, tenant_id, key, progress=report)
+            finally:
+                # Stop extraction before the file is closed
+                await chunks.aclose()
+        if result["status"] == "error":
+            raise RuntimeError(f"No chunk of {key} could be stored: {result['failed'][:3]}")
         await update_document_status(key, 'done');
+        report({"stage": "done"})
         print(f'\033[43m\033[30mSuccessfully processed S3 object {key} of tenant {tenant_id}\033[0m')
+        return result
 
     except Exception as e:
-        print(f"Error: {str(e)}")
-
-
+        print(f"Error processing S3 object {key} of tenant {tenant_id}: {str(e)}")
+        raise
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import weakref
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical calls into one shared computation.
+
+    The first caller for a key starts the computation as a task; callers that
+    arrive with the same key while it runs await that task instead of starting
+    their own. Every caller receives the same result or the same exception.
+    A cancelled caller stops waiting without affecting the others, and the
+    computation itself is cancelled only once every caller waiting on it has
+    gone. Calls are shared within an event loop.
+    """
+
+    def __init__(self):
+        self._calls: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, list]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.collapsed = 0
+        self.cancelled = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``fn`` for ``key``, or join the run already in flight for it.
+
+        Args:
+            key: Identity of the call
+            fn: Coroutine function computing the result
+
+        Returns:
+            The result of the shared computation
+        """
+        if not settings.RETRIEVAL_SINGLE_FLIGHT_ENABLED:
+            return await fn()
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+        call = calls.get(key)
+        with self._lock:
+            if call is None:
+                self.leaders += 1
+            else:
+                self.collapsed += 1
+        if call is None:
+            # [task, number of callers waiting on it]
+            call = [loop.create_task(fn()), 0]
+            calls[key] = call
+            call[0].add_done_callback(lambda task: self._finish(calls, key, call))
+        task = call[0]
+        call[1] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and call[1] == 1:
+                # The last caller left; nobody needs the result any more. The task
+                # only finishes later, so new callers must not join it meanwhile
+                if calls.get(key) is call:
+                    del calls[key]
+                task.cancel()
+                with self._lock:
+                    self.cancelled += 1
+            raise
+        finally:
+            call[1] -= 1
+
+    @staticmethod
+    def _finish(calls: Dict[Hashable, list], key: Hashable, call: list) -> None:
+        if calls.get(key) is call:
+            del calls[key]
+        task = call[0]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every caller has gone
+            task.exception()
+
+    def stats(self) -> dict:
+        """Return how many calls ran and how many were collapsed into them."""
+        with self._lock:
+            return {
+                "in_flight": sum(len(calls) for calls in list(self._calls.values())),
+                "leaders": self.leaders,
+                "collapsed": self.collapsed,
+                "cancelled": self.cancelled,
+            }
+
+
+retrieval_single_flight = SingleFlight()
+
+
+def get_retrieval_single_flight() -> SingleFlight:
+    """Return the single-flight group shared by retrieval requests."""
+    return retrieval_single_flight
@@ -0,0 +1,285 @@
+import asyncio
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.vector_store import get_vector_store
+from app.core.weaviate_client import WeaviateClientManager
+from app.tool.retrieval_cache import get_retrieval_cache
+
+# Pages fetched while loading a replica
+_LOAD_PAGE_SIZE = 1000
+# Upper bound on tenants tracked for hotness or size before the tracking is reset
+_MAX_TRACKED_TENANTS = 10000
+
+
+class TenantReplica:
+    """Vectors and lightweight properties of one tenant, held as a contiguous float32 matrix."""
+
+    def __init__(self, ids: List[str], matrix: np.ndarray, contents: List[str], sources: List[str], version: int):
+        self.ids = ids
+        self.matrix = matrix  # L2-normalized rows
+        self.contents = contents
+        self.sources = sources
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.nbytes = matrix.nbytes + sum(len(text) for text in contents) + sum(len(text) for text in sources)
+
+    def search(self, embedding, top_k: int, score_threshold: float) -> List[Tuple[str, float, int]]:
+        """Exact cosine top-k: (uuid, score, row) sorted by descending score."""
+        if not len(self.ids):
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        if norm == 0:
+            return []
+        scores = self.matrix @ (query / norm)
+        k = min(top_k, len(scores))
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [
+            (self.ids[row], float(scores[row]), int(row))
+            for row in ranked
+            if scores[row] >= score_threshold
+        ]
+
+
+class HotTenantReplicas:
+    """
+    Read-through, in-process replicas of frequently searched small tenants.
+
+    A tenant is loaded in the background once it has been searched
+    ``hot_accesses`` times and holds at most ``max_objects`` objects. Its
+    vectors (normalized) and content/source properties are kept in memory and
+    searches are answered exactly with one matrix-vector product. Replicas are
+    evicted least recently used beyond ``max_bytes``.
+
+    A replica is tied to the tenant's retrieval cache version: ingestion and
+    deletion bump that version, in whichever process they run, which makes the
+    replica stale and drops it on its next use. Like cached results, replicas
+    also expire after ``ttl`` seconds. A fraction ``verify_rate`` of replica
+    answers is re-run against Weaviate in the background and mismatching
+    rankings are counted.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = settings.TENANT_REPLICA_MAX_BYTES,
+        max_objects: int = settings.TENANT_REPLICA_MAX_OBJECTS,
+        hot_accesses: int = settings.TENANT_REPLICA_HOT_ACCESSES,
+        ttl: float = settings.TENANT_REPLICA_TTL,
+        verify_rate: float = settings.TENANT_REPLICA_VERIFY_RATE,
+    ):
+        self.max_bytes = max_bytes
+        self.max_objects = max_objects
+        self.hot_accesses = hot_accesses
+        self.ttl = ttl
+        self.verify_rate = verify_rate
+        self._replicas: OrderedDict[Tuple[str, str], TenantReplica] = OrderedDict()
+        self._bytes = 0
+        self._accesses: Dict[Tuple[str, str], int] = {}
+        self._too_large: Dict[Tuple[str, str], int] = {}
+        self._loading: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._tasks: set = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+        self.verified = 0
+        self.mismatches = 0
+
+    async def search(
+        self,
+        collection_name: str,
+        tenant_id: str,
+        embedding,
+        top_k: int,
+        score_threshold: float,
+        weaviate_manager: WeaviateClientManager,
+        verify: Callable[[], Awaitable[List[str]]] = None,
+    ) -> Optional[List[Dict]]:
+        """
+        Answer a search from the tenant's replica, if it has a current one.
+
+        Records the access and starts loading the replica once the tenant is hot.
+        The matrix-vector product runs in a worker thread (NumPy releases the
+        GIL), so large replicas do not stall the event loop.
+
+        Args:
+            collection_name: Collection searched
+            tenant_id: Tenant searched
+            embedding: Query embedding
+            top_k: Maximum number of results
+            score_threshold: Minimum similarity score
+            weaviate_manager: Weaviate client manager used to load replicas
+            verify: Coroutine function returning the vector store's ranked UUIDs for the same search
+
+        Returns:
+            Results in the retrieval response format, or None when not served
+        """
+        key = (collection_name, tenant_id)
+        version = get_retrieval_cache().version(collection_name, tenant_id)
+        with self._lock:
+            replica = self._replicas.get(key)
+            if replica is not None and (
+                replica.version != version or time.monotonic() - replica.loaded_at > self.ttl
+            ):
+                # The tenant changed since the replica was loaded, or the replica is due a reload
+                self._drop(key)
+                replica = None
+            if replica is not None:
+                self._replicas.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+                self._record_access(key, version, weaviate_manager)
+        if replica is None:
+            return None
+
+        ranked = await asyncio.to_thread(replica.search, embedding, top_k, score_threshold)
+        if verify is not None and self.verify_rate > 0 and random.random() < self.verify_rate:
+            self._spawn(self._verify(key, [uuid for uuid, _, _ in ranked], verify))
+        return [
+            {
+                "content": replica.contents[row],
+                "title": replica.sources[row],
+                "metadata": {"score": score},
+            }
+            for _, score, row in ranked
+        ]
+
+    def _record_access(self, key: Tuple[str, str], version: int, weaviate_manager: WeaviateClientManager) -> None:
+        """Count an access and start a load once the tenant is hot. Needs _lock."""
+        if key in self._loading or self._too_large.get(key) == version:
+            return
+        if len(self._accesses) >= _MAX_TRACKED_TENANTS:
+            self._accesses.clear()
+        self._accesses[key] = self._accesses.get(key, 0) + 1
+        if self._accesses[key] >= self.hot_accesses:
+            del self._accesses[key]
+            task = self._spawn(self._load(key, version, weaviate_manager))
+            self._loading[key] = task
+            task.add_done_callback(lambda _: self._loading.pop(key, None))
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _load(self, key: Tuple[str, str], version: int, weaviate_manager: WeaviateClientManager) -> None:
+        collection_name, tenant_id = key
+        started = time.perf_counter()
+        vector_store = get_vector_store(weaviate_manager)
+        try:
+            total = await vector_store.count(collection_name, tenant_id)
+            if total > self.max_objects:
+                with self._lock:
+                    if len(self._too_large) >= _MAX_TRACKED_TENANTS:
+                        self._too_large.clear()
+                    self._too_large[key] = version
+                return
+
+            ids: List[str] = []
+            contents: List[str] = []
+            sources: List[str] = []
+            matrix: Optional[np.ndarray] = None
+            after = None
+            while True:
+                objects = await vector_store.fetch(
+                    collection_name,
+                    limit=_LOAD_PAGE_SIZE,
+                    tenant_id=tenant_id,
+                    after=after,
+                    return_properties=["content", "source"],
+                    include_vector=True,
+                )
+                for obj in objects:
+                    vector = obj.vector
+                    if vector is None:
+                        continue
+                    if matrix is None:
+                        matrix = np.empty((total, len(vector)), dtype=np.float32)
+                    if len(ids) == len(matrix):
+                        # Objects were added while loading; the version check below discards it
+                        break
+                    matrix[len(ids)] = vector
+                    ids.append(obj.uuid)
+                    contents.append(obj.properties.get("content", ""))
+                    sources.append(obj.properties.get("source", ""))
+                if len(objects) < _LOAD_PAGE_SIZE:
+                    break
+                after = objects[-1].uuid
+
+            matrix = (matrix if matrix is not None else np.empty((0, 0), dtype=np.float32))[: len(ids)]
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix /= np.maximum(norms, 1e-12)
+            replica = TenantReplica(ids, matrix, contents, sources, version)
+        except Exception as e:
+            print(f"Error loading replica of tenant {tenant_id}: {str(e)}")
+            return
+
+        with self._lock:
+            if get_retrieval_cache().version(collection_name, tenant_id) != version:
+                return
+            self._drop(key)
+            self._replicas[key] = replica
+            self._bytes += replica.nbytes
+            self.loads += 1
+            while self._bytes > self.max_bytes and self._replicas:
+                evicted_key = next(iter(self._replicas))
+                self._drop(evicted_key)
+                self.evictions += 1
+        print(
+            f"Loaded replica of tenant {tenant_id}: {len(ids)} objects, "
+            f"{replica.nbytes / 1024 / 1024:.1f} MiB in {time.perf_counter() - started:.2f}s"
+        )
+
+    def _drop(self, key: Tuple[str, str]) -> None:
+        """Remove a replica. Needs _lock."""
+        replica = self._replicas.pop(key, None)
+        if replica is not None:
+            self._bytes -= replica.nbytes
+
+    async def _verify(self, key: Tuple[str, str], ranked: List[str], verify: Callable[[], Awaitable[List[str]]]) -> None:
+        try:
+            expected = await verify()
+        except Exception as e:
+            print(f"Error verifying replica of tenant {key[1]}: {str(e)}")
+            return
+        with self._lock:
+            self.verified += 1
+            if expected != ranked:
+                self.mismatches += 1
+                print(f"Replica ranking of tenant {key[1]} differs from Weaviate: {ranked} != {expected}")
+
+    def stats(self) -> dict:
+        """Return replica occupancy, hit/miss and verification counters."""
+        with self._lock:
+            return {
+                "tenants": len(self._replicas),
+                "objects": sum(len(replica.ids) for replica in self._replicas.values()),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "loads": self.loads,
+                "loading": len(self._loading),
+                "evictions": self.evictions,
+                "verified": self.verified,
+                "mismatches": self.mismatches,
+            }
+
+
+tenant_replicas = HotTenantReplicas()
+
+
+def get_tenant_replicas() -> HotTenantReplicas:
+    """Return the hot-tenant replica tier."""
+    return tenant_replicas
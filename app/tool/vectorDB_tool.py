@@ -1,10 +1,16 @@
-from typing import Dict, List, Optional, Union
+from typing import AsyncIterable, Callable, Dict, List, Optional, Union
 from app.tool.ai_tool import get_ai_tool, AITool
-from app.core.weaviate_client import get_weaviate_client
-import weaviate
-from weaviate.classes.query import Filter
+from app.core.weaviate_client import WeaviateClientManager, get_weaviate_manager
+from app.core.embedding_dimensions import check_embedding_dimensions
+from app.core.tenant_registry import get_tenant_registry
+from app.core.tenant_tiering import get_tenant_tiering_manager, is_tenant_not_active_error
+from app.core.vector_store import FILTER_OPERATORS, PropertyFilter, StoredObject, get_vector_store
+from app.tool.retrieval_cache import get_retrieval_cache
+from app.utils.helpers import content_hash
 import logging
 import asyncio
+import time
+import uuid
 from app.core.config import settings
 
 # Configure global logger
@@ -21,35 +27,27 @@ if not logger.handlers:
 async def store_vector_record(
     items: Union[Dict, List[Dict]],
     ai_tool: AITool = None,
-    weaviate_client: weaviate.Client = None,
+    weaviate_manager: WeaviateClientManager = None,
 ) -> Union[Dict, List[Dict]]:
     """
-    Store vector record in Weaviate with embeddings generated by AI.
+    Store vector record in the vector store with embeddings generated by AI.
 
     Args:
         items: Single dictionary or list of dictionaries containing vector records to store.
                Each item should have: content, source, knowledge_type, and optional metadata
         ai_tool: Optional AITool instance
-        weaviate_client: Optional Weaviate client instance
+        weaviate_manager: Optional Weaviate client manager
 
     Returns:
         Dict or List[Dict] containing the stored vector record information
     """
     if ai_tool is None:
         ai_tool = get_ai_tool()
-    if weaviate_client is None:
-        weaviate_client = get_weaviate_client();
-    
-    weaviate_client.connect();
+    vector_store = get_vector_store(weaviate_manager)
 
     # Convert single item to list for consistent processing
     items_list = [items] if isinstance(items, dict) else items
 
-    # Get the knowledge collection
-    collection = weaviate_client.collections.get(
-        settings.GENERAL_KNOWLEDGE_COLLECTION_NAME
-    )
-
     results = []
     for item in items_list:
         content = item.get("content")
@@ -64,20 +62,25 @@ async def store_vector_record(
 
         # Generate embeddings for the content
         embeddings = await ai_tool.get_embeddings(content)
+        check_embedding_dimensions(embeddings, settings.GENERAL_KNOWLEDGE_COLLECTION_NAME)
 
         try:
-            # Insert the object using data.insert()
-            result = collection.data.insert(
-                properties={
-                    "content": content,
-                    "source": source,
-                    "knowledge_type": knowledge_type,
-                    "metadata": metadata,
-                },
-                vector=embeddings,
+            errors = await vector_store.insert_batch(
+                settings.GENERAL_KNOWLEDGE_COLLECTION_NAME,
+                [{
+                    "uuid": str(uuid.uuid4()),
+                    "properties": {
+                        "content": content,
+                        "source": source,
+                        "knowledge_type": knowledge_type,
+                        "metadata": metadata,
+                    },
+                    "vector": embeddings,
+                }],
             )
+            await get_retrieval_cache().bump(settings.GENERAL_KNOWLEDGE_COLLECTION_NAME)
 
-            if result:
+            if not errors:
                 logger.info(
                     f"Successfully stored vector record - Source: {source}, Type: {knowledge_type}"
                 )
@@ -102,54 +105,41 @@ async def store_vector_record(
 async def retrieve_vector_record(
     query: str,
     limit: int = 5,
-    filters: Optional[List[Filter]] = None,
+    filters: Optional[List[PropertyFilter]] = None,
     ai_tool: AITool = None,
-    weaviate_client: weaviate.Client = None,
+    weaviate_manager: WeaviateClientManager = None,
 ) -> List[Dict]:
     """
-    Retrieve vector records from Weaviate using semantic search.
+    Retrieve vector records from the vector store using semantic search.
 
     Args:
         query: The search query
         limit: Maximum number of results to return
-        filters: Optional list of Weaviate filters
+        filters: Optional list of property filters, all of which must match
         ai_tool: Optional AITool instance
-        weaviate_client: Optional Weaviate client instance
+        weaviate_manager: Optional Weaviate client manager
 
     Returns:
         List of retrieved vector records
     """
     if ai_tool is None:
         ai_tool = get_ai_tool()
-    if weaviate_client is None:
-        weaviate_client = get_weaviate_client();
-    
-    weaviate_client.connect();
 
     # Generate embeddings for the query
     query_embeddings = await ai_tool.get_embeddings(query)
-
-    # Get the knowledge collection
-    collection = weaviate_client.collections.get(
-        settings.GENERAL_KNOWLEDGE_COLLECTION_NAME
-    )
-
-    # Prepare the query
-    query_builder = collection.query.near_vector(
-        vector=query_embeddings, limit=limit
+    check_embedding_dimensions(query_embeddings, settings.GENERAL_KNOWLEDGE_COLLECTION_NAME)
+
+    # Execute the query, applying filters if provided
+    result = await get_vector_store(weaviate_manager).search(
+        settings.GENERAL_KNOWLEDGE_COLLECTION_NAME,
+        query_embeddings,
+        limit=limit,
+        filters=filters,
     )
 
-    # Apply filters if provided
-    if filters:
-        for filter_condition in filters:
-            query_builder = query_builder.with_filter(filter_condition)
-
-    # Execute the query
-    result = query_builder.do()
-
     # Format the results
     vector_records = []
-    for item in result.objects:
+    for item in result:
         vector_records.append(
             {
                 "id": item.uuid,
@@ -157,7 +147,7 @@ async def retrieve_vector_record(
                 "source": item.properties.get("source"),
                 "knowledge_type": item.properties.get("knowledge_type"),
                 "metadata": item.properties.get("metadata", {}),
-                "distance": item.metadata.distance,
+                "distance": item.distance,
             }
         )
 
@@ -165,31 +155,24 @@ async def retrieve_vector_record(
 
 
 async def delete_vector_record(
-    record_id: str, weaviate_client: weaviate.Client = None
+    record_id: str, weaviate_manager: WeaviateClientManager = None
 ) -> Dict:
     """
-    Delete vector record from Weaviate by ID.
+    Delete vector record from the vector store by ID.
 
     Args:
         record_id: ID of the vector record to delete
-        weaviate_client: Optional Weaviate client instance
+        weaviate_manager: Optional Weaviate client manager
 
     Returns:
         Dict containing the deletion status
     """
-    if weaviate_client is None:
-        weaviate_client = get_weaviate_client();
-    
-    weaviate_client.connect();
-
-    # Get the knowledge collection
-    collection = weaviate_client.collections.get(
-        settings.GENERAL_KNOWLEDGE_COLLECTION_NAME
-    )
-
     try:
         # Delete the object
-        collection.data.delete(record_id)
+        await get_vector_store(weaviate_manager).delete(
+            settings.GENERAL_KNOWLEDGE_COLLECTION_NAME, [record_id]
+        )
+        await get_retrieval_cache().bump(settings.GENERAL_KNOWLEDGE_COLLECTION_NAME)
         return {
             "status": "success",
             "message": f"Vector record with ID {record_id} deleted successfully",
@@ -203,36 +186,30 @@ async def update_vector_record(
     content: Optional[str] = None,
     metadata: Optional[Dict] = None,
     ai_tool: AITool = None,
-    weaviate_client: weaviate.Client = None,
+    weaviate_manager: WeaviateClientManager = None,
 ) -> Dict:
     """
-    Update existing vector record in Weaviate.
+    Update existing vector record in the vector store.
 
     Args:
         record_id: ID of the vector record to update
         content: Optional new content
         metadata: Optional new metadata
         ai_tool: Optional AITool instance
-        weaviate_client: Optional Weaviate client instance
+        weaviate_manager: Optional Weaviate client manager
 
     Returns:
         Dict containing the update status
     """
     if ai_tool is None:
         ai_tool = get_ai_tool()
-    if weaviate_client is None:
-        weaviate_client = get_weaviate_client();
-    
-    weaviate_client.connect();
-
-    # Get the knowledge collection
-    collection = weaviate_client.collections.get(
-        settings.GENERAL_KNOWLEDGE_COLLECTION_NAME
-    )
+    vector_store = get_vector_store(weaviate_manager)
 
     try:
         # Get existing object
-        existing_object = collection.query.fetch_object_by_id(record_id)
+        existing_object = await vector_store.get(
+            settings.GENERAL_KNOWLEDGE_COLLECTION_NAME, record_id
+        )
         if not existing_object:
             return {
                 "status": "error",
@@ -250,11 +227,16 @@ async def update_vector_record(
         new_embeddings = None
         if content is not None:
             new_embeddings = await ai_tool.get_embeddings(content)
+            check_embedding_dimensions(new_embeddings, settings.GENERAL_KNOWLEDGE_COLLECTION_NAME)
 
         # Update the object
-        collection.data.update(
-            uuid=record_id, properties=update_data, vector=new_embeddings
+        await vector_store.update(
+            settings.GENERAL_KNOWLEDGE_COLLECTION_NAME,
+            record_id,
+            update_data,
+            vector=new_embeddings,
         )
+        await get_retrieval_cache().bump(settings.GENERAL_KNOWLEDGE_COLLECTION_NAME)
 
         return {
             "status": "success",
@@ -269,7 +251,7 @@ async def store_vector_record_batch(
     batch_size: int = 10,
     max_workers: int = 5,
     ai_tool: AITool = None,
-    weaviate_client: weaviate.Client = None,
+    weaviate_manager: WeaviateClientManager = None,
 ) -> List[Dict]:
     """
     Process and store multiple vector records in batches using parallel processing.
@@ -279,7 +261,7 @@ async def store_vector_record_batch(
         batch_size: Number of items to process in each batch
         max_workers: Maximum number of concurrent workers
         ai_tool: Optional AITool instance
-        weaviate_client: Optional Weaviate client instance
+        weaviate_manager: Optional Weaviate client manager
 
     Returns:
         List of results from storing each vector record
@@ -288,16 +270,14 @@ async def store_vector_record_batch(
 
     if ai_tool is None:
         ai_tool = get_ai_tool()
-    if weaviate_client is None:
-        weaviate_client = get_weaviate_client();
-    
-    weaviate_client.connect();
+    if weaviate_manager is None:
+        weaviate_manager = get_weaviate_manager()
 
     async def process_batch(batch: List[Dict]) -> List[Dict]:
         try:
             # Store the batch using the new store_vector_record functionality
             results = await store_vector_record(
-                items=batch, ai_tool=ai_tool, weaviate_client=weaviate_client
+                items=batch, ai_tool=ai_tool, weaviate_manager=weaviate_manager
             )
 
             # Ensure results is a list
@@ -348,33 +328,22 @@ async def store_vector_record_batch(
 
 
 async def get_vector_record_by_filters(
-    filters: Union[Filter, List[Filter]],
+    filters: List,
     limit: int = 10,
-    weaviate_client: weaviate.Client = None,
+    weaviate_manager: WeaviateClientManager = None,
 ) -> List[Dict]:
     """
-    Retrieve vector records from Weaviate using filters.
+    Retrieve vector records from the vector store using filters.
 
     Args:
-        filters: Single Filter or list of Filters to apply. Can be a single Filter,
-                a list of Filters, or a Filter.all_of() combination
+        filters: Conditions with path, operator and value, all of which must match
         limit: Maximum number of results to return
-        weaviate_client: Optional Weaviate client instance
+        weaviate_manager: Optional Weaviate client manager
 
     Returns:
         List of retrieved vector records
     """
-    if weaviate_client is None:
-        weaviate_client = get_weaviate_client();
-    
-    weaviate_client.connect();
-
-    # Get the knowledge collection
-    collection = weaviate_client.collections.get(
-        settings.GENERAL_KNOWLEDGE_COLLECTION_NAME
-    )
-
-    weaviate_filters = []
+    property_filters = []
 
     for filter_condition in filters:
         # Convert path to string if it's a list
@@ -384,42 +353,22 @@ async def get_vector_record_by_filters(
             else filter_condition.path
         )
 
-        # Create the appropriate filter based on the operator
-        if filter_condition.operator == "Equal":
-            weaviate_filters.append(
-                Filter.by_property(path).equal(filter_condition.value)
-            )
-        elif filter_condition.operator == "NotEqual":
-            weaviate_filters.append(
-                Filter.by_property(path).not_equal(filter_condition.value)
-            )
-        elif filter_condition.operator == "GreaterThan":
-            weaviate_filters.append(
-                Filter.by_property(path).greater_than(filter_condition.value)
-            )
-        elif filter_condition.operator == "LessThan":
-            weaviate_filters.append(
-                Filter.by_property(path).less_than(filter_condition.value)
-            )
-        elif filter_condition.operator == "ContainsAny":
-            weaviate_filters.append(
-                Filter.by_property(path).contains_any(filter_condition.value)
-            )
-        elif filter_condition.operator == "ContainsAll":
-            weaviate_filters.append(
-                Filter.by_property(path).contains_all(filter_condition.value)
-            )
-        else:
+        if filter_condition.operator not in FILTER_OPERATORS:
             raise ValueError(f"Unsupported operator: {filter_condition.operator}")
+        property_filters.append(
+            PropertyFilter(path, filter_condition.operator, filter_condition.value)
+        )
 
     # Get vector records using the filters
-    results = collection.query.fetch_objects(
-        filters=Filter.all_of(weaviate_filters), limit=limit
+    results = await get_vector_store(weaviate_manager).fetch(
+        settings.GENERAL_KNOWLEDGE_COLLECTION_NAME,
+        limit=limit,
+        filters=property_filters,
     )
 
     # Format the results
     vector_records = []
-    for item in results.objects:
+    for item in results:
         vector_records.append(
             {
                 "id": item.uuid,
@@ -427,8 +376,8 @@ async def get_vector_record_by_filters(
                 "source": item.properties.get("source"),
                 "knowledge_type": item.properties.get("knowledge_type"),
                 "metadata": item.properties.get("metadata", {}),
-                "creation_time": item.metadata.creation_time,
-                "last_update_time": item.metadata.last_update_time,
+                "creation_time": item.creation_time,
+                "last_update_time": item.last_update_time,
             }
         )
 
@@ -436,139 +385,400 @@ async def get_vector_record_by_filters(
     return vector_records
 
 async def store_vector_record_with_tenant_id(
-    items: Union[Dict, List[Dict]],
+    items: Union[Dict, List[Dict], AsyncIterable[Dict]],
     tenant_id: str,
     collection_name: str = settings.TENANT_KNOWLEDGE_COLLECTION_NAME,
     ai_tool: AITool = None,
-) -> Union[Dict, List[Dict]]:
+    weaviate_manager: WeaviateClientManager = None,
+    progress: Optional[Callable[[Dict], None]] = None,
+) -> Dict:
     """
-    Store vector record in Weaviate with embeddings generated by AI, specifying collection and tenant.
+    Store vector records for a tenant with embeddings generated by AI, using batch import.
+
+    Items are embedded and imported in batches of WEAVIATE_BATCH_SIZE; the import of
+    one batch overlaps with embedding the next. Objects rejected by the vector store are
+    re-batched with exponential backoff up to WEAVIATE_BATCH_MAX_RETRIES times.
+    Items can also be streamed: batches of an async iterable are embedded as soon
+    as they fill up, while the iterable is still producing.
 
     Args:
-        items: Single dictionary or list of dictionaries containing vector records to store.
-               Each item should have: content, source, knowledge_type, and optional metadata
-        collection_name: Name of the Weaviate collection to store in
+        items: Single dictionary, list of dictionaries or async iterable of dictionaries
+               containing vector records to store.
+               Each item should have: content, source, knowledge_type, and optional metadata,
+               content_hash and uuid (a random UUID by default)
         tenant_id: ID of the tenant to store under
+        collection_name: Name of the collection to store in
         ai_tool: Optional AITool instance
-        weaviate_client: Optional Weaviate client instance
+        weaviate_manager: Optional Weaviate client manager
+        progress: Optional callback receiving the import counters after every batch
 
     Returns:
-        Dict or List[Dict] containing the stored vector record information
+        Dict with the overall status, inserted count, failed items and per-batch throughput
     """
     if ai_tool is None:
         ai_tool = get_ai_tool()
+    if weaviate_manager is None:
+        weaviate_manager = get_weaviate_manager()
+    vector_store = get_vector_store(weaviate_manager)
 
-    weaviate_client = get_weaviate_client();
-    
+    # Convert single item to list for consistent processing
+    if isinstance(items, dict):
+        items = [items]
+    item_count = 0
+
+    tenant_registry = get_tenant_registry()
+    tiering = get_tenant_tiering_manager()
+    tiered = collection_name == tenant_registry.collection_name
+    if tiered:
+        if await tenant_registry.ensure(tenant_id, weaviate_manager):
+            print(f"Tenant {tenant_id} not found, created new tenant")
+        # Inactive tenants cannot accept writes
+        await tiering.ensure_active(tenant_id, weaviate_manager)
+    elif not await vector_store.get_tenants(collection_name, [tenant_id]):
+        print(f"Tenant {tenant_id} not found, creating new tenant")
+        await vector_store.create_tenants(collection_name, [tenant_id])
+
+    failed: List[Dict] = []
+    batch_stats: List[Dict] = []
+    pending: Dict[str, Dict] = {}
+
+    async def embed_batch(batch: List[Dict]) -> List[Dict]:
+        async def embed_item(item: Dict) -> Optional[Dict]:
+            metadata = item.get("metadata") or {}
+            try:
+                if not all([item.get("content"), item.get("source"), item.get("knowledge_type")]):
+                    raise ValueError(
+                        "Missing required fields: content, source, or knowledge_type"
+                    )
+                embeddings = await ai_tool.get_embeddings(item["content"])
+                check_embedding_dimensions(embeddings, collection_name)
+            except Exception as e:
+                logger.error(
+                    f"Error embedding vector record: {metadata.get('source_id')}, Tenant: {tenant_id}, Error: {str(e)}"
+                )
+                failed.append({"data": metadata.get("source_id"), "message": str(e)})
+                return None
+            return {
+                "uuid": item.get("uuid") or str(uuid.uuid4()),
+                "properties": {
+                    "content": item["content"],
+                    "content_hash": item.get("content_hash") or content_hash(item["content"]),
+                    "source": item["source"],
+                    "knowledge_type": item["knowledge_type"],
+                    "metadata": metadata,
+                },
+                "vector": embeddings,
+            }
 
+        objects = await asyncio.gather(*[embed_item(item) for item in batch])
+        return [obj for obj in objects if obj is not None]
 
-    # Convert single item to list for consistent processing
-    items_list = [items] if isinstance(items, dict) else items
+    async def insert(objects: List[Dict]) -> Dict[str, str]:
+        if not tiered:
+            return await vector_store.insert_batch(collection_name, objects, tenant_id)
+        errors = await tiering.run_active(
+            tenant_id, lambda: vector_store.insert_batch(collection_name, objects, tenant_id), weaviate_manager
+        )
+        if any(is_tenant_not_active_error(message) for message in errors.values()):
+            # Deactivated during the import, e.g. by the tiering sweep of another process
+            await tiering.reactivate(tenant_id, weaviate_manager)
+            rejected = [obj for obj in objects if obj["uuid"] in errors]
+            errors = await vector_store.insert_batch(collection_name, rejected, tenant_id)
+        return errors
+
+    async def import_batch(batch_index: int, objects: List[Dict]) -> Dict[str, str]:
+        started = time.perf_counter()
+        errors = await insert(objects)
+        # New objects are searchable now, so cached results are outdated
+        await get_retrieval_cache().bump(collection_name, tenant_id)
+        elapsed = time.perf_counter() - started
+        stats = {
+            "batch": batch_index,
+            "objects": len(objects),
+            "failed": len(errors),
+            "seconds": round(elapsed, 3),
+            "objects_per_second": round(len(objects) / elapsed, 1) if elapsed > 0 else None,
+        }
+        batch_stats.append(stats)
+        logger.info(
+            f"Imported batch {batch_index} - Objects: {len(objects)}, Failed: {len(errors)}, "
+            f"Throughput: {stats['objects_per_second']} obj/s, Tenant: {tenant_id}"
+        )
+        if progress is not None:
+            progress({
+                "items": item_count,
+                "batches_imported": len(batch_stats),
+                "objects_imported": sum(batch["objects"] - batch["failed"] for batch in batch_stats),
+            })
+        return errors
+
+    def collect_retries(objects: List[Dict], errors: Dict[str, str]) -> None:
+        for obj in objects:
+            if obj["uuid"] in errors:
+                pending[obj["uuid"]] = {"object": obj, "message": errors[obj["uuid"]]}
+
+    batch_size = settings.WEAVIATE_BATCH_SIZE
+
+    async def iter_batches():
+        if isinstance(items, list):
+            for i in range(0, len(items), batch_size):
+                yield items[i : i + batch_size]
+            return
+        batch = []
+        async for item in items:
+            batch.append(item)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    # Embed batch N+1 while batch N is being imported
+    in_flight = None
+    batch_index = 0
+    async for batch in iter_batches():
+        item_count += len(batch)
+        objects = await embed_batch(batch)
+        if in_flight is not None:
+            collect_retries(in_flight[0], await in_flight[1])
+        in_flight = (objects, asyncio.create_task(import_batch(batch_index, objects)))
+        batch_index += 1
+    if in_flight is not None:
+        collect_retries(in_flight[0], await in_flight[1])
+
+    # Re-batch rejected objects with exponential backoff
+    attempt = 0
+    while pending and attempt < settings.WEAVIATE_BATCH_MAX_RETRIES:
+        attempt += 1
+        await asyncio.sleep(settings.WEAVIATE_BATCH_RETRY_BACKOFF * 2 ** (attempt - 1))
+        logger.info(f"Retrying {len(pending)} failed objects (attempt {attempt}), Tenant: {tenant_id}")
+        retry_objects = [entry["object"] for entry in pending.values()]
+        pending.clear()
+        collect_retries(retry_objects, await import_batch(len(batch_stats), retry_objects))
+
+    for entry in pending.values():
+        logger.error(
+            f"Failed to store vector record: {entry['object']['properties']['metadata'].get('source_id')}, "
+            f"Tenant: {tenant_id}, Error: {entry['message']}"
+        )
+        failed.append(
+            {
+                "data": entry["object"]["properties"]["metadata"].get("source_id"),
+                "message": entry["message"],
+            }
+        )
 
-    # Get the knowledge collection
-    collection = weaviate_client.collections.get(collection_name);
-    tenant = collection.tenants.get_by_name(tenant_id);
+    inserted = item_count - len(failed)
+    logger.info(f"Stored {inserted}/{item_count} vector records, Tenant: {tenant_id}")
+    return {
+        "status": "success" if not failed else ("error" if inserted == 0 else "partial"),
+        "inserted": inserted,
+        "failed": failed,
+        "batches": batch_stats,
+    }
 
-    if(tenant is None):
-        print(f"Tenant {tenant_id} not found, creating new tenant");
-        collection.tenants.create(tenant_id)
-    
-    tenant_collection = collection.with_tenant(tenant_id);
+# Namespace of the deterministic UUIDs of document chunks
+CHUNK_UUID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "ai-pilot-rag/knowledge-chunk")
 
 
-    results = []
+def chunk_uuid(tenant_id: str, source: str, chunk_hash: str, occurrence: int = 0) -> str:
+    """
+    Return the deterministic UUID of a document chunk.
 
-    async def process_item(item):
-        try:
+    Args:
+        tenant_id: Tenant the chunk is stored under
+        source: Document the chunk belongs to
+        chunk_hash: Content hash of the chunk
+        occurrence: How many identical chunks precede this one in the document
 
-            content = item.get("content")
-            source = item.get("source")
-            knowledge_type = item.get("knowledge_type")
-            metadata = item.get("metadata", {})
-            if not all([content, source, knowledge_type]):
-                raise ValueError(
-                    "Missing required fields: content, source, or knowledge_type"
-                )
+    Returns:
+        The UUID, identical whenever the same document yields the same chunk
+    """
+    return str(uuid.uuid5(CHUNK_UUID_NAMESPACE, f"{tenant_id}\x1f{source}\x1f{chunk_hash}\x1f{occurrence}"))
+
+
+def _source_id(obj: StoredObject) -> Optional[str]:
+    return (obj.properties.get("metadata") or {}).get("source_id")
+
+
+async def _fetch_source_objects(
+    collection_name: str, tenant_id: str, source: str, weaviate_manager: WeaviateClientManager
+) -> Dict[str, Optional[str]]:
+    """Return the UUID and metadata source_id of every stored object of a document."""
+    vector_store = get_vector_store(weaviate_manager)
+    tiering = get_tenant_tiering_manager()
+    tiered = collection_name == tiering.registry.collection_name
+    if tiered:
+        # Inactive tenants cannot be read
+        if not await tiering.ensure_active(tenant_id, weaviate_manager):
+            return {}
+    elif not await vector_store.get_tenants(collection_name, [tenant_id]):
+        return {}
+
+    async def fetch(**kwargs) -> List[StoredObject]:
+        def run():
+            return vector_store.fetch(collection_name, tenant_id=tenant_id, **kwargs)
+
+        return await (tiering.run_active(tenant_id, run, weaviate_manager) if tiered else run())
+
+    limit = settings.SOURCE_SYNC_FETCH_LIMIT
+    objects = await fetch(
+        limit=limit,
+        filters=[PropertyFilter("source", "Equal", source)],
+        return_properties=["source", "metadata"],
+    )
+    if len(objects) < limit:
+        return {obj.uuid: _source_id(obj) for obj in objects}
+
+    # More chunks than one query returns; filters cannot be paged, so scan the tenant
+    found: Dict[str, Optional[str]] = {}
+    after = None
+    while True:
+        page = await fetch(limit=1000, after=after, return_properties=["source", "metadata"])
+        if not page:
+            return found
+        found.update((obj.uuid, _source_id(obj)) for obj in page if obj.properties.get("source") == source)
+        after = page[-1].uuid
+
+
+async def sync_source_records_with_tenant_id(
+    items: Union[List[Dict], AsyncIterable[Dict]],
+    tenant_id: str,
+    source: str,
+    collection_name: str = settings.TENANT_KNOWLEDGE_COLLECTION_NAME,
+    ai_tool: AITool = None,
+    weaviate_manager: WeaviateClientManager = None,
+    progress: Optional[Callable[[Dict], None]] = None,
+) -> Dict:
+    """
+    Store the chunks of a document, replacing a previously stored version of it.
 
-            embeddings = await ai_tool.get_embeddings(content)
+    Chunks are written under deterministic UUIDs derived from the tenant, the
+    document, the chunk's content hash and its occurrence among identical
+    chunks. Chunks already stored under their UUID are skipped without being
+    embedded, new or changed chunks are embedded and inserted, and stored
+    chunks the document no longer yields are deleted afterwards. Deletion is
+    skipped when any chunk failed to store, so a retry can finish the sync.
+    Skipped chunks whose position in the document changed get their
+    metadata (source_id) updated in place, without touching their vectors.
 
-            # Insert the object using data.insert() with tenant
-            response = tenant_collection.data.insert(
-                properties={
-                    "content": content,
-                    "source": source,
-                    "knowledge_type": knowledge_type,
-                    "metadata": metadata,
-                },
-                vector=embeddings,
-            )
+    Args:
+        items: List or async iterable of the document's chunks, in document order
+        tenant_id: ID of the tenant to store under
+        source: The document the chunks belong to
+        collection_name: Name of the collection to store in
+        ai_tool: Optional AITool instance
+        weaviate_manager: Optional Weaviate client manager
+        progress: Optional callback receiving the import counters
 
-            if response:
-                logger.info(
-                    f"Successfully stored vector record - ITEM: {item.get("metadata").get("source_id")}, Type: {knowledge_type}, Tenant: {tenant_id}"
-                )
-                results.append(
-                    {"status": "success", "data": item.get("metadata").get("source_id")}
+    Returns:
+        The storage result of store_vector_record_with_tenant_id, plus the
+        unchanged (skipped), moved and deleted chunk counts
+    """
+    if weaviate_manager is None:
+        weaviate_manager = get_weaviate_manager()
+    vector_store = get_vector_store(weaviate_manager)
+    tiering = get_tenant_tiering_manager()
+    tiered = collection_name == tiering.registry.collection_name
+    stored = await _fetch_source_objects(collection_name, tenant_id, source, weaviate_manager)
+
+    async def write(operation):
+        return await (tiering.run_active(tenant_id, operation, weaviate_manager) if tiered else operation())
+
+    current = set()
+    occurrences: Dict[str, int] = {}
+    skipped = 0
+    # Unchanged chunks whose source_id is outdated: UUID -> current metadata
+    moved: Dict[str, Dict] = {}
+
+    async def iter_items():
+        if isinstance(items, list):
+            for item in items:
+                yield item
+        else:
+            async for item in items:
+                yield item
+
+    async def changed_items():
+        nonlocal skipped
+        async for item in iter_items():
+            chunk_hash = item.get("content_hash") or content_hash(item["content"])
+            occurrence = occurrences.get(chunk_hash, 0)
+            occurrences[chunk_hash] = occurrence + 1
+            object_id = chunk_uuid(tenant_id, source, chunk_hash, occurrence)
+            current.add(object_id)
+            if object_id in stored:
+                skipped += 1
+                metadata = item.get("metadata") or {}
+                if stored[object_id] != metadata.get("source_id"):
+                    moved[object_id] = metadata
+                continue
+            yield {**item, "uuid": object_id, "content_hash": chunk_hash}
+
+    result = await store_vector_record_with_tenant_id(
+        changed_items(),
+        tenant_id,
+        collection_name=collection_name,
+        ai_tool=ai_tool,
+        weaviate_manager=weaviate_manager,
+        progress=progress,
+    )
+
+    semaphore = asyncio.Semaphore(settings.WEAVIATE_BATCH_CONCURRENCY)
+
+    async def update_metadata(object_id: str, metadata: Dict) -> bool:
+        async with semaphore:
+            try:
+                await write(
+                    lambda: vector_store.update(
+                        collection_name, object_id, {"metadata": metadata}, tenant_id=tenant_id
+                    )
                 )
-            else:
+                return True
+            except Exception as e:
                 logger.error(
-                    f"Failed to store vector record - Source: {source}, Type: {knowledge_type}, Tenant: {tenant_id}"
-                )
-                results.append(
-                    {
-                        "status": "error",
-                        "data": item.get("metadata").get("id"),
-                        "message": "Insert failed",
-                    }
+                    f"Error updating metadata of {metadata.get('source_id')}, Tenant: {tenant_id}, Error: {str(e)}"
                 )
-
-        except Exception as e:
-            logger.error(
-                f"Error storing vector record: {item.get("metadata").get("id")}, Type: {knowledge_type}, Tenant: {tenant_id}, Error: {str(e)}"
-            )
-            results.append(
-                {
-                    "status": "error",
-                    "data": item.get("metadata").get("id"),
-                    "message": str(e),
-                }
-            )
-
-    await asyncio.gather(*[process_item(item) for item in items_list])
-    weaviate_client.close();
-    print('\033[41m\033[30mweaviate client closed \033[0m');
-
-    return results[0] if len(results) == 1 else results
+                return False
+
+    updated = sum(await asyncio.gather(*[update_metadata(*entry) for entry in moved.items()]))
+    if updated:
+        await get_retrieval_cache().bump(collection_name, tenant_id)
+
+    vanished = list(set(stored) - current)
+    if vanished and not result["failed"]:
+        await write(lambda: vector_store.delete(collection_name, vanished, tenant_id))
+        await get_retrieval_cache().bump(collection_name, tenant_id)
+    deleted = len(vanished) if not result["failed"] else 0
+    logger.info(
+        f"Synced {source}: {result['inserted']} stored, {skipped} unchanged ({updated} moved), "
+        f"{deleted} deleted, Tenant: {tenant_id}"
+    )
+    return {**result, "skipped": skipped, "moved": updated, "deleted": deleted}
 
 async def delete_vector_record_with_tenant_id(
     tenant_id: str,
-    collection_name: str = settings.TENANT_KNOWLEDGE_COLLECTION_NAME
+    collection_name: str = settings.TENANT_KNOWLEDGE_COLLECTION_NAME,
+    weaviate_manager: WeaviateClientManager = None,
 ) -> Dict:
     """
     Delete all vector records from a specific tenant's knowledge base.
     """
-    weaviate_client = get_weaviate_client();
-    
-    weaviate_client.connect();
-
-    # Get the knowledge collection  
-    
     try:
         # Delete all vector records from the collection
-        collection = weaviate_client.collections.get(collection_name)
-        collection.tenants.remove(tenant_id)
+        await get_vector_store(weaviate_manager).delete_tenant(collection_name, tenant_id)
+        await get_retrieval_cache().bump(collection_name, tenant_id)
+        if collection_name == get_tenant_registry().collection_name:
+            get_tenant_registry().mark_absent(tenant_id)
+            get_tenant_tiering_manager().forget(tenant_id)
 
-        print('\033[41m\033[30mweaviate client closed \033[0m');
         return {
             "status": "success",
             "message": f"All vector records from tenant {tenant_id} deleted successfully"
         }
     except Exception as e:
-        print('\033[41m\033[30mweaviate client closed \033[0m');
+        get_tenant_registry().invalidate(tenant_id)
         return {
             "status": "error",
             "message": f"Failed to delete vector records: {str(e)}"
         }
-    finally:
-        weaviate_client.close();
-        print('\033[41m\033[30mweaviate client closed \033[0m');
\ No newline at end of file
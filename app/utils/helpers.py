@@ -1,3 +1,37 @@
+import asyncio
+import hashlib
+import zlib
+from typing import AsyncIterator, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+# Content-defined chunks end after a word once they reach this fraction of the
+# chunk size and the hash of the word and the one before it is divisible by
+# CHUNK_BOUNDARY_DIVISOR, i.e. on average 8 words past the minimum size. The
+# window up to chunk_size spans several divisors' worth of words, so only about
+# 1% of chunks end at the position-based cap, whose boundary an edit shifts
+CHUNK_BOUNDARY_MIN_FRACTION = 0.5
+CHUNK_BOUNDARY_DIVISOR = 8
+
+
+def content_hash(content: str) -> str:
+    """
+    Return the SHA-256 hex digest of a chunk's content.
+
+    Args:
+        content (str): Chunk content
+
+    Returns:
+        str: Hex digest identifying the content
+    """
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _is_chunk_boundary(previous_word: str, word: str) -> bool:
+    # crc32 rather than hash(), which is salted per process
+    return zlib.crc32(f"{previous_word} {word}".encode()) % CHUNK_BOUNDARY_DIVISOR == 0
+
+
 def split_content_into_chunks(content: str, source: str, chunk_size: int = 500, knowledge_type: str = "specific_knowledge") -> list[dict]:
     """
     Split content into chunks of approximately specified token size.
@@ -9,46 +43,134 @@ def split_content_into_chunks(content: str, source: str, chunk_size: int = 500,
         knowledge_type (str, optional): Type of knowledge. Defaults to "specific_knowledge".
     
     Returns:
-        list[dict]: List of chunk objects with source, content, knowledge_type, and metadata
+        list[dict]: List of chunk objects with source, content, content_hash, knowledge_type, and metadata
+    """
+    return list(iter_content_chunks([content], source, chunk_size, knowledge_type))
+
+
+def iter_content_chunks(
+    texts: Iterable[str],
+    source: str,
+    chunk_size: int = 500,
+    knowledge_type: str = "specific_knowledge",
+    content_defined: bool = False,
+) -> Iterator[dict]:
+    """
+    Split a stream of texts into chunks as the texts arrive.
+
+    Yields the same chunks as split_content_into_chunks on the texts joined by
+    spaces, but only holds the words of the current chunk, so documents can be
+    chunked page by page without building the whole text first.
+
+    With content_defined, a chunk past half of chunk_size also ends where the
+    words themselves call for a boundary, so chunk boundaries depend on the
+    nearby text rather than on the position in the document. An edit then
+    changes only the chunks around it instead of shifting every chunk after
+    it, and re-ingesting an edited document re-embeds little.
+
+    Args:
+        texts (Iterable[str]): Consecutive pieces of the content, e.g. pages
+        source (str): Source file name or identifier
+        chunk_size (int, optional): Target size of each chunk in tokens. Defaults to 500.
+        knowledge_type (str, optional): Type of knowledge. Defaults to "specific_knowledge".
+        content_defined (bool, optional): Let the text pick chunk boundaries. Defaults to False.
+
+    Yields:
+        dict: Chunk objects with source, content, content_hash, knowledge_type, and metadata
     """
-    chunks = []
-    words = content.split()
     current_chunk = []
     current_token_count = 0
     chunk_index = 0
+    previous_word = ""
+    min_boundary_tokens = chunk_size * CHUNK_BOUNDARY_MIN_FRACTION if content_defined else None
 
-    for word in words:
-        # Rough estimation: 1 word ≈ 1.3 tokens on average
-        estimated_tokens = len(word) * 1.3
-        
-        if current_token_count + estimated_tokens > chunk_size:
-            # Save current chunk and start new one
-            chunk_content = " ".join(current_chunk)
-            chunks.append({
-                "source": source,
-                "content": chunk_content,
-                "knowledge_type": knowledge_type,
-                "metadata": {
-                    "source_id": f"{chunk_index}_{source}"
-                }
-            })
-            current_chunk = [word]
-            current_token_count = estimated_tokens
-            chunk_index += 1
-        else:
-            current_chunk.append(word)
-            current_token_count += estimated_tokens
-
-    # Add final chunk if not empty
-    if current_chunk:
-        chunk_content = " ".join(current_chunk)
-        chunks.append({
+    def make_chunk() -> dict:
+        content = " ".join(current_chunk)
+        return {
             "source": source,
-            "content": chunk_content,
+            "content": content,
+            "content_hash": content_hash(content),
             "knowledge_type": knowledge_type,
             "metadata": {
                 "source_id": f"{chunk_index}_{source}"
             }
-        })
-    
-    return chunks
\ No newline at end of file
+        }
+
+    for text in texts:
+        for word in text.split():
+            # Rough estimation: 1 word ≈ 1.3 tokens on average
+            estimated_tokens = len(word) * 1.3
+
+            if current_token_count + estimated_tokens > chunk_size:
+                # Emit current chunk and start new one
+                yield make_chunk()
+                current_chunk = [word]
+                current_token_count = estimated_tokens
+                chunk_index += 1
+            else:
+                current_chunk.append(word)
+                current_token_count += estimated_tokens
+                if (
+                    min_boundary_tokens is not None
+                    and current_token_count >= min_boundary_tokens
+                    and _is_chunk_boundary(previous_word, word)
+                ):
+                    yield make_chunk()
+                    current_chunk = []
+                    current_token_count = 0
+                    chunk_index += 1
+            previous_word = word
+
+    # Emit final chunk if not empty
+    if current_chunk:
+        yield make_chunk()
+
+
+async def iterate_in_thread(iterator: Iterator[T], buffer_size: int) -> AsyncIterator[T]:
+    """
+    Consume a blocking iterator from async code.
+
+    The iterator is advanced on a worker thread ahead of the consumer, holding
+    at most buffer_size items, so producing the next items overlaps with
+    processing the current ones without buffering the whole iterator.
+
+    Args:
+        iterator (Iterator[T]): Blocking iterator, e.g. a parsing generator
+        buffer_size (int): Max items produced ahead of the consumer
+
+    Yields:
+        T: The iterator's items, in order
+
+    Raises:
+        Exception: Whatever the iterator raised
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, buffer_size))
+    done = object()
+    stopped = False
+
+    async def produce() -> None:
+        try:
+            while not stopped:
+                item = await asyncio.to_thread(next, iterator, done)
+                await queue.put((item, None))
+                if item is done:
+                    return
+        except Exception as e:
+            await queue.put((done, e))
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            item, error = await queue.get()
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield item
+    finally:
+        # Let a running next() finish, so the iterator's resources can be released
+        stopped = True
+        while not producer.done():
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.wait({producer}, timeout=0.05)
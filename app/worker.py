@@ -0,0 +1,159 @@
+"""
+Ingestion worker.
+
+Claims jobs from the durable job queue and runs them, outside the API process:
+
+    python -m app.worker --processes 4
+
+Every process runs one job at a time and keeps its lease alive while the job
+runs. SIGTERM or SIGINT stops claiming new jobs and lets running jobs finish;
+a second signal exits immediately, and the interrupted jobs are picked up again
+once their lease expires.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import time
+import traceback
+from typing import Awaitable, Callable, Dict
+
+from app.core.config import settings
+from app.core.job_queue import INGEST_S3_OBJECT, JobQueue, LeaseLost, get_job_queue
+from app.core.vector_store import get_vector_store
+from app.core.weaviate_client import close_weaviate_manager, init_weaviate_manager
+from app.tool.pdf_extraction import get_pdf_extraction_pool
+from app.tool.s3 import process_s3_object
+
+# Job handler: (payload, progress callback) -> result
+JobHandler = Callable[[Dict, Callable[[Dict], None]], Awaitable[Dict]]
+
+
+async def ingest_s3_object(payload: Dict, progress: Callable[[Dict], None]) -> Dict:
+    return await process_s3_object(payload["tenant_id"], payload["key"], progress)
+
+
+JOB_HANDLERS: Dict[str, JobHandler] = {
+    INGEST_S3_OBJECT: ingest_s3_object,
+}
+
+
+async def run_job(queue: JobQueue, worker_id: str, job: Dict) -> None:
+    """Run one leased job, renewing its lease until it finishes."""
+    print(f"Worker {worker_id} running job {job['id']} ({job['kind']}, attempt {job['attempts']})")
+    progress: Dict = dict(job["progress"] or {})
+    task = asyncio.create_task(JOB_HANDLERS[job["kind"]](job["payload"], progress.update))
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=queue.lease_seconds / 3)
+        if done:
+            break
+        try:
+            await asyncio.to_thread(queue.heartbeat, job["id"], worker_id, dict(progress))
+        except LeaseLost as e:
+            # The job may already run on another worker
+            print(f"{str(e)}; abandoning it")
+            task.cancel()
+            return
+
+    try:
+        try:
+            result = task.result()
+        except Exception as e:
+            traceback.print_exc()
+            retry = await asyncio.to_thread(
+                queue.fail, job["id"], worker_id, str(e), job["attempts"], job["max_attempts"]
+            )
+            print(f"Job {job['id']} failed: {str(e)} ({'will retry' if retry else 'giving up'})")
+            return
+        await asyncio.to_thread(queue.heartbeat, job["id"], worker_id, dict(progress))
+        await asyncio.to_thread(queue.complete, job["id"], worker_id, result)
+        print(f"Job {job['id']} succeeded")
+    except LeaseLost as e:
+        print(f"{str(e)}; its outcome was not recorded")
+
+
+async def run_worker(worker_id: str, stop: asyncio.Event) -> None:
+    """Claim and run jobs until ``stop`` is set."""
+    queue = get_job_queue()
+    weaviate_manager = init_weaviate_manager()
+    await get_vector_store(weaviate_manager).prepare()
+    print(f"Worker {worker_id} started")
+    try:
+        while not stop.is_set():
+            job = await asyncio.to_thread(queue.claim, worker_id, list(JOB_HANDLERS))
+            if job is None:
+                try:
+                    await asyncio.wait_for(stop.wait(), settings.JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await run_job(queue, worker_id, job)
+    finally:
+        await asyncio.to_thread(get_pdf_extraction_pool().shutdown)
+        close_weaviate_manager()
+        print(f"Worker {worker_id} stopped")
+
+
+def worker_process() -> None:
+    """Entrypoint of one worker process."""
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+
+    async def main() -> None:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        stop_requested_at = []
+
+        def request_stop() -> None:
+            # Ctrl-C reaches a worker both directly and through the parent, so
+            # only a signal arriving a second after the first one forces an exit
+            if stop_requested_at and time.monotonic() - stop_requested_at[0] > 1:
+                os._exit(1)
+            if not stop_requested_at:
+                stop_requested_at.append(time.monotonic())
+                print(f"Worker {worker_id} stopping after its current job")
+            stop.set()
+
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, request_stop)
+        await run_worker(worker_id, stop)
+
+    asyncio.run(main())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run ingestion workers")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=settings.WORKER_PROCESSES,
+        help="Worker processes to run (default: WORKER_PROCESSES)",
+    )
+    args = parser.parse_args()
+    # PDF extraction pools divide the CPU cores among the worker processes;
+    # spawned workers read the count from the environment
+    settings.WORKER_PROCESSES = max(1, args.processes)
+    os.environ["WORKER_PROCESSES"] = str(settings.WORKER_PROCESSES)
+    if args.processes <= 1:
+        worker_process()
+        return
+
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=worker_process) for _ in range(args.processes)]
+    for process in processes:
+        process.start()
+
+    def forward(signum, _frame) -> None:
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signum)
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
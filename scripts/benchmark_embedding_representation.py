@@ -0,0 +1,85 @@
+"""
+Compare per-chunk CPU time and memory of the embedding representations.
+
+"list" is the previous path: a JSON float response decoded into Python float
+lists, packed into the cache and unpacked back into lists. "float32" is the
+current path: a base64 response decoded into float32 arrays with
+np.frombuffer and cached/unpacked without copies. Both end with the vectors
+held in memory, as an ingestion batch holds them until the Weaviate import.
+
+Runs offline on synthetic responses.
+
+Usage:
+    python scripts/benchmark_embedding_representation.py [chunks] [dimensions]
+"""
+import base64
+import json
+import sys
+import time
+import tracemalloc
+from array import array
+
+import numpy as np
+
+
+def make_responses(chunks, dimensions):
+    """Build equivalent float and base64 provider response bodies."""
+    vectors = np.random.default_rng(0).standard_normal((chunks, dimensions)).astype(np.float32)
+    float_body = json.dumps(
+        {"data": [{"index": i, "embedding": vector.tolist()} for i, vector in enumerate(vectors)]}
+    )
+    base64_body = json.dumps(
+        {
+            "data": [
+                {"index": i, "embedding": base64.b64encode(vector.tobytes()).decode("ascii")}
+                for i, vector in enumerate(vectors)
+            ]
+        }
+    )
+    return float_body, base64_body
+
+
+def list_path(body):
+    embeddings = [item["embedding"] for item in json.loads(body)["data"]]
+    packed = [array("f", embedding).tobytes() for embedding in embeddings]
+    unpacked = []
+    for data in packed:
+        vector = array("f")
+        vector.frombytes(data)
+        unpacked.append(vector.tolist())
+    return unpacked
+
+
+def float32_path(body):
+    embeddings = [
+        np.frombuffer(base64.b64decode(item["embedding"]), dtype=np.float32)
+        for item in json.loads(body)["data"]
+    ]
+    packed = [embedding.tobytes() for embedding in embeddings]
+    return [np.frombuffer(data, dtype=np.float32) for data in packed]
+
+
+def measure(name, path, body, chunks):
+    start = time.process_time()
+    path(body)
+    cpu = time.process_time() - start
+
+    tracemalloc.start()
+    result = path(body)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    print(
+        f"{name:>8}: {cpu / chunks * 1e6:8.1f} us CPU/chunk, "
+        f"{retained / chunks / 1024:7.1f} KiB retained/chunk, "
+        f"{peak / chunks / 1024:7.1f} KiB peak/chunk"
+    )
+
+
+if __name__ == "__main__":
+    chunks = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    dimensions = int(sys.argv[2]) if len(sys.argv) > 2 else 1536
+    float_body, base64_body = make_responses(chunks, dimensions)
+    print(f"{chunks} chunks x {dimensions} dimensions")
+    measure("list", list_path, float_body, chunks)
+    measure("float32", float32_path, base64_body, chunks)
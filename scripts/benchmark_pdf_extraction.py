@@ -0,0 +1,136 @@
+"""
+Compare PDF text extraction in-process against the extraction process pool.
+
+Extracts every PDF of a corpus once in-process, then with pools of 2, 4, ...
+processes up to the CPU count, and reports pages per second and the speedup
+over in-process extraction. Pool start-up is excluded: every pool extracts a
+warm-up document first, as the pool of a long-running worker would have.
+
+Without a directory, a corpus of synthetic text PDFs is generated.
+
+Usage:
+    python scripts/benchmark_pdf_extraction.py [pdf_directory] [--pages N] [--documents N]
+"""
+import argparse
+import functools
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyPDF2 import PdfReader  # noqa: E402
+
+from app.tool.pdf_extraction import PdfExtractionPool  # noqa: E402
+
+WORDS = "contract party agreement clause term payment notice liability service data".split()
+
+
+def make_pdf(pages, seed):
+    """Build a PDF with 50 lines of text per page."""
+    rnd = random.Random(seed)
+    page_numbers = [4 + 2 * i for i in range(pages)]
+    out = b"%PDF-1.4\n"
+    offsets = {}
+
+    def add(number, data):
+        nonlocal out
+        offsets[number] = len(out)
+        out += f"{number} 0 obj\n".encode() + data + b"\nendobj\n"
+
+    add(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{number} 0 R" for number in page_numbers)
+    add(2, f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode())
+    add(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for number in page_numbers:
+        lines = " ".join(
+            "(" + " ".join(rnd.choice(WORDS) for _ in range(14)) + ") '" for _ in range(50)
+        )
+        stream = f"BT /F1 9 Tf 20 820 Td 11 TL {lines} ET"
+        add(
+            number,
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {number + 1} 0 R >>".encode(),
+        )
+        add(number + 1, f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode())
+
+    xref = len(out)
+    size = max(offsets) + 1
+    out += f"xref\n0 {size}\n0000000000 65535 f \n".encode()
+    for number in range(1, size):
+        out += f"{offsets[number]:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def extract_in_process(path):
+    with open(path, "rb") as file:
+        return [page.extract_text() or "" for page in PdfReader(file).pages]
+
+
+def extract_with_pool(pool, path):
+    with open(path, "rb") as file:
+        page_count = len(PdfReader(file).pages)
+    return [text for text, _ in pool.iter_page_texts(path, page_count)]
+
+
+def measure(name, extract, corpus, pages, baseline=None):
+    start = time.perf_counter()
+    texts = [extract(path) for path in corpus]
+    elapsed = time.perf_counter() - start
+    speedup = f"{baseline / elapsed:5.2f}x" if baseline else "1.00x"
+    print(f"{name:>12}: {elapsed:7.2f} s, {pages / elapsed:8.1f} pages/s, speedup {speedup}")
+    return elapsed, texts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", nargs="?", help="Directory of sample PDFs")
+    parser.add_argument("--pages", type=int, default=200, help="Pages per synthetic PDF (default: 200)")
+    parser.add_argument("--documents", type=int, default=4, help="Synthetic PDFs (default: 4)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        if args.directory:
+            corpus = sorted(
+                os.path.join(args.directory, name)
+                for name in os.listdir(args.directory)
+                if name.lower().endswith(".pdf")
+            )
+        else:
+            corpus = []
+            for seed in range(args.documents):
+                path = os.path.join(scratch, f"sample-{seed}.pdf")
+                with open(path, "wb") as file:
+                    file.write(make_pdf(args.pages, seed))
+                corpus.append(path)
+        warm_up = os.path.join(scratch, "warm-up.pdf")
+        with open(warm_up, "wb") as file:
+            file.write(make_pdf(16, -1))
+
+        pages = 0
+        for path in corpus:
+            with open(path, "rb") as file:
+                pages += len(PdfReader(file).pages)
+        cpus = os.cpu_count() or 1
+        print(f"{len(corpus)} documents, {pages} pages, {cpus} CPUs")
+
+        baseline, expected = measure("in-process", extract_in_process, corpus, pages)
+        process_counts = sorted({n for n in (2, 4, 8, 16, 32, 64) if n < cpus} | {max(cpus, 2)})
+        for processes in process_counts:
+            pool = PdfExtractionPool(processes=processes)
+            try:
+                extract_with_pool(pool, warm_up)
+                _, texts = measure(
+                    f"{processes} processes",
+                    functools.partial(extract_with_pool, pool),
+                    corpus,
+                    pages,
+                    baseline,
+                )
+            finally:
+                pool.shutdown()
+            if texts != expected:
+                print(f"{processes} processes: extracted text differs from in-process extraction")
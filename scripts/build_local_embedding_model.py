@@ -0,0 +1,39 @@
+"""
+Convert word vectors in text format (GloVe / word2vec .txt, one "token v1 v2 ..."
+line per token) into the .npz model file read by the local embedding provider.
+
+Usage:
+    python scripts/build_local_embedding_model.py vectors.txt models/embeddings.npz [max_tokens]
+"""
+import os
+import sys
+
+import numpy as np
+
+
+def build_model(input_file, output_file, max_tokens=None):
+    """Read up to max_tokens word vectors and write vocab/vectors arrays."""
+    vocab = []
+    vectors = []
+    with open(input_file, encoding="utf-8") as file:
+        for line in file:
+            parts = line.rstrip().split(" ")
+            if len(parts) == 2 and not vectors:
+                # word2vec header line: "<count> <dimensions>"
+                continue
+            vocab.append(parts[0])
+            vectors.append(np.asarray(parts[1:], dtype=np.float32))
+            if max_tokens and len(vocab) >= max_tokens:
+                break
+    directory = os.path.dirname(output_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    np.savez(output_file, vocab=np.asarray(vocab), vectors=np.vstack(vectors))
+    print(f"Wrote {output_file}: {len(vocab)} tokens, {len(vectors[0])} dimensions")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        print(__doc__)
+        sys.exit(1)
+    build_model(sys.argv[1], sys.argv[2], int(sys.argv[3]) if len(sys.argv) == 4 else None)